@@ -0,0 +1,62 @@
+"""Benchmarks deserializing a large category list (i.e. the json sent to
+Parser.from_json_notation). Compares creating a schema per category against the
+single `many=True` schema used by Category.from_serial_list.
+
+Run with `make bench` from the top level directory."""
+import argparse
+import timeit
+from typing import List
+
+from note_categorizer.common.category import Category
+from note_categorizer.common.category import CategorySchema
+
+
+def generate_serial_list(category_count: int) -> List[dict]:
+    """Generates serial data for the given number of categories"""
+    return [
+        {
+            "name": f"Category {idx}",
+            "keywords": [f"keyword{idx}", f"other{idx}", f"third{idx}"],
+        }
+        for idx in range(category_count)
+    ]
+
+
+def schema_per_category(serial_list: List[dict]) -> List[Category]:
+    """The previous ingestion path: one new schema per category"""
+    return list(
+        map(lambda serial_data: CategorySchema().load(serial_data), serial_list)
+    )
+
+
+def main() -> None:
+    """Runs the benchmark and prints the results"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--category_count", default=50000, type=int)
+    parser.add_argument("-r", "--repeat", default=3, type=int)
+    args = parser.parse_args()
+
+    serial_list = generate_serial_list(args.category_count)
+    bulk_categories = Category.from_serial_list(serial_list)
+    assert bulk_categories == schema_per_category(serial_list)
+
+    per_category_sec = min(
+        timeit.repeat(
+            lambda: schema_per_category(serial_list), number=1, repeat=args.repeat
+        )
+    )
+    bulk_sec = min(
+        timeit.repeat(
+            lambda: Category.from_serial_list(serial_list),
+            number=1,
+            repeat=args.repeat,
+        )
+    )
+    print(f"{args.category_count} categories (best of {args.repeat}):")
+    print(f"Schema per category: {per_category_sec:.3f} sec")
+    print(f"Single many=True schema: {bulk_sec:.3f} sec")
+    print(f"Speedup: {per_category_sec / bulk_sec:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""Load tests the Web App locally. Starts a WebAppServer on an ephemeral port (without
+looking up the public ip), then concurrent clients submit notes to /submit_info and
+categorize the unknown notes with /submit_uncategorized_update. Reports the requests
+per second and the p50 / p95 / p99 latency of each endpoint.
+
+With --check_sessions, every client verifies that its results only contain its own
+notes and add up, i.e. that concurrent sessions don't corrupt each other.
+
+Run with `make load_test` from the top level directory."""
+import argparse
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+from unittest import mock
+
+import requests
+from werkzeug.serving import BaseWSGIServer, make_server
+
+from note_categorizer.web_app.server import WebAppServer
+
+PROJECT_ROOT_PATH = Path(__file__).resolve().parents[1]
+
+CATEGORY_INFO = ["meetings: standup", "breaks: lunch"]
+
+# Minutes of each generated note
+KNOWN_NOTE_MINUTES = 10
+UNKNOWN_NOTE_MINUTES = 5
+
+
+class RequestResult(NamedTuple):
+    """The outcome of a single request"""
+
+    endpoint: str
+    latency_sec: float
+    status_code: int
+
+
+class WorkloadConfig(NamedTuple):
+    """What every client sends"""
+
+    notes_per_submit: int
+    # Fraction of the notes no category matches
+    unknown_ratio: float
+    # Chance of categorizing the unknown notes after a submit
+    update_ratio: float
+    check_sessions: bool
+
+
+def start_local_server() -> Tuple[BaseWSGIServer, WebAppServer]:
+    """Starts the web app on an ephemeral localhost port, in a background thread.
+    # Return
+    The running server and the web app it serves. Call `shutdown()` of both
+    once done."""
+    with mock.patch(
+        "note_categorizer.web_app.web_utils.WebUtils.get_public_ip",
+        return_value="http://localhost",
+    ):
+        web_server = WebAppServer(0, False, False, True, PROJECT_ROOT_PATH)
+    # pylint: disable=protected-access
+    wsgi_server = make_server("127.0.0.1", 0, web_server._app, threaded=True)
+    threading.Thread(target=wsgi_server.serve_forever, daemon=True).start()
+    return wsgi_server, web_server
+
+
+def get_percentile(sorted_values: List[float], percentile: float) -> float:
+    """# Return
+    The nearest-rank percentile of the (sorted) values"""
+    if len(sorted_values) == 0:
+        return 0.0
+    rank = math.ceil(percentile / 100 * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
+
+
+def generate_notes(client_idx: int, iteration: int, config: WorkloadConfig) -> Dict:
+    """# Return
+    The body of a /submit_info request. Every note is tagged with the client and
+    iteration, so results of other sessions are recognizable."""
+    unknown_count = round(config.notes_per_submit * config.unknown_ratio)
+    known_count = config.notes_per_submit - unknown_count
+    tag = f"c{client_idx} i{iteration}"
+    notes = [
+        f"09:00-09:{KNOWN_NOTE_MINUTES:02d}: standup {tag} n{idx}"
+        for idx in range(known_count)
+    ] + [
+        f"10:00-10:{UNKNOWN_NOTE_MINUTES:02d}: misc {tag} n{idx}"
+        for idx in range(unknown_count)
+    ]
+    return {"category_info": CATEGORY_INFO, "notes": notes}
+
+
+# pylint: disable=too-few-public-methods
+class LoadClient:
+    """A single browser-like client, with its own session cookie"""
+
+    def __init__(
+        self, base_url: str, client_idx: int, config: WorkloadConfig, seed: int
+    ) -> None:
+        self.base_url = base_url
+        self.client_idx = client_idx
+        self.config = config
+        self.results: List[RequestResult] = []
+        self.errors: List[str] = []
+        self._http_session = requests.Session()
+        self._random = random.Random(seed)
+
+    def run(self, iterations: int) -> None:
+        """Submits notes (and categorizes their unknowns) `iterations` times"""
+        for iteration in range(iterations):
+            submit_json = self._post(
+                "/submit_info", generate_notes(self.client_idx, iteration, self.config)
+            )
+            if submit_json is None:
+                continue
+            tag = f"c{self.client_idx} i{iteration}"
+            self._check_submit(tag, submit_json)
+
+            if self._random.random() >= self.config.update_ratio:
+                continue
+            breaks_category = submit_json["category_list"][1]
+            update_json = self._post(
+                "/submit_uncategorized_update",
+                {note: breaks_category for note in submit_json["uncategorized_list"]},
+            )
+            if update_json is not None:
+                self._check_update(tag, update_json)
+
+    def _post(self, endpoint: str, body: Dict) -> Optional[Dict[str, Any]]:
+        """Sends the request and records its latency.
+        # Return
+        * The response json.
+        * None if the request failed (i.e. the server was busy)."""
+        start_sec = time.perf_counter()
+        try:
+            response = self._http_session.post(self.base_url + endpoint, json=body)
+        except requests.RequestException as err:
+            self.errors.append(f"{endpoint} failed: {err}")
+            return None
+        latency_sec = time.perf_counter() - start_sec
+        self.results.append(RequestResult(endpoint, latency_sec, response.status_code))
+        if response.status_code != 200:
+            return None
+        response_json: Dict[str, Any] = response.json()
+        return response_json
+
+    def _check_submit(self, tag: str, submit_json: Dict[str, Any]) -> None:
+        """Checks the unknown notes are exactly the ones just submitted"""
+        if not self.config.check_sessions:
+            return
+        expected_count = round(self.config.notes_per_submit * self.config.unknown_ratio)
+        uncategorized_list: List[str] = submit_json["uncategorized_list"]
+        foreign_notes = [note for note in uncategorized_list if f" {tag} " not in note]
+        if len(uncategorized_list) != expected_count or len(foreign_notes) > 0:
+            self.errors.append(
+                f"{tag}: expected {expected_count} of its own unknown notes, got "
+                + f"{len(uncategorized_list)} ({len(foreign_notes)} foreign)"
+            )
+
+    def _check_update(self, tag: str, update_json: Dict[str, Any]) -> None:
+        """Checks the category totals after categorizing every unknown note"""
+        if not self.config.check_sessions:
+            return
+        if update_json["are_uncategorized"]:
+            self.errors.append(f"{tag}: notes are still uncategorized after update")
+        totals_response = self._http_session.get(self.base_url + "/results/totals")
+        totals = {
+            total["category"]: total["minutes"]
+            for total in totals_response.json().get("items", [])
+        }
+        unknown_count = round(self.config.notes_per_submit * self.config.unknown_ratio)
+        expected_totals = {
+            "meetings": (self.config.notes_per_submit - unknown_count)
+            * KNOWN_NOTE_MINUTES,
+            "breaks": unknown_count * UNKNOWN_NOTE_MINUTES,
+        }
+        if totals != expected_totals:
+            self.errors.append(
+                f"{tag}: expected totals {expected_totals}, got {totals}"
+            )
+
+
+def run_load_test(
+    base_url: str, client_count: int, iterations: int, config: WorkloadConfig
+) -> List[LoadClient]:
+    """Runs every client concurrently until each is done.
+    # Return
+    The clients, with their results."""
+    clients = [
+        LoadClient(base_url, client_idx, config, seed=client_idx)
+        for client_idx in range(client_count)
+    ]
+    with ThreadPoolExecutor(client_count) as executor:
+        for future in [executor.submit(client.run, iterations) for client in clients]:
+            future.result()
+    return clients
+
+
+def report_to_str(clients: List[LoadClient], elapsed_sec: float) -> str:
+    """Renders the throughput and latencies of the load test"""
+    results = [result for client in clients for result in client.results]
+    res = f"{len(results)} requests in {elapsed_sec:.2f} sec "
+    res += f"({len(results) / elapsed_sec:.1f} requests/sec)\n"
+
+    endpoints = sorted({result.endpoint for result in results})
+    for endpoint in endpoints:
+        endpoint_results = [result for result in results if result.endpoint == endpoint]
+        latencies_ms = sorted(result.latency_sec * 1000 for result in endpoint_results)
+        busy_count = sum(result.status_code == 503 for result in endpoint_results)
+        failed_count = sum(
+            result.status_code not in (200, 503) for result in endpoint_results
+        )
+        res += f"{endpoint}: {len(endpoint_results)} requests, "
+        res += f"p50 {get_percentile(latencies_ms, 50):.1f} ms, "
+        res += f"p95 {get_percentile(latencies_ms, 95):.1f} ms, "
+        res += f"p99 {get_percentile(latencies_ms, 99):.1f} ms, "
+        res += f"{busy_count} busy (503), {failed_count} failed\n"
+
+    errors = [error for client in clients for error in client.errors]
+    if len(errors) > 0:
+        res += f"{len(errors)} errors:\n" + "\n".join(errors[:20]) + "\n"
+    return res
+
+
+def main() -> None:
+    """Runs the load test and prints the results"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-c", "--clients", default=8, type=int)
+    parser.add_argument(
+        "-i", "--iterations", default=20, type=int, help="Submits per client"
+    )
+    parser.add_argument("-n", "--notes", default=200, type=int, help="Notes per submit")
+    parser.add_argument(
+        "--unknown_ratio",
+        default=0.2,
+        type=float,
+        help="Fraction of the notes no category matches",
+    )
+    parser.add_argument(
+        "--update_ratio",
+        default=0.5,
+        type=float,
+        help="Chance of categorizing the unknown notes after each submit",
+    )
+    parser.add_argument(
+        "--check_sessions",
+        action="store_true",
+        default=False,
+        help="Verify each client only ever sees its own notes and totals",
+    )
+    args = parser.parse_args()
+    config = WorkloadConfig(
+        args.notes, args.unknown_ratio, args.update_ratio, args.check_sessions
+    )
+
+    wsgi_server, web_server = start_local_server()
+    base_url = f"http://127.0.0.1:{wsgi_server.server_port}"
+    start_sec = time.perf_counter()
+    try:
+        clients = run_load_test(base_url, args.clients, args.iterations, config)
+    finally:
+        wsgi_server.shutdown()
+        web_server.shutdown()
+    elapsed_sec = time.perf_counter() - start_sec
+
+    print(f"{args.clients} clients, {args.iterations} submits of {args.notes} notes:")
+    print(report_to_str(clients, elapsed_sec))
+    if any(len(client.errors) > 0 for client in clients):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,20 @@
 """Top level init for the project. All components get referenced here and used
-by main."""
-from note_categorizer.categorizer import parser
-from note_categorizer.web_app import server
+by main. They are only imported once used, so entry points which need none of
+them (i.e. the daemon client) start quickly."""
+from typing import Any
+import importlib
 
 # pylint: disable=redefined-builtin
 all = ["parser", "server"]
+
+_COMPONENT_MODULES = {
+    "parser": "note_categorizer.categorizer.parser",
+    "server": "note_categorizer.web_app.server",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Imports a component on first use"""
+    if name in _COMPONENT_MODULES:
+        return importlib.import_module(_COMPONENT_MODULES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,7 @@
-"""Init for the categorizer aspect of the project"""
-import note_categorizer.categorizer.parser
-import note_categorizer.categorizer.main
+"""Init for the categorizer aspect of the project. Submodules are only imported
+once used (see the top level init)."""
+from typing import Any
+import importlib
 
 # pylint: disable=redefined-builtin
 all = [
@@ -9,3 +10,10 @@ all = [
     "parser",
     "main",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Imports an exported submodule on first use"""
+    if name in all:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
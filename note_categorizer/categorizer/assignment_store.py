@@ -0,0 +1,71 @@
+"""Module responsible for remembering the category the user picked for notes that
+could not be categorized. Answers persist between runs, so notes with the same
+info are never asked about twice."""
+from pathlib import Path
+from typing import Dict
+from typing import ItemsView
+from typing import Optional
+import json
+import os
+
+from note_categorizer.common.category import Category
+from note_categorizer.common.notes import Note
+
+
+class AssignmentStore:
+    """Maps the normalized info of a note to the name of the category picked for it"""
+
+    def __init__(self, store_path: Optional[Path] = None) -> None:
+        """Loads the previous assignments.
+        # Parameters
+        * `store_path` - Where the assignments are saved. When None, they are
+        only remembered for this run.
+        """
+        self.store_path = store_path
+        self._assignments: Dict[str, str] = {}
+
+        if store_path is not None and os.path.exists(store_path):
+            try:
+                with open(store_path, "r", encoding="utf-8") as store_file:
+                    loaded = json.load(store_file)
+            except (OSError, ValueError) as err:
+                print(f"Could not read the assignment store {store_path}: {err}")
+                loaded = {}
+            if isinstance(loaded, dict):
+                self._assignments = {
+                    info: category_name
+                    for info, category_name in loaded.items()
+                    if isinstance(category_name, str)
+                }
+
+    def __len__(self) -> int:
+        return len(self._assignments)
+
+    def items(self) -> ItemsView[str, str]:
+        """# Return
+        Every normalized info with the name of the category picked for it"""
+        return self._assignments.items()
+
+    def get_category_name(self, info: str) -> Optional[str]:
+        """# Return
+        * The name of the category previously picked for notes with this info.
+        * None if no category was picked for it."""
+        return self._assignments.get(Note.normalize_info(info))
+
+    def record(self, info: str, category: Category) -> None:
+        """Remembers the category picked for notes with this info, and saves it"""
+        self._assignments[Note.normalize_info(info)] = category.name
+        self.save()
+
+    def save(self) -> None:
+        """Saves the assignments. Written to a temporary file then renamed, so an
+        interrupted save never loses previous answers."""
+        if self.store_path is None:
+            return
+        tmp_path = Path(f"{self.store_path}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as store_file:
+                json.dump(self._assignments, store_file, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.store_path)
+        except OSError as err:
+            print(f"Could not save the assignment store {self.store_path}: {err}")
@@ -0,0 +1,116 @@
+"""Module responsible for reloading the categories of long running processes (the
+Web App, --follow) when the category file changes, rather than restarting them.
+
+The current categories are swapped atomically (read-copy-update). A reload
+compiles a whole new set, then replaces the reference to the current one. Readers
+never take a lock. They get the current set once and keep using it, so work that
+started before a reload finishes on the categories it started with."""
+from pathlib import Path
+from typing import Optional
+from typing import Tuple
+import logging
+import os
+import threading
+
+from note_categorizer.categorizer.compiled_categories import CompiledCategories
+from note_categorizer.categorizer.compiled_categories import CompiledCategoryCache
+from note_categorizer.common.diagnostics import collect_diagnostics
+
+LOGGER = logging.getLogger(__name__)
+
+
+class CategoryReloader:
+    """Holds the compiled categories of a category file, swapping in new ones when
+    the file changes"""
+
+    def __init__(self, category_path: Path, use_cache: bool = True) -> None:
+        """Compiles the category file (which must exist)"""
+        self.category_path = category_path
+        self.use_cache = use_cache
+        # Incremented by every swap
+        self.generation = 0
+
+        # Only serializes reloads. Readers never take it.
+        self._reload_lock = threading.Lock()
+        self._stop_watching = threading.Event()
+        self._stamp: Optional[Tuple[int, int]] = self._get_stamp()
+        self._compiled: CompiledCategories = self._compile()
+
+    def get(self) -> CompiledCategories:
+        """# Return
+        The current compiled categories. They are never modified, only replaced
+        by a reload, so keep using the returned set for the whole request."""
+        return self._compiled
+
+    def reload(self) -> bool:
+        """Compiles the category file and swaps it in. When compiling fails, the
+        file is still considered changed, so `reload_if_changed` retries it.
+        # Return
+        * True if the categories changed.
+        * False if the content of the file is unchanged.
+        """
+        with self._reload_lock:
+            stamp = self._get_stamp()
+            if stamp is None:
+                raise FileNotFoundError(f"The category file {self.category_path}")
+            compiled = self._compile()
+            self._stamp = stamp
+            if compiled.source_hash == self._compiled.source_hash:
+                return False
+            # A single reference assignment, so readers see one set or the other
+            self._compiled = compiled
+            self.generation += 1
+        LOGGER.info(
+            "Reloaded %d categories from %s",
+            len(compiled.categories),
+            self.category_path,
+        )
+        return True
+
+    def reload_if_changed(self) -> bool:
+        """Reloads when the modification time or size of the file changed.
+        A missing file is most likely mid-save, so the categories are kept.
+        # Return
+        True if the categories changed. False otherwise."""
+        stamp = self._get_stamp()
+        if stamp is None or stamp == self._stamp:
+            return False
+        return self.reload()
+
+    def start_watching(self, poll_interval_sec: float) -> None:
+        """Checks the file for changes every `poll_interval_sec` in a background
+        thread, until `stop_watching()`"""
+        self._stop_watching.clear()
+        threading.Thread(
+            target=self._watch,
+            args=(poll_interval_sec,),
+            name="category-reloader",
+            daemon=True,
+        ).start()
+
+    def stop_watching(self) -> None:
+        """Stops the background checks. The current categories are kept."""
+        self._stop_watching.set()
+
+    def _watch(self, poll_interval_sec: float) -> None:
+        while not self._stop_watching.wait(poll_interval_sec):
+            try:
+                self.reload_if_changed()
+            # The current categories stay in use until the file is fixed
+            except Exception:  # pylint: disable=broad-exception-caught
+                LOGGER.exception("Could not reload %s", self.category_path)
+
+    def _compile(self) -> CompiledCategories:
+        """Compiles the file. Malformed lines are summarized once per compile."""
+        with collect_diagnostics(LOGGER):
+            return CompiledCategoryCache(self.category_path, self.use_cache).load()
+
+    def _get_stamp(self) -> Optional[Tuple[int, int]]:
+        """# Return
+        * The modification time and size of the category file.
+        * None if the file currently doesn't exist."""
+        try:
+            stat_res = os.stat(self.category_path)
+        except FileNotFoundError:
+            return None
+        return (stat_res.st_mtime_ns, stat_res.st_size)
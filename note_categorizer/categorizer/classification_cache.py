@@ -0,0 +1,68 @@
+"""Module responsible for remembering which category the info of a note belongs to.
+Timesheets repeat the same info over and over (i.e. "standup"), so the keywords of
+every category only need to be scanned once per distinct info."""
+from collections import OrderedDict
+from typing import Optional
+from typing import Tuple
+
+DEFAULT_CLASSIFICATION_CACHE_SIZE = 4096
+
+# Differentiates an info that is not cached from one cached as uncategorized (None)
+_NOT_CACHED = -1
+
+
+class ClassificationCache:
+    """Bounded least-recently-used map of normalized info to the index of its
+    category. Must be cleared whenever the categories change."""
+
+    def __init__(self, max_size: int = DEFAULT_CLASSIFICATION_CACHE_SIZE) -> None:
+        """# Parameters
+        * `max_size` - The most infos remembered at once. 0 disables the cache.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Optional[int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Tuple[bool, Optional[int]]:
+        """# Return
+        A pair of
+        * True if the key is cached. False otherwise.
+        * The index of the category cached for the key (None if it had none).
+        """
+        category_idx = self._entries.get(key, _NOT_CACHED)
+        if category_idx == _NOT_CACHED:
+            self.misses += 1
+            return (False, None)
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return (True, category_idx)
+
+    def put(self, key: str, category_idx: Optional[int]) -> None:
+        """Caches the index of the category for the key (None if it had none).
+        Evicts the least recently used key when full."""
+        if self.max_size <= 0:
+            return
+        self._entries[key] = category_idx
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forgets every cached key. The hit / miss counters are kept."""
+        self._entries.clear()
+
+    def get_hit_rate(self) -> float:
+        """Returns the fraction of lookups that were cached"""
+        lookups = self.hits + self.misses
+        return 0.0 if lookups == 0 else self.hits / lookups
+
+    def stats_to_str(self) -> str:
+        """Renders the counters into a human-readable string"""
+        res = f"Classification cache: {self.hits} hits, {self.misses} misses "
+        res += f"({self.get_hit_rate():.1%} hit rate), "
+        res += f"{len(self)}/{self.max_size} entries"
+        return res
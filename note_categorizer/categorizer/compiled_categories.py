@@ -0,0 +1,249 @@
+"""Module responsible for compiling a category file once and caching the result.
+The compiled artifact is saved next to the category file and keyed by the hash of
+its content. Runs with an unchanged category file load it in a single read
+instead of re-parsing every category line: it holds the normalized keywords and
+the keyword index tables, which are restored as is. The artifact is plain json (never
+unpickled), since anyone able to write next to the category file could
+otherwise run code in every process loading it.
+
+The web app gets the category lines in every request instead, so it keeps the
+categories compiled from recent lines in memory (see `CompiledCategoryLru`)."""
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+from typing import List
+from typing import Optional
+from typing import Tuple
+import hashlib
+import json
+import os
+import threading
+
+from note_categorizer.categorizer.text_file_reader import CategoryReader
+from note_categorizer.common.category import Category
+from note_categorizer.common.keyword_index import KeywordIndex
+
+# Bump whenever the structure of CompiledCategories (or Category) changes so stale
+# artifacts are recompiled rather than loaded.
+COMPILED_CATEGORIES_VERSION = 4
+
+DEFAULT_COMPILED_CATEGORY_LRU_SIZE = 64
+
+
+class CompiledCategories:
+    """Represents a category set that is ready to categorize notes. Never modified
+    once compiled (the keyword index is only built once), so threads share it."""
+
+    def __init__(
+        self,
+        source_hash: str,
+        categories: Tuple[Category, ...],
+        keyword_index: Optional[KeywordIndex] = None,
+    ) -> None:
+        """# Parameters
+        * `keyword_index` - The index of the categories, when already built.
+        Otherwise it is built on first use."""
+        # Hash of the category file content the categories were compiled from
+        self.source_hash = source_hash
+        self.categories = categories
+        self._keyword_index = keyword_index
+        self._keyword_index_lock = threading.Lock()
+
+    @property
+    def keyword_index(self) -> KeywordIndex:
+        """The index used for whole word matching. Substring matching never
+        needs it, so it is only built when first used."""
+        with self._keyword_index_lock:
+            if self._keyword_index is None:
+                self._keyword_index = KeywordIndex(self.categories)
+            return self._keyword_index
+
+    @classmethod
+    def compile(
+        cls, category_lines: List[str], source_hash: str
+    ) -> "CompiledCategories":
+        """Compiles the lines of a category file"""
+        categories = CategoryReader.categories_from_lines(category_lines)
+        return CompiledCategories(source_hash, tuple(categories))
+
+    @classmethod
+    def hash_content(cls, content: bytes) -> str:
+        """Returns the hash used to key the compiled artifact of category content"""
+        return hashlib.sha256(content).hexdigest()
+
+    def get_category_list(self) -> List[Category]:
+        """Returns a (new) list of the compiled categories"""
+        return list(self.categories)
+
+
+class CompiledCategoryCache(CategoryReader):
+    """Loads the compiled categories of a category file, using the artifact saved
+    next to it when it matches the file's content."""
+
+    def __init__(self, file_path: Path, use_cache: bool = True):
+        """Validates the file exists"""
+        super().__init__(file_path)
+        self.use_cache = use_cache
+
+    def generate_list(self) -> List[Category]:
+        """Returns the categories of the file, compiled or loaded from the artifact"""
+        return self.load().get_category_list()
+
+    def get_artifact_path(self) -> Path:
+        """Returns the path the compiled artifact is saved at"""
+        return self.file_path.parent / f".{self.file_path.name}.compiled"
+
+    def load(self) -> CompiledCategories:
+        """Loads the compiled categories, compiling (and saving) them when there is
+        no artifact for the current content of the category file."""
+        with open(self.file_path, "rb") as category_file:
+            content: bytes = category_file.read()
+        source_hash = CompiledCategories.hash_content(content)
+
+        if self.use_cache:
+            cached: Optional[CompiledCategories] = self._read_artifact(source_hash)
+            if cached is not None:
+                return cached
+
+        category_lines = content.decode("utf-8").splitlines(keepends=True)
+        compiled = CompiledCategories.compile(category_lines, source_hash)
+        if self.use_cache:
+            self._write_artifact(compiled)
+        return compiled
+
+    def _read_artifact(self, source_hash: str) -> Optional[CompiledCategories]:
+        """# Return
+        * The compiled categories saved in the artifact.
+        * None if there is no artifact, or it is stale / unreadable."""
+        try:
+            with open(self.get_artifact_path(), "r", encoding="utf-8") as artifact_file:
+                artifact = json.load(artifact_file)
+        # A corrupt artifact is no different from a missing one. Recompile.
+        except (OSError, ValueError):
+            return None
+
+        if (
+            not isinstance(artifact, dict)
+            or artifact.get("version") != COMPILED_CATEGORIES_VERSION
+            or artifact.get("source_hash") != source_hash
+        ):
+            return None
+        categories = _categories_from_json(artifact.get("categories"))
+        keyword_index = KeywordIndex.from_json(artifact.get("keyword_index"))
+        if categories is None or keyword_index is None:
+            return None
+        return CompiledCategories(source_hash, tuple(categories), keyword_index)
+
+    def _write_artifact(self, compiled: CompiledCategories) -> None:
+        """Saves the artifact. Written to a temporary file then renamed, so other
+        runs never see a partially written artifact. The keyword index is built
+        for it, so runs of either match mode load it rather than build it."""
+        artifact_path = self.get_artifact_path()
+        tmp_path = artifact_path.with_name(f"{artifact_path.name}.{os.getpid()}.tmp")
+        artifact = {
+            "version": COMPILED_CATEGORIES_VERSION,
+            "source_hash": compiled.source_hash,
+            "categories": [
+                {"name": category.name, "keywords": category.get_keywords()}
+                for category in compiled.categories
+            ],
+            "keyword_index": compiled.keyword_index.to_json(),
+        }
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as artifact_file:
+                json.dump(artifact, artifact_file)
+            os.replace(tmp_path, artifact_path)
+        except OSError as err:
+            # i.e. the directory is read-only. The run still works, just uncached.
+            print(f"Could not save compiled categories to {artifact_path}: {err}")
+
+
+def _categories_from_json(categories_json: Any) -> Optional[List[Category]]:
+    """# Return
+    * The categories of the artifact.
+    * None if they are not a list of `{"name": str, "keywords": [str]}`."""
+    if not isinstance(categories_json, list):
+        return None
+    categories: List[Category] = []
+    for category_json in categories_json:
+        if not _is_category_json(category_json):
+            return None
+        categories.append(
+            Category.from_compiled(category_json["name"], category_json["keywords"])
+        )
+    return categories
+
+
+def _is_category_json(category_json: Any) -> bool:
+    return (
+        isinstance(category_json, dict)
+        and isinstance(category_json.get("name"), str)
+        and isinstance(category_json.get("keywords"), list)
+        and all(isinstance(keyword, str) for keyword in category_json["keywords"])
+    )
+
+
+class CompiledCategoryLru:
+    """Bounded least-recently-used map of category lines to their compiled
+    categories. Compiled categories are never modified once compiled, so every
+    (concurrent) user of the same lines shares them. Thread-safe."""
+
+    def __init__(self, max_size: int = DEFAULT_COMPILED_CATEGORY_LRU_SIZE) -> None:
+        """# Parameters
+        * `max_size` - The most category sets kept at once. 0 disables the cache.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, CompiledCategories]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @classmethod
+    def hash_lines(cls, category_lines: List[str]) -> str:
+        """# Return
+        The hash of the category lines, ignoring surrounding whitespace and blank
+        lines (which don't change the compiled categories)."""
+        normalized_lines = [line.strip() for line in category_lines]
+        normalized_content = "\n".join(line for line in normalized_lines if line)
+        return CompiledCategories.hash_content(normalized_content.encode("utf-8"))
+
+    def get(self, category_lines: List[str]) -> CompiledCategories:
+        """# Return
+        The compiled categories of the lines. Compiled (and cached) on a miss.
+        Malformed lines are only reported when they get compiled."""
+        source_hash = self.hash_lines(category_lines)
+        with self._lock:
+            cached: Optional[CompiledCategories] = self._entries.get(source_hash)
+            if cached is not None:
+                self.hits += 1
+                self._entries.move_to_end(source_hash)
+                return cached
+            self.misses += 1
+
+        # Compiled without the lock, so other category sets aren't held up. When
+        # the same lines are compiled concurrently, the first one cached is shared.
+        compiled = CompiledCategories.compile(category_lines, source_hash)
+        if self.max_size <= 0:
+            return compiled
+        with self._lock:
+            compiled = self._entries.setdefault(source_hash, compiled)
+            self._entries.move_to_end(source_hash)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return compiled
+
+    def clear(self) -> None:
+        """Forgets every compiled category set. The hit / miss counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats_to_str(self) -> str:
+        """Renders the counters into a human-readable string"""
+        lookups = self.hits + self.misses
+        hit_rate = 0.0 if lookups == 0 else self.hits / lookups
+        res = f"Compiled categories: {self.hits} hits, {self.misses} misses "
+        res += f"({hit_rate:.1%} hit rate), {len(self)}/{self.max_size} entries"
+        return res
@@ -0,0 +1,187 @@
+"""A resident process that runs categorizer_cli on behalf of its (thin) client,
+see daemon_client.py. Every call of the cli otherwise pays for starting python,
+importing the project and loading the categories. The daemon does that once and
+keeps the compiled categories and classification caches warm between runs.
+
+Listens on a Unix domain socket only the user can access. Requests are one line
+of json (`{"argv": [...], "cwd": "..."}`) answered by one line of json with the
+output and exit code of the run, or `{"fallback": true}` when the run needs the
+terminal and the client should run it itself."""
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+import argparse
+import io
+import logging
+import os
+import signal
+import socket
+import socketserver
+import sys
+import traceback
+
+from note_categorizer.categorizer import main as cli_main
+from note_categorizer.categorizer.json_lines import decode_message
+from note_categorizer.categorizer.json_lines import encode_message
+from note_categorizer.categorizer.daemon_client import get_default_socket_path
+from note_categorizer.categorizer.parser import RequiresTerminal
+from note_categorizer.common.common_utils import CommonUtils
+
+
+class CategorizerDaemon(socketserver.UnixStreamServer):
+    """Serves one run at a time. Runs change the working directory and redirect
+    the output of this process, so they can't overlap."""
+
+    def __init__(self, socket_path: Path) -> None:
+        """Binds the socket. Only the user can connect to it."""
+        self.socket_path = socket_path
+        self.warm_caches = cli_main.WarmCaches()
+        self._daemon_cwd = os.getcwd()
+        self._last_request_cwd: Optional[str] = None
+        previous_umask = os.umask(0o177)
+        try:
+            super().__init__(str(socket_path), _DaemonRequestHandler)
+        finally:
+            os.umask(previous_umask)
+
+    def server_close(self) -> None:
+        """Stops listening and removes the socket"""
+        super().server_close()
+        self.socket_path.unlink(missing_ok=True)
+
+    def run_request(self, argv: List[str], cwd: str) -> Dict[str, Any]:
+        """Runs the cli args as if from `cwd`.
+        # Return
+        The response to the client"""
+        # The default file paths are relative to the repo of the working directory
+        if cwd != self._last_request_cwd:
+            CommonUtils.project_root_abs_path = None
+            self._last_request_cwd = cwd
+
+        stdout_buffer = io.StringIO()
+        stderr_buffer = io.StringIO()
+        log_handler = logging.StreamHandler(stderr_buffer)
+        log_handler.setFormatter(logging.Formatter(cli_main.LOG_FORMAT))
+        root_logger = logging.getLogger()
+        root_logger.addHandler(log_handler)
+        exit_code = 0
+        try:
+            os.chdir(cwd)
+            with redirect_stdout(stdout_buffer), redirect_stderr(stderr_buffer):
+                cli_main.run_cli(argv, self.warm_caches)
+        except RequiresTerminal:
+            return {"fallback": True}
+        except SystemExit as err:
+            exit_code = _get_exit_code(err, stderr_buffer)
+        # A failed run must not take down the daemon. Report it like python would.
+        except Exception:  # pylint: disable=broad-exception-caught
+            stderr_buffer.write(traceback.format_exc())
+            exit_code = 1
+        finally:
+            root_logger.removeHandler(log_handler)
+            os.chdir(self._daemon_cwd)
+
+        return {
+            "stdout": stdout_buffer.getvalue(),
+            "stderr": stderr_buffer.getvalue(),
+            "exit_code": exit_code,
+        }
+
+
+class _DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """Handles a single run requested by a client"""
+
+    server: CategorizerDaemon
+
+    def handle(self) -> None:
+        request_line = self.rfile.readline()
+        # i.e. a probe of whether the daemon is running
+        if len(request_line) == 0:
+            return
+        request = decode_message(request_line)
+        if (
+            request is None
+            or not isinstance(request.get("argv"), list)
+            or not isinstance(request.get("cwd"), str)
+        ):
+            response: Dict[str, Any] = {"fallback": True}
+        else:
+            response = self.server.run_request(
+                [str(arg) for arg in request["argv"]], request["cwd"]
+            )
+        self.wfile.write(encode_message(response))
+
+
+def _get_exit_code(err: SystemExit, stderr_buffer: io.StringIO) -> int:
+    """# Return
+    The exit code of the process, had it exited. Messages go to stderr."""
+    if err.code is None:
+        return 0
+    if isinstance(err.code, int):
+        return err.code
+    stderr_buffer.write(f"{err.code}\n")
+    return 1
+
+
+def is_daemon_running(socket_path: Path) -> bool:
+    """# Return
+    True if a daemon is listening on the socket. False otherwise."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            probe.connect(str(socket_path))
+    except OSError:
+        return False
+    return True
+
+
+def _exit_on_sigterm(_signum: int, _frame: Any) -> None:
+    """Exits cleanly (removing the socket) when stopped, i.e. by systemd"""
+    sys.exit(0)
+
+
+def main() -> None:
+    """Entry to categorizer_daemon. Serves until interrupted or terminated."""
+    parser = argparse.ArgumentParser(
+        description="Keeps categorizer_cli warm. Runs of categorizer_cli are "
+        + "forwarded to it while it is running."
+    )
+    parser.add_argument(
+        "--socket_path",
+        default=get_default_socket_path(),
+        type=Path,
+        help="Path of the Unix socket to listen on. Defaults to the path\
+                        categorizer_cli connects to.",
+    )
+    socket_path: Optional[Path] = parser.parse_args().socket_path
+    if socket_path is None:
+        print("The daemon is disabled. Pass --socket_path.")
+        sys.exit(1)
+    if is_daemon_running(socket_path):
+        print(f"A daemon is already listening on {socket_path}")
+        sys.exit(1)
+    # Only the user can access the directory, if it has to be made (i.e. the
+    # default one in the temp dir)
+    socket_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if socket_path.parent.stat().st_uid not in (os.getuid(), 0):
+        # Its owner could swap the socket for their own
+        print(f"{socket_path.parent} belongs to another user. Pass --socket_path.")
+        sys.exit(1)
+    # Left behind by a daemon that did not shut down cleanly
+    socket_path.unlink(missing_ok=True)
+
+    daemon = CategorizerDaemon(socket_path)
+    signal.signal(signal.SIGTERM, _exit_on_sigterm)
+    print(f"Listening on {socket_path}. Press Ctrl+C to stop.")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.server_close()
+
+
+if __name__ == "__main__":
+    main()
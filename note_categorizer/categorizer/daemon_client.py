@@ -0,0 +1,115 @@
+"""Entry of categorizer_cli. Forwards the cli args to the daemon (see daemon.py)
+when one is running, and prints its output. Otherwise (or when the run needs
+the terminal, i.e. to prompt for unknown notes) runs the cli in this process.
+
+Only imports the standard library (and json_lines.py, which does too), so
+forwarding to the daemon skips the import cost of the rest of the project."""
+from pathlib import Path
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+import os
+import socket
+import stat
+import sys
+import tempfile
+
+from note_categorizer.categorizer.json_lines import decode_message
+from note_categorizer.categorizer.json_lines import encode_message
+
+# Overrides the socket path of the daemon. Set to an empty string to never use it.
+SOCKET_PATH_ENV = "NOTE_CATEGORIZER_SOCKET"
+
+
+class DaemonResponse(NamedTuple):
+    """The outcome of a run within the daemon"""
+
+    stdout: str
+    stderr: str
+    exit_code: int
+
+
+def get_default_socket_path() -> Optional[Path]:
+    """# Return
+    * The path of the daemon's socket. One per user.
+    * None if the daemon is disabled (see SOCKET_PATH_ENV)."""
+    socket_path_str = os.environ.get(SOCKET_PATH_ENV)
+    if socket_path_str is not None:
+        return Path(socket_path_str) if socket_path_str != "" else None
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir is not None:
+        return Path(runtime_dir) / f"note_categorizer_{os.getuid()}.sock"
+    # Every user shares the temp dir, so the socket goes in a directory of its own
+    # which only the user can access (see `is_private_to_user`)
+    return (
+        Path(tempfile.gettempdir()) / f"note_categorizer_{os.getuid()}" / "daemon.sock"
+    )
+
+
+def is_private_to_user(path: Path) -> bool:
+    """# Return
+    True if the path is owned by the current user and no other user can access it.
+    False otherwise (or if it doesn't exist). Symlinks are not followed."""
+    try:
+        path_stat = os.lstat(path)
+    except OSError:
+        return False
+    return (
+        path_stat.st_uid == os.getuid()
+        and not stat.S_ISLNK(path_stat.st_mode)
+        and stat.S_IMODE(path_stat.st_mode) & 0o077 == 0
+    )
+
+
+def send_request(
+    argv: List[str], cwd: str, socket_path: Path
+) -> Optional[DaemonResponse]:
+    """Runs the cli args within the daemon.
+    # Return
+    * The output of the run.
+    * None if no daemon is running, or the run has to happen in this process.
+    The socket must belong to the user, so another user can't pose as the daemon
+    and read the args (or feed back output)."""
+    if not is_private_to_user(socket_path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as daemon_socket:
+            daemon_socket.connect(str(socket_path))
+            daemon_socket.sendall(encode_message({"argv": argv, "cwd": cwd}))
+            with daemon_socket.makefile("rb") as response_file:
+                response = decode_message(response_file.readline())
+    except OSError:
+        # i.e. no socket, or a stale one left by a daemon that was killed
+        return None
+
+    if response is None or response.get("fallback") is True:
+        return None
+    return DaemonResponse(
+        response.get("stdout", ""),
+        response.get("stderr", ""),
+        response.get("exit_code", 1),
+    )
+
+
+def main() -> None:
+    """Entry to categorizer_cli"""
+    socket_path = get_default_socket_path()
+    response: Optional[DaemonResponse] = None
+    if socket_path is not None:
+        response = send_request(sys.argv[1:], os.getcwd(), socket_path)
+
+    if response is None:
+        # Only imported when needed, so forwarding to the daemon stays fast
+        # pylint: disable=import-outside-toplevel
+        from note_categorizer.categorizer import main as cli_main
+
+        cli_main.main()
+        return
+
+    sys.stdout.write(response.stdout)
+    sys.stderr.write(response.stderr)
+    sys.exit(response.exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,600 @@
+"""Module responsible for categorizing many notes files across several hosts
+(i.e. re-categorizing years of notes of many people). A coordinator splits the
+notes files into shards and sends them to workers (categorizer_worker) over TCP.
+Workers parse the notes with the same code as a local run and answer with the
+totals and unknown notes of each file. The coordinator merges them like
+MultiFileCategorizer does.
+
+Messages are one line of json each way (see json_lines.py):
+* `{"type": "categories", "category_lines": [...], "match_mode": "..."}` is sent
+once per connection. Workers compile each distinct category set once, and
+answer with its hash so both sides know they agree.
+* `{"type": "shard", "shard_id": <id>, "files": [{"path": ..., "content": ...}]}`
+is answered by `{"shard_id": <id>, "summaries": [...]}`, one per file.
+* `{"error": "..."}` answers a message the worker could not handle.
+
+Shards are sized by the bytes of their files. Files too large for a message fail
+the run up front, as no worker could take them. Shards that fail (i.e. the worker
+died, timed out or answered an error) are retried on another worker. Workers
+have no authentication, so only run them on a trusted network."""
+from collections import deque
+from pathlib import Path
+from typing import Any
+from typing import Deque
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+import argparse
+import logging
+import os
+import socket
+import socketserver
+import threading
+
+from note_categorizer.categorizer.compiled_categories import CompiledCategories
+from note_categorizer.categorizer.compiled_categories import CompiledCategoryLru
+from note_categorizer.categorizer.json_lines import decode_message
+from note_categorizer.categorizer.json_lines import encode_message
+from note_categorizer.categorizer.multi_file_reader import FileSummary
+from note_categorizer.categorizer.multi_file_reader import MultiFileCategorizer
+from note_categorizer.categorizer.multi_file_reader import summarize_note_lines
+from note_categorizer.categorizer.parser import TerminalParser
+from note_categorizer.common.category import Category
+from note_categorizer.common.keyword_index import MatchMode
+from note_categorizer.common.notes import Note
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_WORKER_PORT = 53692
+# Bytes of notes files sent to a worker at once. A larger file is sent alone.
+DEFAULT_SHARD_BYTES = 16 * 1024 * 1024
+# Attempts at a shard (across all workers) before the run fails
+DEFAULT_MAX_SHARD_ATTEMPTS = 3
+DEFAULT_SHARD_TIMEOUT_SEC = 600.0
+# Consecutive failed connections before a worker is given up on
+MAX_CONNECT_ATTEMPTS = 3
+RECONNECT_DELAY_SEC = 1.0
+MAX_MESSAGE_BYTES = 256 * 1024 * 1024
+
+WorkerAddress = Tuple[str, int]
+
+
+class DistributedRunFailed(Exception):
+    """Raised when a shard failed on every attempt, or no worker is left"""
+
+
+class WorkerError(Exception):
+    """Raised when a worker answers with an error, or not as expected"""
+
+
+class MessageTooLarge(ValueError):
+    """Raised instead of sending a message over MAX_MESSAGE_BYTES, which the
+    worker would refuse"""
+
+    def __init__(self, message_bytes: int) -> None:
+        super().__init__(
+            f"The message is {message_bytes} bytes, over the {MAX_MESSAGE_BYTES} "
+            + "bytes a worker takes at once"
+        )
+        self.message_bytes = message_bytes
+
+
+class CategorizerWorker(socketserver.ThreadingTCPServer):
+    """Categorizes the shards of coordinators. Each connection is served by its
+    own thread, so a host can take several coordinators (or connections) at
+    once."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address: WorkerAddress) -> None:
+        """Binds the address. Port 0 picks a free port (see `server_address`)."""
+        # Shared by every connection, so each category set is compiled once
+        self.compiled_categories = CompiledCategoryLru()
+        self.shards_done = 0
+        self._shards_done_lock = threading.Lock()
+        super().__init__(address, _WorkerRequestHandler)
+
+    def summarize_file(
+        self,
+        path: str,
+        content: str,
+        compiled_categories: CompiledCategories,
+        match_mode: MatchMode,
+    ) -> FileSummary:
+        """Parses and totals the content of a notes file"""
+        parser = TerminalParser.from_compiled_categories(
+            compiled_categories, None, False, match_mode
+        )
+        return summarize_note_lines(
+            Path(path), content.splitlines(keepends=True), parser
+        )
+
+    def on_shard_done(self) -> None:
+        """Counts the shard"""
+        with self._shards_done_lock:
+            self.shards_done += 1
+
+
+class _WorkerRequestHandler(socketserver.StreamRequestHandler):
+    """Handles the messages of a single coordinator connection"""
+
+    server: CategorizerWorker
+
+    def setup(self) -> None:
+        super().setup()
+        # Set by the categories message
+        self.compiled_categories: Optional[CompiledCategories] = None
+        self.match_mode = MatchMode.SUBSTRING
+
+    def handle(self) -> None:
+        while True:
+            request_line = self.rfile.readline(MAX_MESSAGE_BYTES + 1)
+            if len(request_line) == 0:
+                return
+            request = _decode_bounded_message(request_line)
+            if request is None:
+                self.wfile.write(encode_message({"error": "Invalid message"}))
+                return
+            self.wfile.write(encode_message(self._get_response(request)))
+
+    def _get_response(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """# Return
+        The answer to the message"""
+        try:
+            if request.get("type") == "categories":
+                return self._set_categories(request)
+            if request.get("type") == "shard":
+                return self._run_shard(request)
+        # Reported to the coordinator, which retries the shard elsewhere
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            LOGGER.exception("Could not handle a %s message", request.get("type"))
+            return {"error": f"{type(err).__name__}: {err}"}
+        return {"error": f"Unknown message type {request.get('type')}"}
+
+    def _set_categories(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        self.compiled_categories = self.server.compiled_categories.get(
+            [str(line) for line in request["category_lines"]]
+        )
+        self.match_mode = MatchMode(request["match_mode"])
+        return {"source_hash": self.compiled_categories.source_hash}
+
+    def _run_shard(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if self.compiled_categories is None:
+            return {"error": "The categories must be sent before any shard"}
+        summaries = [
+            _summary_to_json(
+                self.server.summarize_file(
+                    file_json["path"],
+                    file_json["content"],
+                    self.compiled_categories,
+                    self.match_mode,
+                )
+            )
+            for file_json in request["files"]
+        ]
+        self.server.on_shard_done()
+        return {"shard_id": request["shard_id"], "summaries": summaries}
+
+
+def _decode_bounded_message(line: bytes) -> Optional[Dict[str, Any]]:
+    """# Return
+    * The message of the line.
+    * None if the line is not a message (i.e. cut off at MAX_MESSAGE_BYTES)."""
+    return decode_message(line) if len(line) <= MAX_MESSAGE_BYTES else None
+
+
+def _summary_to_json(summary: FileSummary) -> Dict[str, Any]:
+    """Categories are sent by name. Unknown notes are sent as note strings."""
+    return {
+        "path": str(summary.path),
+        "category_time": {
+            category.name: minutes
+            for category, minutes in summary.category_time.items()
+        },
+        "category_note_count": {
+            category.name: note_count
+            for category, note_count in summary.category_note_count.items()
+        },
+        "unknown_notes": [str(note) for note in summary.unknown_notes],
+        "problems_summary": summary.problems_summary,
+    }
+
+
+def _summary_from_json(
+    summary_json: Dict[str, Any], path: Path, category_by_name: Dict[str, Category]
+) -> FileSummary:
+    """# Return
+    The summary of the file at `path`, with the coordinator's categories"""
+    unknown_notes = [
+        Note.from_str(note_str) for note_str in summary_json["unknown_notes"]
+    ]
+    return FileSummary(
+        path,
+        {
+            category_by_name[name]: int(minutes)
+            for name, minutes in summary_json["category_time"].items()
+        },
+        {
+            category_by_name[name]: int(note_count)
+            for name, note_count in summary_json["category_note_count"].items()
+        },
+        [note for note in unknown_notes if note is not None],
+        str(summary_json["problems_summary"]),
+    )
+
+
+class _WorkerConnection:
+    """A coordinator's connection to a worker, with the categories already sent"""
+
+    def __init__(self, address: WorkerAddress, timeout_sec: float) -> None:
+        self.address = address
+        self._sock = socket.create_connection(address, timeout=timeout_sec)
+        self._reader = self._sock.makefile("rb")
+
+    def request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """# Return
+        The worker's answer to the message. Raises WorkerError on an error, and
+        MessageTooLarge (without sending it) if the message is too large."""
+        message_bytes = encode_message(message)
+        if len(message_bytes) > MAX_MESSAGE_BYTES:
+            raise MessageTooLarge(len(message_bytes))
+        self._sock.sendall(message_bytes)
+        response_line = self._reader.readline(MAX_MESSAGE_BYTES + 1)
+        if len(response_line) == 0:
+            raise WorkerError("The worker closed the connection")
+        response = _decode_bounded_message(response_line)
+        if response is None:
+            raise WorkerError("The worker answered an invalid message")
+        if "error" in response:
+            raise WorkerError(str(response["error"]))
+        return response
+
+    def close(self) -> None:
+        """Closes the connection"""
+        self._reader.close()
+        self._sock.close()
+
+
+# pylint: disable=too-many-instance-attributes
+class _ShardQueue:
+    """The shards of a run, shared by the threads sending them to workers.
+    A failed shard goes back in the queue, to be taken by a worker it hasn't
+    failed on (or any worker, once it failed on every one left)."""
+
+    def __init__(
+        self, shard_count: int, workers: List[WorkerAddress], max_attempts: int
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.live_workers: Set[WorkerAddress] = set(workers)
+        self.failure: Optional[str] = None
+        self._pending: Deque[int] = deque(range(shard_count))
+        self._attempts: Dict[int, int] = {}
+        self._failed_on: Dict[int, Set[WorkerAddress]] = {}
+        # Summaries of the completed shards, until they are handed over
+        self._results: Dict[int, List[Dict[str, Any]]] = {}
+        self._completed_count = 0
+        self._shard_count = shard_count
+        self._changed = threading.Condition()
+
+    def is_finished(self) -> bool:
+        """Must be called holding the condition"""
+        return self.failure is not None or self._completed_count == self._shard_count
+
+    def take(self, worker: WorkerAddress) -> Optional[int]:
+        """Waits for a shard the worker may take.
+        # Return
+        * The id of the shard.
+        * None once the run is finished."""
+        with self._changed:
+            while not self.is_finished():
+                for shard_id in self._pending:
+                    failed_on = self._failed_on.get(shard_id, set())
+                    if worker not in failed_on or self.live_workers <= failed_on:
+                        self._pending.remove(shard_id)
+                        return shard_id
+                self._changed.wait()
+            return None
+
+    def complete(self, shard_id: int, summaries: List[Dict[str, Any]]) -> None:
+        """Stores the summaries of the shard"""
+        with self._changed:
+            self._results[shard_id] = summaries
+            self._completed_count += 1
+            self._changed.notify_all()
+
+    def retry(self, shard_id: int, worker: WorkerAddress, reason: str) -> None:
+        """Queues the shard again, or fails the run past the most attempts"""
+        with self._changed:
+            self._attempts[shard_id] = self._attempts.get(shard_id, 0) + 1
+            self._failed_on.setdefault(shard_id, set()).add(worker)
+            if self._attempts[shard_id] >= self.max_attempts:
+                self.fail(
+                    f"Shard {shard_id} failed {self.max_attempts} times: {reason}"
+                )
+            else:
+                self._pending.append(shard_id)
+            self._changed.notify_all()
+
+    def remove_worker(self, worker: WorkerAddress) -> None:
+        """Stops counting on the worker. Fails the run when none are left."""
+        with self._changed:
+            self.live_workers.discard(worker)
+            if len(self.live_workers) == 0 and not self.is_finished():
+                self.fail("Could not reach any worker")
+            self._changed.notify_all()
+
+    def fail(self, reason: str) -> None:
+        """Stops the run. The first reason is kept."""
+        with self._changed:
+            if self.failure is None:
+                self.failure = reason
+            self._changed.notify_all()
+
+    def wait_until_finished(self, timeout_sec: float) -> bool:
+        """# Return
+        True if the run finished within the timeout. False otherwise."""
+        with self._changed:
+            return self._changed.wait_for(self.is_finished, timeout=timeout_sec)
+
+    def wait_for_shard(self, shard_id: int) -> List[Dict[str, Any]]:
+        """# Return
+        The summaries of the shard, once done. Raises DistributedRunFailed if
+        the run failed first."""
+        with self._changed:
+            self._changed.wait_for(
+                lambda: shard_id in self._results or self.failure is not None
+            )
+            if self.failure is not None:
+                raise DistributedRunFailed(self.failure)
+            return self._results.pop(shard_id)
+
+
+class DistributedCategorizer(MultiFileCategorizer):
+    """Categorizes many notes files on remote workers and merges their totals"""
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        category_list: List[Category],
+        category_lines: List[str],
+        note_paths: List[Path],
+        workers: List[WorkerAddress],
+        *,
+        match_mode: MatchMode = MatchMode.SUBSTRING,
+        shard_bytes: int = DEFAULT_SHARD_BYTES,
+        max_attempts: int = DEFAULT_MAX_SHARD_ATTEMPTS,
+        timeout_sec: float = DEFAULT_SHARD_TIMEOUT_SEC,
+    ) -> None:
+        """# Parameters
+        * `category_lines` - The lines `category_list` was compiled from. Sent
+        to the workers, which compile them once.
+        * `workers` - The host and port of every worker. Each works on one
+        shard at a time.
+        * `shard_bytes` - The most bytes of notes files in a shard (unless a
+        single file is larger).
+        """
+        super().__init__(category_list, note_paths, len(workers), match_mode)
+        self.category_lines = category_lines
+        self.workers = workers
+        self.shard_bytes = shard_bytes
+        self.max_attempts = max_attempts
+        self.timeout_sec = timeout_sec
+
+    def iter_file_summaries(self) -> Iterator[FileSummary]:
+        """Yields the summary of every notes file, in the order of the paths.
+        Raises DistributedRunFailed if a shard could not be categorized."""
+        shards = self._split_into_shards()
+        shard_queue = _ShardQueue(len(shards), self.workers, self.max_attempts)
+        category_by_name = {category.name: category for category in self.category_list}
+        threads = [
+            threading.Thread(
+                target=self._send_shards,
+                args=(worker, shards, shard_queue),
+                name=f"worker-{worker[0]}:{worker[1]}",
+                daemon=True,
+            )
+            for worker in self.workers
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for shard_id, shard_paths in enumerate(shards):
+                summaries_json = shard_queue.wait_for_shard(shard_id)
+                for path, summary_json in zip(shard_paths, summaries_json):
+                    yield _summary_from_json(summary_json, path, category_by_name)
+        finally:
+            # Stops the threads when the caller stopped early or a shard failed.
+            # Threads mid-shard stop once their worker answers.
+            shard_queue.fail("The run was stopped")
+
+    def _split_into_shards(self) -> List[List[Path]]:
+        """Groups the notes files, in order, into shards of up to `shard_bytes`.
+        Raises DistributedRunFailed for a file too large to send to a worker.
+        # Return
+        The paths of each shard."""
+        shards: List[List[Path]] = []
+        shard_bytes = 0
+        for path in self.note_paths:
+            try:
+                file_bytes = os.stat(path).st_size
+            except OSError:
+                # Reported once the shard is read (see `_read_shard_files`)
+                file_bytes = 0
+            if file_bytes > MAX_MESSAGE_BYTES:
+                raise DistributedRunFailed(_get_too_large_reason([path], file_bytes))
+            if len(shards) == 0 or shard_bytes + file_bytes > self.shard_bytes:
+                shards.append([])
+                shard_bytes = 0
+            shards[-1].append(path)
+            shard_bytes += file_bytes
+        return shards
+
+    def _send_shards(
+        self, worker: WorkerAddress, shards: List[List[Path]], shard_queue: _ShardQueue
+    ) -> None:
+        """Sends shards to the worker, one at a time, until the run finishes.
+        Runs in its own thread. Fails the run if the thread dies, so the run
+        never waits on a shard no thread will send."""
+        try:
+            self._send_shards_until_finished(worker, shards, shard_queue)
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            LOGGER.exception("Sending shards to worker %s failed", worker)
+            shard_queue.fail(f"Sending shards to worker {worker} failed: {err!r}")
+
+    def _send_shards_until_finished(
+        self, worker: WorkerAddress, shards: List[List[Path]], shard_queue: _ShardQueue
+    ) -> None:
+        """See `_send_shards`"""
+        connection: Optional[_WorkerConnection] = None
+        connect_failures = 0
+        while True:
+            if connection is None:
+                try:
+                    connection = self._connect(worker)
+                    connect_failures = 0
+                except (OSError, WorkerError) as err:
+                    connect_failures += 1
+                    LOGGER.warning("Could not connect to worker %s: %s", worker, err)
+                    if connect_failures >= MAX_CONNECT_ATTEMPTS:
+                        shard_queue.remove_worker(worker)
+                        return
+                    if shard_queue.wait_until_finished(RECONNECT_DELAY_SEC):
+                        return
+                    continue
+
+            shard_id = shard_queue.take(worker)
+            if shard_id is None:
+                connection.close()
+                return
+            files_json = _read_shard_files(shards[shard_id], shard_queue)
+            if files_json is None:
+                connection.close()
+                return
+            try:
+                response = connection.request(
+                    {"type": "shard", "shard_id": shard_id, "files": files_json}
+                )
+                summaries_json = response["summaries"]
+                if len(summaries_json) != len(shards[shard_id]):
+                    raise WorkerError("The worker skipped files of the shard")
+            except MessageTooLarge as err:
+                # No worker would take it, so retrying is pointless
+                shard_queue.fail(
+                    _get_too_large_reason(shards[shard_id], err.message_bytes)
+                )
+                connection.close()
+                return
+            except (OSError, WorkerError, KeyError, TypeError) as err:
+                LOGGER.warning(
+                    "Shard %d failed on worker %s: %s", shard_id, worker, err
+                )
+                shard_queue.retry(shard_id, worker, str(err))
+                # The connection may be left mid-message, so start a new one
+                connection.close()
+                connection = None
+                continue
+            shard_queue.complete(shard_id, summaries_json)
+
+    def _connect(self, worker: WorkerAddress) -> _WorkerConnection:
+        """# Return
+        A connection to the worker, which has the categories of the run"""
+        connection = _WorkerConnection(worker, self.timeout_sec)
+        try:
+            response = connection.request(
+                {
+                    "type": "categories",
+                    "category_lines": self.category_lines,
+                    "match_mode": self.match_mode.value,
+                }
+            )
+            if response.get("source_hash") != CompiledCategoryLru.hash_lines(
+                self.category_lines
+            ):
+                raise WorkerError("The worker compiled different categories")
+        except (OSError, WorkerError):
+            connection.close()
+            raise
+        return connection
+
+
+def _get_too_large_reason(shard_paths: List[Path], shard_bytes: int) -> str:
+    """# Return
+    Why the notes files can't be sent to a worker"""
+    paths_str = ", ".join(str(path) for path in shard_paths)
+    if len(shard_paths) > 1:
+        paths_str = f"The shard of {paths_str}"
+    return (
+        f"{paths_str} is {shard_bytes} bytes once sent, over the "
+        + f"{MAX_MESSAGE_BYTES} bytes a worker takes at once. Split it, or "
+        + "categorize it without --workers."
+    )
+
+
+def _read_shard_files(
+    shard_paths: List[Path], shard_queue: _ShardQueue
+) -> Optional[List[Dict[str, str]]]:
+    """Reads the notes files of a shard. A file that can't be read (i.e. is
+    missing or not UTF-8) would fail on every worker, so the run fails instead.
+    # Return
+    * The path and content of each file, as sent to the worker.
+    * None if a file could not be read."""
+    files_json: List[Dict[str, str]] = []
+    for path in shard_paths:
+        try:
+            with open(path, "r", encoding="utf-8") as notes_file:
+                files_json.append({"path": str(path), "content": notes_file.read()})
+        except (OSError, ValueError) as err:
+            shard_queue.fail(f"Could not read the notes file {path}: {err}")
+            return None
+    return files_json
+
+
+def parse_worker_address(address_str: str) -> Optional[WorkerAddress]:
+    """Parses HOST:PORT (or just HOST, for the default port)
+    # Return
+    * The host and port.
+    * None if it is not a valid address."""
+    host, _, port_str = address_str.rpartition(":")
+    if len(host) == 0:
+        return (address_str, DEFAULT_WORKER_PORT) if len(address_str) > 0 else None
+    if not port_str.isdigit() or not 0 < int(port_str) < 65536:
+        return None
+    return (host.strip("[]"), int(port_str))
+
+
+def main() -> None:
+    """Entry to categorizer_worker. Serves coordinators until interrupted."""
+    parser = argparse.ArgumentParser(
+        description="Categorizes the notes files sent by categorizer_cli --workers"
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Address to listen on. Use 0.0.0.0 to serve other hosts (of a\
+                        trusted network, workers have no authentication).",
+    )
+    parser.add_argument(
+        "--port",
+        default=DEFAULT_WORKER_PORT,
+        type=int,
+        help=f"Port to listen on. Defaults to {DEFAULT_WORKER_PORT}.",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=logging.INFO)
+
+    worker = CategorizerWorker((args.host, args.port))
+    print(f"Listening on {args.host}:{args.port}. Press Ctrl+C to stop.")
+    try:
+        worker.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.server_close()
+
+
+if __name__ == "__main__":
+    main()
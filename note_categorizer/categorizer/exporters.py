@@ -0,0 +1,237 @@
+"""Module responsible for exporting parsed data for other programs to consume.
+Rows are streamed one at a time as CSV, JSON Lines or a compact typed binary
+format, so exporting never builds the whole output in memory."""
+from enum import Enum
+from typing import BinaryIO
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+import csv
+import io
+import json
+import struct
+
+from note_categorizer.categorizer.parser import ParsedData, Parser
+from note_categorizer.common.category import Category
+from note_categorizer.common.notes import Note, NoteTime
+
+ExportValue = Union[str, int, None]
+ExportRow = Tuple[ExportValue, ...]
+
+# The category of notes that are not yet categorized
+UNKNOWN_CATEGORY_NAME = ""
+
+# Typed binary format:
+# header: magic, version (u8), column count (u8),
+#         then per column: type (u8), name length (u16), utf-8 name
+# rows:   per column, a string is its length (u32) and utf-8 bytes,
+#         an int is a presence byte (u8, 0 when there is no value) followed by
+#         an i32 when there is one
+BINARY_MAGIC = b"NCAT"
+BINARY_VERSION = 2
+BINARY_STRING = 0
+BINARY_INT = 1
+BINARY_INT_ABSENT = 0
+BINARY_INT_PRESENT = 1
+
+
+class ExportFormat(Enum):
+    """The file formats parsed data can be exported to"""
+
+    CSV = "csv"
+    JSONL = "jsonl"
+    BINARY = "binary"
+
+
+class ExportRowType(Enum):
+    """What each exported row represents"""
+
+    # One row per note: category, start, end, minutes, info
+    NOTES = "notes"
+    # One row per category: category, minutes, note count
+    TOTALS = "totals"
+
+
+# Column name and binary type of every column
+NOTE_COLUMNS: List[Tuple[str, int]] = [
+    ("category", BINARY_STRING),
+    ("start", BINARY_INT),
+    ("end", BINARY_INT),
+    ("minutes", BINARY_INT),
+    ("info", BINARY_STRING),
+]
+TOTAL_COLUMNS: List[Tuple[str, int]] = [
+    ("category", BINARY_STRING),
+    ("minutes", BINARY_INT),
+    ("note_count", BINARY_INT),
+]
+
+
+def iter_note_rows(parser: Parser, parsed_data: ParsedData) -> Iterator[ExportRow]:
+    """Yields a row per note. Start and end are minutes of the day (None when the
+    note has no time range). Unknown notes have an empty category."""
+
+    def note_row(category_name: str, note: Note) -> ExportRow:
+        minute_range = note.time.get_minute_range()
+        start, end = (None, None) if minute_range is None else minute_range
+        return (
+            category_name,
+            start,
+            end,
+            note.time.compute_time_difference(),
+            note.info.strip(),
+        )
+
+    for category in parser.valid_categories:
+        for note in parsed_data.get_category_notes(category) or []:
+            yield note_row(category.name, note)
+    for note in parsed_data.get_unknown_notes():
+        yield note_row(UNKNOWN_CATEGORY_NAME, note)
+
+
+def iter_total_rows(parser: Parser, parsed_data: ParsedData) -> Iterator[ExportRow]:
+    """Yields a row per category with its total minutes and note count"""
+    category_total_time: Dict[Category, int] = parser.category_total_time or {}
+    for category in parser.valid_categories:
+        category_notes = parsed_data.get_category_notes(category) or []
+        minutes: Optional[int] = category_total_time.get(category)
+        if minutes is None:
+            minutes = sum(
+                note.time.compute_time_difference() for note in category_notes
+            )
+        yield (category.name, minutes, len(category_notes))
+
+
+def iter_export_chunks(
+    parser: Parser,
+    parsed_data: ParsedData,
+    export_format: ExportFormat,
+    row_type: ExportRowType,
+) -> Iterator[bytes]:
+    """Yields the encoded export, one chunk per row (after a header chunk)"""
+    if row_type == ExportRowType.NOTES:
+        columns = NOTE_COLUMNS
+        rows = iter_note_rows(parser, parsed_data)
+    else:
+        columns = TOTAL_COLUMNS
+        rows = iter_total_rows(parser, parsed_data)
+
+    if export_format == ExportFormat.CSV:
+        return _iter_csv_chunks(columns, rows)
+    if export_format == ExportFormat.JSONL:
+        return _iter_jsonl_chunks(columns, rows)
+    return _iter_binary_chunks(columns, rows)
+
+
+def write_export(
+    output_stream: BinaryIO,
+    parser: Parser,
+    parsed_data: ParsedData,
+    export_format: ExportFormat,
+    row_type: ExportRowType,
+) -> None:
+    """Writes the export to the stream a row at a time"""
+    for chunk in iter_export_chunks(parser, parsed_data, export_format, row_type):
+        output_stream.write(chunk)
+
+
+def _iter_csv_chunks(
+    columns: List[Tuple[str, int]], rows: Iterator[ExportRow]
+) -> Iterator[bytes]:
+    """Encodes the rows as CSV with a header line"""
+    line_buffer = io.StringIO()
+    csv_writer = csv.writer(line_buffer, lineterminator="\n")
+
+    def encode_line(values: List[ExportValue]) -> bytes:
+        csv_writer.writerow(values)
+        line = line_buffer.getvalue()
+        line_buffer.seek(0)
+        line_buffer.truncate()
+        return line.encode("utf-8")
+
+    yield encode_line([column_name for column_name, _ in columns])
+    for row in rows:
+        yield encode_line(_to_text_values(columns, row))
+
+
+def _iter_jsonl_chunks(
+    columns: List[Tuple[str, int]], rows: Iterator[ExportRow]
+) -> Iterator[bytes]:
+    """Encodes every row as a json object on its own line"""
+    column_names = [column_name for column_name, _ in columns]
+    for row in rows:
+        json_row = dict(zip(column_names, _to_text_values(columns, row)))
+        yield (json.dumps(json_row) + "\n").encode("utf-8")
+
+
+def _to_text_values(
+    columns: List[Tuple[str, int]], row: ExportRow
+) -> List[ExportValue]:
+    """Renders the start / end minutes of the day as HH:MM for text formats"""
+    values: List[ExportValue] = []
+    for (column_name, _), value in zip(columns, row):
+        if column_name in ["start", "end"] and isinstance(value, int):
+            values.append(NoteTime.get_minute_str(value))
+        else:
+            values.append(value)
+    return values
+
+
+def _iter_binary_chunks(
+    columns: List[Tuple[str, int]], rows: Iterator[ExportRow]
+) -> Iterator[bytes]:
+    """Encodes the rows in the typed binary format"""
+    header = BINARY_MAGIC + struct.pack("<BB", BINARY_VERSION, len(columns))
+    for column_name, column_type in columns:
+        encoded_name = column_name.encode("utf-8")
+        header += struct.pack("<BH", column_type, len(encoded_name)) + encoded_name
+    yield header
+
+    for row in rows:
+        chunk = b""
+        for (_, column_type), value in zip(columns, row):
+            if column_type == BINARY_INT:
+                if value is None:
+                    chunk += struct.pack("<B", BINARY_INT_ABSENT)
+                else:
+                    chunk += struct.pack("<Bi", BINARY_INT_PRESENT, int(value))
+            else:
+                encoded_value = str(value).encode("utf-8")
+                chunk += struct.pack("<I", len(encoded_value)) + encoded_value
+        yield chunk
+
+
+def read_binary_export(input_stream: BinaryIO) -> Iterator[Dict[str, ExportValue]]:
+    """Reads a binary export back, yielding a dict per row.
+    Raises ValueError if the stream is not a binary export."""
+    if input_stream.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+        raise ValueError("Not a note categorizer binary export")
+    version, column_count = struct.unpack("<BB", input_stream.read(2))
+    if version != BINARY_VERSION:
+        raise ValueError(f"Unsupported binary export version {version}")
+
+    columns: List[Tuple[str, int]] = []
+    for _ in range(column_count):
+        column_type, name_len = struct.unpack("<BH", input_stream.read(3))
+        columns.append((input_stream.read(name_len).decode("utf-8"), column_type))
+
+    while True:
+        row: Dict[str, ExportValue] = {}
+        for column_idx, (column_name, column_type) in enumerate(columns):
+            if column_type == BINARY_INT:
+                raw_presence = input_stream.read(1)
+                if len(raw_presence) == 0 and column_idx == 0:
+                    return
+                row[column_name] = None
+                if struct.unpack("<B", raw_presence)[0] == BINARY_INT_PRESENT:
+                    row[column_name] = struct.unpack("<i", input_stream.read(4))[0]
+            else:
+                raw_len = input_stream.read(4)
+                if len(raw_len) == 0 and column_idx == 0:
+                    return
+                value_len = struct.unpack("<I", raw_len)[0]
+                row[column_name] = input_stream.read(value_len).decode("utf-8")
+        yield row
@@ -0,0 +1,270 @@
+"""Module responsible for keeping the results of every run, for trends over months
+and years. Each run's categorized notes are stored along with daily per-category
+totals, which are kept up to date as runs are added. Queries over dates only read
+the daily totals, so they cost the same no matter how many notes were stored."""
+from datetime import date
+from enum import Enum
+from pathlib import Path
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+import re
+import sqlite3
+import time
+
+from note_categorizer.categorizer.parser import ParsedData, Parser
+from note_categorizer.common.category import Category
+from note_categorizer.common.notes import Note
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_date TEXT NOT NULL,
+    source TEXT NOT NULL,
+    ingested_at REAL NOT NULL,
+    UNIQUE (run_date, source)
+);
+
+CREATE TABLE IF NOT EXISTS run_notes (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    category TEXT NOT NULL,
+    minutes INTEGER NOT NULL,
+    note TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS run_notes_by_run ON run_notes (run_id);
+
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    day TEXT NOT NULL,
+    category TEXT NOT NULL,
+    minutes INTEGER NOT NULL,
+    note_count INTEGER NOT NULL,
+    PRIMARY KEY (day, category)
+);
+
+-- The totals each run added to the daily rollups, so a run can be replaced
+CREATE TABLE IF NOT EXISTS run_totals (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    category TEXT NOT NULL,
+    minutes INTEGER NOT NULL,
+    note_count INTEGER NOT NULL,
+    PRIMARY KEY (run_id, category)
+);
+"""
+
+_DATE_IN_NAME = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+class HistoryPeriod(Enum):
+    """How history totals are grouped over time"""
+
+    DAY = "day"
+    MONTH = "month"
+    YEAR = "year"
+
+
+# Length of the 'YYYY-MM-DD' prefix identifying each period
+_PERIOD_PREFIX_LEN: Dict[HistoryPeriod, int] = {
+    HistoryPeriod.DAY: 10,
+    HistoryPeriod.MONTH: 7,
+    HistoryPeriod.YEAR: 4,
+}
+
+
+class CategoryTotal(NamedTuple):
+    """The time spent on a category within a period"""
+
+    # 'YYYY-MM-DD', 'YYYY-MM' or 'YYYY'. Empty when totalled over the whole range.
+    period: str
+    category: str
+    minutes: int
+    note_count: int
+
+
+def infer_run_date(path: Path, default_date: date) -> date:
+    """# Return
+    * The date in the file name (i.e. notes_2023-01-31.txt).
+    * The default date if the name has no date."""
+    match = _DATE_IN_NAME.search(path.name)
+    if match is not None:
+        try:
+            return date.fromisoformat(match.group())
+        except ValueError:
+            pass
+    return default_date
+
+
+class HistoryStore:
+    """Keeps the results of every run in a SQLite database"""
+
+    def __init__(self, db_path: Path) -> None:
+        self._connection = sqlite3.connect(db_path, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Closes the database"""
+        self._connection.close()
+
+    def record_parsed_data(
+        self, run_date: date, source: str, parser: Parser, parsed_data: ParsedData
+    ) -> int:
+        """Records the categorized notes of a run. See `record_run`.
+        # Return
+        The id of the run."""
+        categorized_notes: List[Tuple[Category, Note]] = []
+        for category in parser.valid_categories:
+            for note in parsed_data.get_category_notes(category) or []:
+                categorized_notes.append((category, note))
+
+        category_time: Dict[Category, int] = {}
+        category_note_count: Dict[Category, int] = {}
+        for category, note in categorized_notes:
+            category_time[category] = (
+                category_time.get(category, 0) + note.time.compute_time_difference()
+            )
+            category_note_count[category] = category_note_count.get(category, 0) + 1
+        return self.record_run(
+            run_date, source, category_time, category_note_count, categorized_notes
+        )
+
+    def record_run(
+        self,
+        run_date: date,
+        source: str,
+        category_time: Dict[Category, int],
+        category_note_count: Dict[Category, int],
+        categorized_notes: Iterable[Tuple[Category, Note]] = (),
+    ) -> int:
+        """Records the totals (and notes) of a run, and adds its totals to the
+        daily rollups. A run of the same date and source replaces the previous one,
+        so recording the same notes file twice doesn't count it twice.
+        # Return
+        The id of the run."""
+        run_day = run_date.isoformat()
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._remove_run(run_day, source)
+            run_id = self._connection.execute(
+                "INSERT INTO runs (run_date, source, ingested_at) VALUES (?, ?, ?)",
+                (run_day, source, time.time()),
+            ).lastrowid
+            assert run_id is not None
+            self._connection.executemany(
+                "INSERT INTO run_notes VALUES (?, ?, ?, ?)",
+                (
+                    (
+                        run_id,
+                        category.name,
+                        note.time.compute_time_difference(),
+                        str(note),
+                    )
+                    for category, note in categorized_notes
+                ),
+            )
+
+            run_totals = [
+                (
+                    run_id,
+                    category.name,
+                    minutes,
+                    category_note_count.get(category, 0),
+                )
+                for category, minutes in category_time.items()
+                if category_note_count.get(category, 0) > 0
+            ]
+            self._connection.executemany(
+                "INSERT INTO run_totals VALUES (?, ?, ?, ?)", run_totals
+            )
+            self._connection.executemany(
+                """
+                INSERT INTO daily_rollups VALUES (?, ?, ?, ?)
+                ON CONFLICT (day, category) DO UPDATE SET
+                    minutes = minutes + excluded.minutes,
+                    note_count = note_count + excluded.note_count
+                """,
+                (
+                    (run_day, category_name, minutes, note_count)
+                    for _, category_name, minutes, note_count in run_totals
+                ),
+            )
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+        return run_id
+
+    def get_category_totals(
+        self,
+        start_date: date,
+        end_date: date,
+        period: Optional[HistoryPeriod] = None,
+    ) -> List[CategoryTotal]:
+        """Totals each category between the dates (inclusive) from the daily
+        rollups.
+        # Parameters
+        * `period` - Totals each day / month / year separately. When None, there
+        is a single total per category over the whole range.
+        # Return
+        The totals, ordered by period then category."""
+        prefix_len = 0 if period is None else _PERIOD_PREFIX_LEN[period]
+        rows = self._connection.execute(
+            """
+            SELECT substr(day, 1, :prefix_len) AS period, category,
+                SUM(minutes), SUM(note_count)
+            FROM daily_rollups
+            WHERE day BETWEEN :start_day AND :end_day
+            GROUP BY period, category
+            ORDER BY period, category
+            """,
+            {
+                "prefix_len": prefix_len,
+                "start_day": start_date.isoformat(),
+                "end_day": end_date.isoformat(),
+            },
+        )
+        return [CategoryTotal(*row) for row in rows]
+
+    def _remove_run(self, run_day: str, source: str) -> None:
+        """Removes a run (if it exists) and takes its totals out of the rollups"""
+        run_row = self._connection.execute(
+            "SELECT run_id FROM runs WHERE run_date = ? AND source = ?",
+            (run_day, source),
+        ).fetchone()
+        if run_row is None:
+            return
+        self._connection.execute(
+            """
+            UPDATE daily_rollups SET
+                minutes = daily_rollups.minutes - run_totals.minutes,
+                note_count = daily_rollups.note_count - run_totals.note_count
+            FROM run_totals
+            WHERE run_totals.run_id = ? AND daily_rollups.day = ?
+                AND daily_rollups.category = run_totals.category
+            """,
+            (run_row[0], run_day),
+        )
+        self._connection.execute(
+            "DELETE FROM daily_rollups WHERE day = ? AND note_count <= 0", (run_day,)
+        )
+        self._connection.execute("DELETE FROM runs WHERE run_id = ?", (run_row[0],))
+
+    @classmethod
+    def totals_to_str(cls, category_totals: List[CategoryTotal]) -> str:
+        """Renders totals in a human-readable manner"""
+        res = ""
+        current_period: Optional[str] = None
+        for category_total in category_totals:
+            if category_total.period != current_period:
+                current_period = category_total.period
+                if len(current_period) > 0:
+                    res += f"{current_period}:\n"
+            indent = "  " if len(category_total.period) > 0 else ""
+            res += f"{indent}{category_total.category}: {category_total.minutes} "
+            res += f"minutes, {category_total.note_count} notes\n"
+        if len(category_totals) == 0:
+            res += "No history within the dates\n"
+        return res
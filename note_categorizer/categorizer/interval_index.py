@@ -0,0 +1,109 @@
+"""Module responsible for finding notes whose time ranges overlap. Overlapping notes
+are found with a single sweep over the sorted range boundaries (O(n log n)) rather
+than by comparing every pair of notes."""
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Tuple
+
+from note_categorizer.common.category import Category
+from note_categorizer.common.notes import Note, NoteTime
+
+# At the same minute, ranges that end are processed before ranges that start, so
+# back to back notes (10:00-10:30 and 10:30-11:00) do not overlap.
+_RANGE_END = 0
+_RANGE_START = 1
+
+
+def union_minutes(minute_ranges: Iterable[Tuple[int, int]]) -> int:
+    """Returns the minutes covered by the ranges, counting each minute once"""
+    total_minutes = 0
+    current_start = current_end = -1
+    for start, end in sorted(minute_ranges):
+        if start > current_end:
+            total_minutes += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    return total_minutes + current_end - current_start
+
+
+class CategorizedNote(NamedTuple):
+    """A note along with the category it was assigned to"""
+
+    category: Category
+    note: Note
+
+
+class Overlap(NamedTuple):
+    """A stretch of time covered by more than one note"""
+
+    start_minute: int
+    end_minute: int
+
+    # Every note active at some point during the stretch
+    notes: List[CategorizedNote]
+
+    def __str__(self) -> str:
+        res = f"{NoteTime.get_minute_str(self.start_minute)}-"
+        res += f"{NoteTime.get_minute_str(self.end_minute)} is covered by:"
+        for categorized_note in self.notes:
+            res += f"\n  * {categorized_note.note} ({categorized_note.category})"
+        return res
+
+
+class IntervalIndex:
+    """Indexes the time ranges of categorized notes to find overlaps"""
+
+    def __init__(self, known_assignments: Dict[Category, List[Note]]) -> None:
+        """Notes without a full time range (i.e. '+<min>' notes) are ignored."""
+        self._notes: List[CategorizedNote] = []
+        self._minute_ranges: List[Tuple[int, int]] = []
+        for category, category_notes in known_assignments.items():
+            for note in category_notes:
+                minute_range = note.time.get_minute_range()
+                # Empty ranges can't overlap anything
+                if minute_range is not None and minute_range[0] < minute_range[1]:
+                    self._notes.append(CategorizedNote(category, note))
+                    self._minute_ranges.append(minute_range)
+
+    def find_overlaps(self) -> List[Overlap]:
+        """Sweeps over the sorted range boundaries, keeping track of the active
+        ranges. Every maximal stretch covered by at least 2 ranges is reported."""
+        events: List[Tuple[int, int, int]] = []
+        for note_idx, (start, end) in enumerate(self._minute_ranges):
+            events.append((start, _RANGE_START, note_idx))
+            events.append((end, _RANGE_END, note_idx))
+        events.sort()
+
+        overlaps: List[Overlap] = []
+        active: Dict[int, None] = {}
+        # Notes of the stretch being built, in the order they became involved
+        overlap_note_idxs: Dict[int, None] = {}
+        overlap_start = 0
+        for minute, event_type, note_idx in events:
+            if event_type == _RANGE_START:
+                active[note_idx] = None
+                if len(active) == 2:
+                    overlap_start = minute
+                    overlap_note_idxs = dict(active)
+                elif len(active) > 2:
+                    overlap_note_idxs[note_idx] = None
+            else:
+                del active[note_idx]
+                if len(active) == 1:
+                    overlaps.append(
+                        Overlap(
+                            overlap_start,
+                            minute,
+                            [self._notes[idx] for idx in overlap_note_idxs],
+                        )
+                    )
+        return overlaps
+
+    def get_overlapping_minutes(self) -> int:
+        """Returns the minutes counted more than once when every range is summed"""
+        return sum(end - start for start, end in self._minute_ranges) - union_minutes(
+            self._minute_ranges
+        )
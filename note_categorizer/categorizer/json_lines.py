@@ -0,0 +1,23 @@
+"""Module responsible for the messages of the daemon (see daemon.py) and of the
+distributed workers (see distributed.py). A message is a json object on a single
+line. Only imports the standard library, so the daemon client stays fast."""
+from typing import Any
+from typing import Dict
+from typing import Optional
+import json
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    """Messages are a single line of json"""
+    return json.dumps(message).encode("utf-8") + b"\n"
+
+
+def decode_message(line: bytes) -> Optional[Dict[str, Any]]:
+    """# Return
+    * The message of the line.
+    * None if the line is not a message (i.e. the connection closed early)."""
+    try:
+        message = json.loads(line)
+    except ValueError:
+        return None
+    return message if isinstance(message, dict) else None
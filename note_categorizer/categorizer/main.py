@@ -1,22 +1,95 @@
 """Only used if categorizer is used as the executable rather than a library.
 i.e. This is mutually exclusive with the Web App. It loads info from files."""
 import argparse
+from contextlib import redirect_stdout
+from datetime import date
+import logging
 from typing import Dict
 from typing import Any
+from typing import BinaryIO
 from typing import Optional
 from typing import List
+from typing import Tuple
 from pathlib import Path
+import sys
 
+from note_categorizer.categorizer.assignment_store import AssignmentStore
+from note_categorizer.categorizer.classification_cache import ClassificationCache
+from note_categorizer.categorizer.classification_cache import (
+    DEFAULT_CLASSIFICATION_CACHE_SIZE,
+)
+from note_categorizer.categorizer.compiled_categories import CompiledCategories
+from note_categorizer.categorizer.compiled_categories import CompiledCategoryCache
+from note_categorizer.categorizer.compiled_categories import CompiledCategoryLru
+from note_categorizer.categorizer.distributed import DEFAULT_SHARD_BYTES
+from note_categorizer.categorizer.distributed import DistributedCategorizer
+from note_categorizer.categorizer.distributed import DistributedRunFailed
+from note_categorizer.categorizer.distributed import WorkerAddress
+from note_categorizer.categorizer.distributed import parse_worker_address
+from note_categorizer.categorizer.exporters import ExportFormat
+from note_categorizer.categorizer.exporters import ExportRowType
+from note_categorizer.categorizer.exporters import write_export
+from note_categorizer.categorizer.history import HistoryPeriod
+from note_categorizer.categorizer.history import HistoryStore
+from note_categorizer.categorizer.history import infer_run_date
 from note_categorizer.categorizer.text_file_reader import CategoryReader
 from note_categorizer.categorizer.text_file_reader import NoteReader
+from note_categorizer.categorizer.interval_index import IntervalIndex
+from note_categorizer.categorizer.note_follower import NoteFollower
+from note_categorizer.categorizer.multi_file_reader import FileSummary
+from note_categorizer.categorizer.multi_file_reader import MultiFileCategorizer
+from note_categorizer.categorizer.multi_file_reader import expand_note_paths
 from note_categorizer.categorizer.parser import ParsedData, TerminalParser
+from note_categorizer.categorizer.parser import RequiresTerminal
+from note_categorizer.categorizer.time_rollup import TimeRollupIndex
+from note_categorizer.categorizer.time_rollup import parse_time_window
 from note_categorizer.common.category import Category
+from note_categorizer.common.diagnostics import collect_diagnostics
+from note_categorizer.common.keyword_index import MatchMode
 from note_categorizer.common.notes import Note
 from note_categorizer.common.common_utils import CommonUtils
 
+LOGGER = logging.getLogger(__name__)
 
-def _read_args() -> Dict[str, Any]:
-    """Parses cli args and returns them."""
+LOG_FORMAT = "%(levelname)s: %(message)s"
+
+
+class WarmCaches:
+    """What a resident process (see daemon.py) keeps between runs, so repeated
+    runs skip loading the categories and re-classifying the same infos"""
+
+    def __init__(self) -> None:
+        self.compiled_categories = CompiledCategoryLru()
+        # Keyed by the hash of the compiled categories and the match mode
+        self._classification_caches: Dict[
+            Tuple[str, MatchMode], ClassificationCache
+        ] = {}
+
+    def load_compiled_categories(self, category_path: Path) -> CompiledCategories:
+        """# Return
+        The compiled categories of the category file. Only compiled when its
+        content changed."""
+        category_lines = CategoryReader(category_path).read_in_file()
+        return self.compiled_categories.get(category_lines)
+
+    def get_classification_cache(
+        self, compiled_categories: CompiledCategories, match_mode: MatchMode, size: int
+    ) -> ClassificationCache:
+        """# Return
+        The classification cache of previous runs with the same categories"""
+        key = (compiled_categories.source_hash, match_mode)
+        classification_cache = self._classification_caches.get(key)
+        if classification_cache is None or classification_cache.max_size != size:
+            # Caches of categories no longer in use are dropped all at once
+            if len(self._classification_caches) >= self.compiled_categories.max_size:
+                self._classification_caches.clear()
+            classification_cache = ClassificationCache(size)
+            self._classification_caches[key] = classification_cache
+        return classification_cache
+
+
+def _read_args(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Parses cli args (defaults to sys.argv) and returns them."""
     parser = argparse.ArgumentParser()
     abs_repo_top_dir: Path = CommonUtils.get_repo_top_dir()
     default_category_filename = "category_file.txt"
@@ -38,11 +111,15 @@ def _read_args() -> Dict[str, Any]:
     parser.add_argument(
         "-np",
         "--notes_path",
-        default=default_note_path,
-        help="Absolute path to the notes text file. \
+        default=[default_note_path],
+        nargs="+",
+        help=f"Absolute path(s) to the notes text file(s). \
                         Each line is a single 'bulltet point' of notes to split\
                         into various categories.\
                         Please see example_notes_file.txt for an example.\
+                        Directories and globs (i.e. 'notes/*.txt') are expanded.\
+                        When more than one file is given, the files are parsed\
+                        concurrently and per-file and merged totals are shown.\
                         Defaults to {default_note_path}",
         type=Path,
     )
@@ -56,8 +133,233 @@ def _read_args() -> Dict[str, Any]:
                         \nNOTE: This requires a notes line getting prefixed\
                         with 'HH:MM-HH:MM: '. This should be 24 hr time.",
     )
+    parser.add_argument(
+        "-f",
+        "--follow",
+        action="store_true",
+        default=False,
+        help="Set this flag to keep watching the notes (and category) file.\
+                        Newly appended notes get categorized as they are written\
+                        and the category totals are redrawn in place.\
+                        Unknown notes are listed rather than prompted for.",
+    )
+    parser.add_argument(
+        "--union_times",
+        action="store_true",
+        default=False,
+        help="Set this flag (with --add_times) to count minutes covered by\
+                        several notes of the same category only once, rather\
+                        than summing every note.",
+    )
+    parser.add_argument(
+        "--report_overlaps",
+        action="store_true",
+        default=False,
+        help="Set this flag to list the stretches of time covered by more\
+                        than one note, within or across categories.",
+    )
+    parser.add_argument(
+        "-w",
+        "--window",
+        action="append",
+        default=[],
+        type=_time_window_arg,
+        help="A time window of the day, as HH:MM-HH:MM (24 hr time). Shows\
+                        the minutes spent on each category within it. Notes\
+                        partially inside the window only count the overlap.\
+                        Can be given multiple times.",
+    )
+    parser.add_argument(
+        "--hourly",
+        action="store_true",
+        default=False,
+        help="Set this flag to show the minutes spent on each category within\
+                        each hour of the day.",
+    )
+    parser.add_argument(
+        "-m",
+        "--match_mode",
+        default=MatchMode.SUBSTRING.value,
+        choices=[match_mode.value for match_mode in MatchMode],
+        help="How keywords are found within notes. 'substring' finds keywords\
+                        anywhere (i.e. 'art' matches 'party'). 'word' only finds\
+                        whole words, and is faster with many categories.\
+                        Defaults to substring.",
+    )
+    parser.add_argument(
+        "--no_category_cache",
+        action="store_true",
+        default=False,
+        help="Set this flag to always recompile the category file instead of\
+                        loading (and saving) the compiled categories cached next\
+                        to it.",
+    )
+    parser.add_argument(
+        "--assignment_store",
+        default=None,
+        type=Path,
+        help="Path to the file remembering the category picked for each\
+                        uncategorized note. Notes with the same info are not\
+                        asked about again. Defaults to\
+                        .<category file name>.assignments.json next to the\
+                        category file.",
+    )
+    parser.add_argument(
+        "--no_assignment_store",
+        action="store_true",
+        default=False,
+        help="Set this flag to neither use nor save previously picked categories.",
+    )
+    parser.add_argument(
+        "--classification_cache_size",
+        default=DEFAULT_CLASSIFICATION_CACHE_SIZE,
+        type=int,
+        help=f"How many distinct note infos have their category remembered,\
+                        so repeated notes skip the keyword scan. 0 disables it.\
+                        Defaults to {DEFAULT_CLASSIFICATION_CACHE_SIZE}.",
+    )
+    parser.add_argument(
+        "--cache_stats",
+        action="store_true",
+        default=False,
+        help="Set this flag to print the hit rate of the classification cache.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default=None,
+        type=int,
+        help="Number of processes used to parse multiple notes files at once.\
+                        Defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        "--workers",
+        default=None,
+        nargs="+",
+        type=_worker_address_arg,
+        metavar="HOST:PORT",
+        help="Categorize the notes files on these workers (categorizer_worker)\
+                        rather than in local processes.",
+    )
+    parser.add_argument(
+        "--shard_bytes",
+        default=DEFAULT_SHARD_BYTES,
+        type=int,
+        help=f"Bytes of notes files sent to a worker at once with --workers. A\
+                        larger file is sent on its own. Defaults to\
+                        {DEFAULT_SHARD_BYTES}.",
+    )
+    parser.add_argument(
+        "--export_path",
+        default=None,
+        type=Path,
+        help="Path to export the parsed notes to, for use by other programs.\
+                        Use '-' to write to stdout.",
+    )
+    parser.add_argument(
+        "--export_format",
+        default=ExportFormat.CSV.value,
+        choices=[export_format.value for export_format in ExportFormat],
+        help="Format of --export_path. 'binary' is a compact typed format.\
+                        Defaults to csv.",
+    )
+    parser.add_argument(
+        "--export_rows",
+        default=ExportRowType.NOTES.value,
+        choices=[row_type.value for row_type in ExportRowType],
+        help="Whether --export_path gets a row per note or per category.\
+                        Defaults to notes.",
+    )
+    parser.add_argument(
+        "--history_db",
+        default=None,
+        type=Path,
+        help="Path to a history database. Every run's categorized notes are\
+                        added to it, so totals can be queried over months and\
+                        years with --history_query.",
+    )
+    parser.add_argument(
+        "--history_date",
+        default=None,
+        type=_date_arg,
+        help="Date (YYYY-MM-DD) the notes are recorded under in --history_db.\
+                        Defaults to the date in the notes file name, otherwise\
+                        today. Recording the same file and date again replaces\
+                        it.",
+    )
+    parser.add_argument(
+        "--history_source",
+        default=None,
+        help="Name the notes are recorded under in --history_db.\
+                        Defaults to the notes file path. With multiple files,\
+                        the file name is added to it.",
+    )
+    parser.add_argument(
+        "--history_query",
+        default=None,
+        nargs=2,
+        metavar=("START_DATE", "END_DATE"),
+        type=_date_arg,
+        help="Prints the totals of every category between the dates\
+                        (YYYY-MM-DD, inclusive) from --history_db, then exits\
+                        without reading any notes.",
+    )
+    parser.add_argument(
+        "--history_group",
+        default=None,
+        choices=[period.value for period in HistoryPeriod],
+        help="Splits the --history_query totals by day, month or year.",
+    )
+    parser.add_argument(
+        "--poll_interval",
+        default=1.0,
+        type=float,
+        help="Seconds between checks of the files when using --follow.\
+                        Defaults to 1 second.",
+    )
+
+    return vars(parser.parse_args(argv))
+
+
+def _time_window_arg(window_str: str) -> Tuple[int, int]:
+    """Parses a --window argument into minutes of the day"""
+    time_window = parse_time_window(window_str)
+    if time_window is None:
+        raise argparse.ArgumentTypeError(
+            f"'{window_str}' is not a valid HH:MM-HH:MM time window"
+        )
+    return time_window
+
+
+def _worker_address_arg(address_str: str) -> WorkerAddress:
+    """Parses a HOST:PORT --workers argument"""
+    worker_address = parse_worker_address(address_str)
+    if worker_address is None:
+        raise argparse.ArgumentTypeError(
+            f"'{address_str}' is not a valid HOST:PORT worker address"
+        )
+    return worker_address
+
+
+def _date_arg(date_str: str) -> date:
+    """Parses a YYYY-MM-DD date argument"""
+    try:
+        return date.fromisoformat(date_str)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(
+            f"'{date_str}' is not a valid YYYY-MM-DD date"
+        ) from err
 
-    return vars(parser.parse_args())
+
+def _get_assignment_store(args: Dict[str, Any]) -> AssignmentStore:
+    """Creates the assignment store requested by the cli args"""
+    if args["no_assignment_store"] is True:
+        return AssignmentStore()
+    store_path: Optional[Path] = args["assignment_store"]
+    if store_path is None:
+        category_path: Path = args["category_path"]
+        store_path = category_path.parent / f".{category_path.name}.assignments.json"
+    return AssignmentStore(store_path)
 
 
 def display_category_results(
@@ -102,24 +404,354 @@ def display_results(
 
 def main() -> None:
     """Entry to this executable. Should only be used when NOT running Web App"""
+    logging.basicConfig(format=LOG_FORMAT, level=logging.WARNING)
+    run_cli(sys.argv[1:])
+
+
+def run_cli(argv: List[str], warm_caches: Optional[WarmCaches] = None) -> None:
+    """Runs the executable with the cli args. Exits (SystemExit) on invalid args.
+    # Parameters
+    * `warm_caches` - Given when running in a resident process (the daemon).
+    RequiresTerminal is then raised for runs that need the user's terminal.
+    """
+    args: Dict[str, Any] = _read_args(argv)
+    if warm_caches is not None:
+        _check_runs_without_terminal(args)
+    # Problems in the input are summarized once the run is done
+    with collect_diagnostics(LOGGER):
+        _run(args, warm_caches)
+
+
+def _run(args: Dict[str, Any], warm_caches: Optional[WarmCaches] = None) -> None:
+    """Runs the executable with the cli args"""
+    if str(args["export_path"]) != "-":
+        _run_with_export_stream(args, warm_caches, None)
+        return
+    # stdout only gets the export, so it can be piped to other programs. The
+    # messages and prompts of the run go to stderr instead.
+    export_stream = sys.stdout.buffer
+    with redirect_stdout(sys.stderr):
+        _run_with_export_stream(args, warm_caches, export_stream)
+
+
+def _run_with_export_stream(
+    args: Dict[str, Any],
+    warm_caches: Optional[WarmCaches],
+    export_stream: Optional[BinaryIO],
+) -> None:
+    """Runs the executable with the cli args
+    # Parameters
+    * `export_stream` - Where --export_path - is written to. The results are
+    then not printed, as they would be mixed with the export."""
+    if args["history_query"] is not None:
+        _query_history(args)
+        return
+
+    note_paths: List[Path] = expand_note_paths(args["notes_path"])
+    match_mode = MatchMode(args["match_mode"])
 
-    args: Dict[str, Any] = _read_args()
+    if args["follow"] is True:
+        if len(note_paths) > 1:
+            print("--follow only supports a single notes file.")
+            sys.exit(1)
+        note_follower = NoteFollower(
+            note_paths[0],
+            args["category_path"],
+            use_category_cache=not args["no_category_cache"],
+            match_mode=match_mode,
+        )
+        note_follower.follow(args["poll_interval"])
+        return
 
-    category_reader = CategoryReader(args["category_path"])
-    category_list: List[Category] = category_reader.generate_list()
+    compiled_categories, terminal_note_parser = _create_terminal_parser(
+        args, match_mode, warm_caches
+    )
 
-    note_reader = NoteReader(args["notes_path"])
+    if len(note_paths) > 1 or args["workers"] is not None:
+        _run_multi_file(
+            args, compiled_categories, terminal_note_parser, note_paths, match_mode
+        )
+        return
+
+    note_reader = NoteReader(note_paths[0])
     note_list: List[Note] = note_reader.generate_list()
 
-    terminal_note_parser = TerminalParser(category_list, {}, False)
     parsed_notes: ParsedData = terminal_note_parser.parse_notes(note_list)
 
     completed_parsing: ParsedData = terminal_note_parser.resolve_unknowns(parsed_notes)
     if args["add_times"] is True:
-        terminal_note_parser.calculate_category_time(completed_parsing)
+        terminal_note_parser.calculate_category_time(
+            completed_parsing, args["union_times"]
+        )
+
+    if export_stream is None:
+        res = terminal_note_parser.results_to_str(completed_parsing, True)
+        print(res)
+
+    if args["report_overlaps"] is True:
+        _print_overlaps(completed_parsing)
+    if len(args["window"]) > 0 or args["hourly"] is True:
+        _print_time_rollup(terminal_note_parser, completed_parsing, args)
+    if args["cache_stats"] is True:
+        print(terminal_note_parser.classification_cache.stats_to_str())
+    _save_results(
+        terminal_note_parser, completed_parsing, note_paths[0], args, export_stream
+    )
+
+
+def _print_overlaps(completed_parsing: ParsedData) -> None:
+    """Prints every stretch of time covered by more than one note"""
+    interval_index = IntervalIndex(completed_parsing.known_assignments)
+    overlaps = interval_index.find_overlaps()
+    overlap_msg = f"\nOverlapping notes ({len(overlaps)} stretches, "
+    overlap_msg += f"{interval_index.get_overlapping_minutes()} minutes "
+    overlap_msg += "counted more than once):"
+    print(overlap_msg)
+    for overlap in overlaps:
+        print(overlap)
+
+
+def _print_time_rollup(
+    terminal_note_parser: TerminalParser,
+    completed_parsing: ParsedData,
+    args: Dict[str, Any],
+) -> None:
+    """Prints the totals within the --window time windows and / or --hourly"""
+    rollup_index = TimeRollupIndex(
+        terminal_note_parser.valid_categories, completed_parsing
+    )
+    for start_minute, end_minute in args["window"]:
+        print(rollup_index.window_totals_to_str(start_minute, end_minute))
+    if args["hourly"] is True:
+        print(rollup_index.hourly_histogram_to_str())
+
+
+def _check_runs_without_terminal(args: Dict[str, Any]) -> None:
+    """Raises RequiresTerminal if the cli args write to the terminal directly"""
+    if args["follow"] is True or str(args["export_path"]) == "-":
+        raise RequiresTerminal("--follow and --export_path - write to the terminal")
+
+
+def _create_terminal_parser(
+    args: Dict[str, Any], match_mode: MatchMode, warm_caches: Optional[WarmCaches]
+) -> Tuple[CompiledCategories, TerminalParser]:
+    """# Return
+    The compiled categories of the category file, and a parser of them set up
+    by the cli args. With `warm_caches`, they come from previous runs."""
+    if warm_caches is not None:
+        compiled_categories = warm_caches.load_compiled_categories(
+            args["category_path"]
+        )
+    else:
+        compiled_categories = CompiledCategoryCache(
+            args["category_path"], not args["no_category_cache"]
+        ).load()
+
+    terminal_note_parser = TerminalParser.from_compiled_categories(
+        compiled_categories, {}, False, match_mode
+    )
+    terminal_note_parser.assignment_store = _get_assignment_store(args)
+    if warm_caches is not None:
+        terminal_note_parser.can_prompt = False
+        terminal_note_parser.classification_cache = (
+            warm_caches.get_classification_cache(
+                compiled_categories, match_mode, args["classification_cache_size"]
+            )
+        )
+    else:
+        terminal_note_parser.classification_cache = ClassificationCache(
+            args["classification_cache_size"]
+        )
+    return compiled_categories, terminal_note_parser
+
 
-    res = terminal_note_parser.results_to_str(completed_parsing, True)
-    print(res)
+def _run_multi_file(
+    args: Dict[str, Any],
+    compiled_categories: CompiledCategories,
+    terminal_note_parser: TerminalParser,
+    note_paths: List[Path],
+    match_mode: MatchMode,
+) -> None:
+    """Categorizes several notes files at once (on the workers of --workers).
+    Each file is printed (and recorded in the history) once final."""
+    _check_multi_file_args(args)
+    multi_file_categorizer = _create_multi_file_categorizer(
+        args, compiled_categories, note_paths, match_mode
+    )
+    history_store: Optional[HistoryStore] = None
+    if args["history_db"] is not None:
+        history_store = HistoryStore(args["history_db"])
+
+    def on_file_done(summary: FileSummary) -> None:
+        print(multi_file_categorizer.file_summary_to_str(summary))
+        if history_store is not None:
+            _record_file_summary(history_store, summary, args)
+
+    try:
+        multi_file_categorizer.run(terminal_note_parser, on_file_done)
+    except DistributedRunFailed as err:
+        print(f"Could not categorize the notes files on the workers: {err}")
+        sys.exit(1)
+    finally:
+        if history_store is not None:
+            history_store.close()
+    print(multi_file_categorizer.results_to_str())
+
+
+def _check_multi_file_args(args: Dict[str, Any]) -> None:
+    """Exits if the cli args ask for something only single file runs support"""
+    unsupported_flags = [
+        flag
+        for flag, is_given in [
+            ("--union_times", args["union_times"]),
+            ("--report_overlaps", args["report_overlaps"]),
+            ("--window", len(args["window"]) > 0),
+            ("--hourly", args["hourly"]),
+            ("--export_path", args["export_path"] is not None),
+            ("--cache_stats", args["cache_stats"]),
+            (
+                "--classification_cache_size",
+                args["classification_cache_size"] != DEFAULT_CLASSIFICATION_CACHE_SIZE,
+            ),
+        ]
+        if is_given
+    ]
+    if len(unsupported_flags) > 0:
+        unsupported_str = ", ".join(unsupported_flags)
+        print(
+            f"{unsupported_str} only support a single notes file (without --workers)."
+        )
+        sys.exit(1)
+
+
+def _create_multi_file_categorizer(
+    args: Dict[str, Any],
+    compiled_categories: CompiledCategories,
+    note_paths: List[Path],
+    match_mode: MatchMode,
+) -> MultiFileCategorizer:
+    """# Return
+    The categorizer of the notes files. Remote when --workers is given."""
+    if args["workers"] is None:
+        return MultiFileCategorizer(
+            compiled_categories.get_category_list(),
+            note_paths,
+            args["jobs"],
+            match_mode,
+        )
+    return DistributedCategorizer(
+        compiled_categories.get_category_list(),
+        CategoryReader(args["category_path"]).read_in_file(),
+        note_paths,
+        args["workers"],
+        match_mode=match_mode,
+        shard_bytes=args["shard_bytes"],
+    )
+
+
+def _save_results(
+    terminal_note_parser: TerminalParser,
+    completed_parsing: ParsedData,
+    note_path: Path,
+    args: Dict[str, Any],
+    export_stream: Optional[BinaryIO],
+) -> None:
+    """Exports the parsed notes and records them in the history, when requested
+    by the cli args"""
+    if args["export_path"] is not None:
+        _export(terminal_note_parser, completed_parsing, args, export_stream)
+    if args["history_db"] is not None:
+        history_store = HistoryStore(args["history_db"])
+        history_store.record_parsed_data(
+            _get_history_date(note_path, args),
+            _get_history_source(note_path, args, is_multi_file=False),
+            terminal_note_parser,
+            completed_parsing,
+        )
+        history_store.close()
+
+
+def _record_file_summary(
+    history_store: HistoryStore, summary: FileSummary, args: Dict[str, Any]
+) -> None:
+    """Records the totals of a notes file in the history"""
+    history_store.record_run(
+        _get_history_date(summary.path, args),
+        _get_history_source(summary.path, args, is_multi_file=True),
+        summary.category_time,
+        summary.category_note_count,
+    )
+
+
+def _get_history_date(note_path: Path, args: Dict[str, Any]) -> date:
+    """# Return
+    The date the notes file is recorded under in the history"""
+    history_date: Optional[date] = args["history_date"]
+    if history_date is not None:
+        return history_date
+    return infer_run_date(note_path, date.today())
+
+
+def _get_history_source(
+    note_path: Path, args: Dict[str, Any], is_multi_file: bool
+) -> str:
+    """# Return
+    The source the notes file is recorded under in the history. With multiple
+    files, the file name is added to --history_source so the files of the same
+    date don't replace each other."""
+    history_source: Optional[str] = args["history_source"]
+    if history_source is None:
+        return str(note_path)
+    if is_multi_file:
+        return f"{history_source}/{note_path.name}"
+    return history_source
+
+
+def _query_history(args: Dict[str, Any]) -> None:
+    """Prints the history totals requested by the cli args"""
+    if args["history_db"] is None:
+        print("--history_query needs --history_db.")
+        sys.exit(1)
+    start_date, end_date = args["history_query"]
+    period = None
+    if args["history_group"] is not None:
+        period = HistoryPeriod(args["history_group"])
+    history_store = HistoryStore(args["history_db"])
+    category_totals = history_store.get_category_totals(start_date, end_date, period)
+    history_store.close()
+    print(f"History from {start_date} to {end_date}:")
+    print(HistoryStore.totals_to_str(category_totals))
+
+
+def _export(
+    terminal_note_parser: TerminalParser,
+    completed_parsing: ParsedData,
+    args: Dict[str, Any],
+    export_stream: Optional[BinaryIO],
+) -> None:
+    """Writes the parsed notes to the export path requested by the cli args
+    (or `export_stream`, for --export_path -)"""
+    export_format = ExportFormat(args["export_format"])
+    row_type = ExportRowType(args["export_rows"])
+    export_path: Path = args["export_path"]
+    if export_stream is not None:
+        write_export(
+            export_stream,
+            terminal_note_parser,
+            completed_parsing,
+            export_format,
+            row_type,
+        )
+        export_stream.flush()
+        return
+    with open(export_path, "wb") as export_file:
+        write_export(
+            export_file,
+            terminal_note_parser,
+            completed_parsing,
+            export_format,
+            row_type,
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,251 @@
+"""Module responsible for categorizing many notes files at once (i.e. one notes
+file per person per day). Files are read and parsed concurrently and only their
+per-category totals are kept, so memory stays bounded by the files in flight."""
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable
+from typing import Deque
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from collections import deque
+import glob
+import logging
+import os
+import sys
+
+from note_categorizer.categorizer.text_file_reader import NoteReader
+from note_categorizer.categorizer.parser import ParsedData, TerminalParser
+from note_categorizer.common.category import Category
+from note_categorizer.common.diagnostics import collect_diagnostics
+from note_categorizer.common.keyword_index import MatchMode
+from note_categorizer.common.notes import Note
+
+LOGGER = logging.getLogger(__name__)
+
+
+class FileSummary(NamedTuple):
+    """Represents the categorized totals of a single notes file"""
+
+    path: Path
+
+    # Maps category to time in minutes
+    category_time: Dict[Category, int]
+
+    category_note_count: Dict[Category, int]
+
+    # Notes that still need to be added to a category
+    unknown_notes: List[Note]
+
+    # Summary of the problems found in the file (i.e. malformed lines). Empty if none.
+    problems_summary: str = ""
+
+
+def expand_note_paths(raw_paths: List[Path]) -> List[Path]:
+    """Expands every file, directory or glob into the notes files it refers to.
+    Directories contribute every file directly inside of them.
+    Exits if a path matches no files."""
+    note_paths: List[Path] = []
+    for raw_path in raw_paths:
+        if glob.has_magic(str(raw_path)):
+            matches = [Path(match) for match in sorted(glob.glob(str(raw_path)))]
+        elif raw_path.is_dir():
+            matches = sorted(path for path in raw_path.iterdir() if path.is_file())
+        else:
+            matches = [raw_path]
+
+        matches = [path for path in matches if path.is_file()]
+        if len(matches) == 0:
+            print(f"The notes path {raw_path} doesn't match any files.")
+            sys.exit(1)
+        note_paths.extend(matches)
+    return note_paths
+
+
+def summarize_note_file(
+    path: Path, category_list: List[Category], match_mode: MatchMode
+) -> FileSummary:
+    """Reads, parses and totals a single notes file. Runs in a worker process."""
+    parser = TerminalParser(category_list, None, match_mode=match_mode)
+    return summarize_note_lines(path, NoteReader(path).read_in_file(), parser)
+
+
+def summarize_note_lines(
+    path: Path, note_lines: List[str], parser: TerminalParser
+) -> FileSummary:
+    """Parses and totals the lines of the notes file at `path` (which may be on
+    another host, see distributed.py)"""
+    with collect_diagnostics() as diagnostics:
+        notes = NoteReader.notes_from_lines(note_lines)
+    parsed_data: ParsedData = parser.parse_notes(notes)
+    parser.calculate_category_time(parsed_data)
+
+    category_time: Dict[Category, int] = {}
+    category_note_count: Dict[Category, int] = {}
+    for category, category_notes in parsed_data.known_assignments.items():
+        category_time[category] = parser.get_category_time(category)
+        category_note_count[category] = len(category_notes)
+    return FileSummary(
+        path,
+        category_time,
+        category_note_count,
+        parsed_data.get_unknown_notes(),
+        diagnostics.summary_to_str(),
+    )
+
+
+# pylint: disable=too-many-instance-attributes
+class MultiFileCategorizer:
+    """Categorizes many notes files concurrently and merges their totals"""
+
+    def __init__(
+        self,
+        category_list: List[Category],
+        note_paths: List[Path],
+        max_workers: Optional[int] = None,
+        match_mode: MatchMode = MatchMode.SUBSTRING,
+    ) -> None:
+        self.category_list = category_list
+        self.note_paths = note_paths
+        self.max_workers = max_workers
+        self.match_mode = match_mode
+
+        # Filled in by `run`
+        self.file_count = 0
+        self.merged_time: Dict[Category, int] = {}
+        self.merged_note_count: Dict[Category, int] = {}
+        # Notes that could not be categorized, of every file
+        self.unknown_notes: List[Note] = []
+
+    def iter_file_summaries(self) -> Iterator[FileSummary]:
+        """Yields the summary of every notes file, in the order of the paths.
+        At most twice the number of workers are in flight at once, so
+        the parsed notes of only a few files are ever held in memory."""
+        max_workers = self.max_workers or os.cpu_count() or 1
+        max_in_flight = 2 * max_workers
+        with ProcessPoolExecutor(max_workers) as executor:
+            in_flight: Deque[Future] = deque()
+            for path in self.note_paths:
+                if len(in_flight) >= max_in_flight:
+                    yield in_flight.popleft().result()
+                in_flight.append(
+                    executor.submit(
+                        summarize_note_file, path, self.category_list, self.match_mode
+                    )
+                )
+            while len(in_flight) > 0:
+                yield in_flight.popleft().result()
+
+    def run(
+        self,
+        terminal_note_parser: Optional[TerminalParser] = None,
+        on_file_done: Optional[Callable[[FileSummary], None]] = None,
+    ) -> None:
+        """Categorizes every file and merges the totals. The totals of each file
+        are merged as it arrives and then dropped. Only the files with unknown
+        notes are kept until the end.
+        # Parameters
+        * `terminal_note_parser` - When given, it is used to resolve the notes
+        that could not be categorized (across all files) before merging them.
+        * `on_file_done` - Called with the summary of every file, once final
+        (i.e. to print or record it). Files with unknown notes come last.
+        """
+        files_with_unknowns: List[FileSummary] = []
+        for summary in self.iter_file_summaries():
+            self.file_count += 1
+            if len(summary.problems_summary) > 0:
+                LOGGER.warning(
+                    "Problems found in %s:\n%s", summary.path, summary.problems_summary
+                )
+            if len(summary.unknown_notes) > 0:
+                files_with_unknowns.append(summary)
+            else:
+                self._merge_file(summary, on_file_done)
+
+        if terminal_note_parser is not None and len(files_with_unknowns) > 0:
+            self._resolve_unknowns(terminal_note_parser, files_with_unknowns)
+        for summary in files_with_unknowns:
+            self.unknown_notes.extend(summary.unknown_notes)
+            self._merge_file(summary, on_file_done)
+
+    def file_summary_to_str(self, summary: FileSummary) -> str:
+        """Generates a string with the totals of a single file in a human-readable
+        manner"""
+        res = f"File {summary.path}:\n"
+        res += self._totals_to_str(summary.category_time, summary.category_note_count)
+        if len(summary.unknown_notes) > 0:
+            res += f"Unknown category notes: {len(summary.unknown_notes)}\n"
+        res += "---------------------------------------------------------\n"
+        return res
+
+    def results_to_str(self) -> str:
+        """Generates a string with the merged totals in a human-readable manner"""
+        res = f"All {self.file_count} files:\n"
+        res += self._totals_to_str(self.merged_time, self.merged_note_count)
+
+        if len(self.unknown_notes) > 0:
+            res += "\nUnknown category notes: "
+            res += "".join(f"\n{note}" for note in self.unknown_notes)
+        return res
+
+    def _merge_file(
+        self,
+        summary: FileSummary,
+        on_file_done: Optional[Callable[[FileSummary], None]],
+    ) -> None:
+        """Adds the totals of the file to the merged totals"""
+        for category, minutes in summary.category_time.items():
+            self.merged_time[category] = self.merged_time.get(category, 0) + minutes
+            self.merged_note_count[category] = (
+                self.merged_note_count.get(category, 0)
+                + summary.category_note_count[category]
+            )
+        if on_file_done is not None:
+            on_file_done(summary)
+
+    def _totals_to_str(
+        self,
+        category_time: Dict[Category, int],
+        category_note_count: Dict[Category, int],
+    ) -> str:
+        """Renders the totals of every category into a string"""
+        res = ""
+        for category in self.category_list:
+            res += f"{category.name}: {category_time.get(category, 0)} minutes "
+            res += f"({category_note_count.get(category, 0)} notes)\n"
+        return res
+
+    def _resolve_unknowns(
+        self,
+        terminal_note_parser: TerminalParser,
+        files_with_unknowns: List[FileSummary],
+    ) -> None:
+        """Resolves the unknown notes of every file at once, then adds them to
+        the totals of the file they came from"""
+        note_to_summary: Dict[int, FileSummary] = {
+            id(note): summary
+            for summary in files_with_unknowns
+            for note in summary.unknown_notes
+        }
+        parsed_data = ParsedData({}, [], False)
+        for summary in files_with_unknowns:
+            parsed_data.unknown_assignments.extend(summary.unknown_notes)
+        terminal_note_parser.resolve_unknowns(parsed_data)
+
+        for summary in files_with_unknowns:
+            summary.unknown_notes.clear()
+        for note in parsed_data.get_unknown_notes():
+            note_to_summary[id(note)].unknown_notes.append(note)
+        for category, category_notes in parsed_data.known_assignments.items():
+            for note in category_notes:
+                summary = note_to_summary[id(note)]
+                summary.category_time[category] = (
+                    summary.category_time.get(category, 0)
+                    + note.time.compute_time_difference()
+                )
+                summary.category_note_count[category] = (
+                    summary.category_note_count.get(category, 0) + 1
+                )
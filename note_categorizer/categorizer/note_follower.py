@@ -0,0 +1,148 @@
+"""Module responsible for following (tailing) a notes file. Only lines appended
+since the last check get parsed and categorized, so keeping a live view of the
+category totals costs time proportional to the new lines."""
+from pathlib import Path
+from typing import List
+from typing import Optional
+import os
+import time
+
+from note_categorizer.categorizer.category_reloader import CategoryReloader
+from note_categorizer.categorizer.parser import ParsedData, TerminalParser
+from note_categorizer.common.category import Category
+from note_categorizer.common.keyword_index import MatchMode
+from note_categorizer.common.notes import Note
+
+# Moves the cursor to the top left and clears the terminal so the summary is
+# redrawn in place.
+CLEAR_TERMINAL = "\033[H\033[2J"
+
+
+# pylint: disable=too-many-instance-attributes
+class NoteFollower:
+    """Follows a notes file (and its category file), keeping running per-category
+    totals and the unknown notes up to date as lines get appended."""
+
+    def __init__(
+        self,
+        notes_path: Path,
+        category_path: Path,
+        is_verbose: bool = False,
+        use_category_cache: bool = True,
+        match_mode: MatchMode = MatchMode.SUBSTRING,
+    ) -> None:
+        self.notes_path = notes_path
+        self.category_path = category_path
+        self.is_verbose = is_verbose
+        self.match_mode = match_mode
+        self.categories = CategoryReloader(category_path, use_category_cache)
+
+        # Byte offset into the notes file that has already been parsed
+        self._offset = 0
+        # Bytes after the last newline. The line is still being written.
+        self._partial_line = b""
+        # Every note seen so far. Only re-parsed if the categories change.
+        self._notes: List[Note] = []
+
+        self.parser: TerminalParser
+        self.parsed_data: ParsedData
+        self._reparse_notes()
+
+    def poll(self) -> int:
+        """Checks the category and notes file for changes and categorizes any
+        newly appended notes.
+        # Return
+        The number of new notes parsed."""
+        if self.categories.reload_if_changed():
+            self._reparse_notes()
+
+        new_lines: List[str] = self._read_new_lines()
+        new_notes: List[Note] = []
+        for note_line in new_lines:
+            new_note: Optional[Note] = Note.from_str(note_line)
+            if new_note is not None:
+                new_notes.append(new_note)
+
+        self._notes.extend(new_notes)
+        self.parser.parse_additional_notes(
+            new_notes, self.parsed_data, accumulate_totals=True
+        )
+        return len(new_notes)
+
+    def follow(self, poll_interval_sec: float) -> None:
+        """Polls the files forever, redrawing the summary whenever something
+        changed. Returns when interrupted by the user (ctrl+c)."""
+        try:
+            has_changes = True
+            while True:
+                if has_changes:
+                    print(CLEAR_TERMINAL + self.summary_to_str(), flush=True)
+                time.sleep(poll_interval_sec)
+                generation_before = self.categories.generation
+                has_changes = (
+                    self.poll() > 0 or generation_before != self.categories.generation
+                )
+        except KeyboardInterrupt:
+            print("\nStopped following notes.")
+
+    def summary_to_str(self) -> str:
+        """Renders the running totals and unknown notes into a string.
+        Independent of how many notes have been categorized."""
+        res = f"Following {self.notes_path}\n"
+        res += "---------------------------------------------------------\n"
+        for category in self.parser.valid_categories:
+            category_notes = self.parsed_data.get_category_notes(category)
+            note_count = 0 if category_notes is None else len(category_notes)
+            res += f"{category.name}: {self.get_category_time(category)} minutes "
+            res += f"({note_count} notes)\n"
+
+        if not self.parsed_data.is_fully_parsed():
+            res += "\nUnknown category notes: "
+            for note in self.parsed_data.get_unknown_notes():
+                res += f"\n{note}"
+        return res
+
+    def get_category_time(self, category: Category) -> int:
+        """Returns the running time in MINUTES for notes in the category"""
+        if self.parser.category_total_time is None:
+            return 0
+        return self.parser.category_total_time.get(category, 0)
+
+    def _reparse_notes(self) -> None:
+        """Re-categorizes every note seen so far with the current categories.
+        Only happens when the category file changes."""
+        self.parser = TerminalParser.from_compiled_categories(
+            self.categories.get(), {}, self.is_verbose, self.match_mode
+        )
+        self.parsed_data = ParsedData({}, [], self.is_verbose)
+        self.parser.parse_additional_notes(
+            self._notes, self.parsed_data, accumulate_totals=True
+        )
+
+    def _read_new_lines(self) -> List[str]:
+        """Reads the complete lines appended to the notes file since the last read.
+        If the file shrank (i.e. it was rewritten), it is re-read from the start."""
+        try:
+            file_size = os.path.getsize(self.notes_path)
+        except FileNotFoundError:
+            return []
+
+        if file_size < self._offset:
+            self._offset = 0
+            self._partial_line = b""
+            self._notes = []
+            self.parser.category_total_time = {}
+            self.parsed_data = ParsedData({}, [], self.is_verbose)
+
+        if file_size == self._offset:
+            return []
+
+        with open(self.notes_path, "rb") as notes_file:
+            notes_file.seek(self._offset)
+            new_bytes = notes_file.read()
+        self._offset += len(new_bytes)
+
+        raw_lines = (self._partial_line + new_bytes).split(b"\n")
+        # The last element is either empty or a line that is not yet finished
+        self._partial_line = raw_lines.pop()
+        return [raw_line.decode("utf-8") for raw_line in raw_lines]
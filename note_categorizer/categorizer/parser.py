@@ -5,14 +5,61 @@ from typing import Dict
 from typing import List
 from typing import Optional
 from typing import NamedTuple
+from typing import Tuple
 from typing import Type, TypeVar
 from dataclasses import dataclass
+from dataclasses import field
 import abc
-
+import logging
+import time
+
+from note_categorizer.categorizer.assignment_store import AssignmentStore
+from note_categorizer.categorizer.classification_cache import ClassificationCache
+from note_categorizer.categorizer.compiled_categories import CompiledCategories
+from note_categorizer.categorizer.interval_index import union_minutes
+from note_categorizer.categorizer.similarity_index import SimilarityIndex
+from note_categorizer.categorizer.similarity_index import SimilarNote
 from note_categorizer.common.category import Category
+from note_categorizer.common.keyword_index import KeywordIndex, MatchMode
 from note_categorizer.common.notes import Note
 
 
+# How many notes are parsed between checks of the parse deadline
+DEADLINE_CHECK_INTERVAL = 256
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ParseDeadlineExceeded(Exception):
+    """Raised when parsing uses more CPU time than it was given"""
+
+    def __init__(self, parsed_note_count: int, total_note_count: int) -> None:
+        super().__init__(
+            f"Parse deadline exceeded after {parsed_note_count} of "
+            + f"{total_note_count} notes"
+        )
+        self.parsed_note_count = parsed_note_count
+        self.total_note_count = total_note_count
+
+
+def check_cpu_deadline(
+    cpu_deadline: Optional[float], note_idx: int, total_note_count: int
+) -> None:
+    """Raises ParseDeadlineExceeded once the `time.thread_time()` is past the
+    deadline. The clock is only read every `DEADLINE_CHECK_INTERVAL` notes."""
+    if (
+        cpu_deadline is not None
+        and note_idx % DEADLINE_CHECK_INTERVAL == 0
+        and time.thread_time() > cpu_deadline
+    ):
+        raise ParseDeadlineExceeded(note_idx, total_note_count)
+
+
+class RequiresTerminal(Exception):
+    """Raised when a run needs the user's terminal (i.e. to prompt for the category
+    of unknown notes), but is running without one (i.e. within the daemon)"""
+
+
 class ParsedData(NamedTuple):
     """Represents parsed data"""
 
@@ -30,17 +77,24 @@ class ParsedData(NamedTuple):
         """
         return len(self.unknown_assignments) == 0
 
-    def add_to_known_assignments(self, note: Note, category: Category) -> None:
+    def add_to_known_assignments(
+        self, note: Note, category: Category, check_unknowns: bool = True
+    ) -> None:
         """Adds the note to the correct category.
-        Creates the category in the dict if it isn't present already."""
-        if self.is_verbose:
-            print(f"Adding note '{note}' to category '{category}'")
+        Creates the category in the dict if it isn't present already.
+        # Parameters
+        * `check_unknowns` - Set to False when the note is known to not be in
+        the unknowns (i.e. it was just parsed). Skips a scan of every unknown note.
+        """
+        # Called for every note, so skip formatting unless it gets logged
+        if self.is_verbose and LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug("Adding note '%s' to category '%s'", note, category)
         category_info: List[Note] = self.known_assignments.get(category, [])
         category_info.append(note)
         self.known_assignments[category] = category_info
 
         # If this note used to be unknown, remove it
-        if note in self.unknown_assignments:
+        if check_unknowns and note in self.unknown_assignments:
             self.unknown_assignments.remove(note)
 
     def get_category_notes(self, category: Category) -> Optional[List[Note]]:
@@ -58,6 +112,18 @@ class ParsedData(NamedTuple):
         """Adds a note to the list of ungrouped notes"""
         self.unknown_assignments.append(note)
 
+    def pop_unknown_note(self, note: Note) -> Optional[Note]:
+        """Removes the first unknown note that is the same as `note`, ignoring case
+        and whitespace (see `Note.normalize_info`).
+        # Return
+        * The removed note.
+        * None if no unknown note is the same."""
+        note_key = Note.normalize_info(str(note))
+        for unknown_idx, unknown_note in enumerate(self.unknown_assignments):
+            if Note.normalize_info(str(unknown_note)) == note_key:
+                return self.unknown_assignments.pop(unknown_idx)
+        return None
+
     def move_unknown_to_known(
         self, unknown_note_index: int, new_category: Category
     ) -> None:
@@ -84,6 +150,16 @@ class Parser(abc.ABC):
 
     is_verbose: bool = False
 
+    match_mode: MatchMode = MatchMode.SUBSTRING
+
+    # Only used for whole word matching. Built on first use.
+    _keyword_index: Optional[KeywordIndex] = field(default=None, init=False, repr=False)
+
+    # Remembers the category of info that was already categorized
+    classification_cache: ClassificationCache = field(
+        default_factory=ClassificationCache, init=False, repr=False
+    )
+
     def get_valid_category_list_str(self) -> List[str]:
         """Returns a list of strings where each element represents the
         string form of a category"""
@@ -94,6 +170,13 @@ class Parser(abc.ABC):
     def add_category(self, new_category: Category) -> None:
         """Adds a category to the list"""
         self.valid_categories.append(new_category)
+        self.invalidate_category_caches()
+
+    def invalidate_category_caches(self) -> None:
+        """Forgets everything derived from the categories.
+        Must be called whenever `valid_categories` or `match_mode` is changed."""
+        self._keyword_index = None
+        self.classification_cache.clear()
 
     def get_category_by_name(self, name: str) -> Optional[Category]:
         """Returns a category (if it exists) based on its name"""
@@ -106,6 +189,7 @@ class Parser(abc.ABC):
     def from_json_notation(
         cls: Type[ParserStatic],
         serial_list: List[dict],
+        match_mode: MatchMode = MatchMode.SUBSTRING,
     ) -> Optional[ParserStatic]:
         """Instantiates object of class when the input data is a list rendered
         from a json file (i.e. after load).
@@ -116,13 +200,41 @@ class Parser(abc.ABC):
         category_list: Optional[List[Category]] = Category.from_serial_list(serial_list)
         res: Optional[ParserStatic] = None
         if category_list is not None:
-            res = cls(category_list, None)
+            res = cls(category_list, None, match_mode=match_mode)
+        return res
+
+    @classmethod
+    def from_compiled_categories(
+        cls: Type[ParserStatic],
+        compiled_categories: CompiledCategories,
+        category_total_time: Optional[Dict[Category, int]],
+        is_verbose: bool = False,
+        match_mode: MatchMode = MatchMode.SUBSTRING,
+    ) -> ParserStatic:
+        """Instantiates object of class using categories that are already compiled.
+        The compiled keyword index is reused rather than rebuilt."""
+        res = cls(
+            compiled_categories.get_category_list(),
+            category_total_time,
+            is_verbose,
+            match_mode,
+        )
+        if match_mode == MatchMode.WHOLE_WORD:
+            # pylint: disable=protected-access
+            res._keyword_index = compiled_categories.keyword_index
         return res
 
     def compute_category_time(
-        self, category: Category, fully_parsed_data: ParsedData
+        self,
+        category: Category,
+        fully_parsed_data: ParsedData,
+        count_overlaps_once: bool = False,
     ) -> None:
-        """Computes the total time for the given category and saves it."""
+        """Computes the total time for the given category and saves it.
+        # Parameters
+        * `count_overlaps_once` - When True, minutes covered by several notes of
+        the category (overlapping time ranges) are only counted once.
+        """
         if self.category_total_time is None:
             self.category_total_time = {}
 
@@ -131,11 +243,18 @@ class Parser(abc.ABC):
             return
 
         new_total_time = 0
+        minute_ranges: List[Tuple[int, int]] = []
         for note in category_notes_list:
+            minute_range = note.time.get_minute_range()
+            if count_overlaps_once and minute_range is not None:
+                minute_ranges.append(minute_range)
+                continue
             current_note_diff = note.time.compute_time_difference()
             new_total_time += current_note_diff
 
-        self.category_total_time[category] = new_total_time
+        self.category_total_time[category] = new_total_time + union_minutes(
+            minute_ranges
+        )
 
     def get_category_time(self, category: Category) -> int:
         """Returns the overall time difference in MINUTES for notes in the category"""
@@ -143,19 +262,46 @@ class Parser(abc.ABC):
             return self.category_total_time[category]
         return 0
 
-    def parse_notes(self, notes: List[Note]) -> ParsedData:
+    def parse_notes(
+        self, notes: List[Note], cpu_deadline: Optional[float] = None
+    ) -> ParsedData:
         """Parses the notes and splits them up by category as much as possible.
+        # Parameters
+        * `cpu_deadline` - See `parse_additional_notes`.
         # Return
         The parsed data.
         """
         parsed_data: ParsedData = ParsedData({}, [], self.is_verbose)
-        for note in notes:
-            category_found: bool = self._add_note_to_category(note, parsed_data)
-            if category_found is False:
-                parsed_data.add_unknown_note(note)
-
+        self.parse_additional_notes(notes, parsed_data, cpu_deadline)
         return parsed_data
 
+    def parse_additional_notes(
+        self,
+        notes: List[Note],
+        parsed_data: ParsedData,
+        cpu_deadline: Optional[float] = None,
+        accumulate_totals: bool = False,
+    ) -> None:
+        """Categorizes notes into already parsed data (i.e. notes appended to a
+        file since it was last parsed). The cost is proportional to the new notes.
+        # Parameters
+        * `cpu_deadline` - The `time.thread_time()` by which parsing must be done.
+        Raises ParseDeadlineExceeded once passed, leaving the data partially parsed.
+        * `accumulate_totals` - When True, the minutes of the new notes are added
+        to `category_total_time` rather than recalculated from scratch. Only for
+        callers that parse every note once (i.e. following a file).
+        """
+        for note_idx, note in enumerate(notes):
+            check_cpu_deadline(cpu_deadline, note_idx, len(notes))
+            category: Optional[Category] = self._add_note_to_category(note, parsed_data)
+            if category is None:
+                parsed_data.add_unknown_note(note)
+            elif accumulate_totals and self.category_total_time is not None:
+                self.category_total_time[category] = (
+                    self.category_total_time.get(category, 0)
+                    + note.time.compute_time_difference()
+                )
+
     def results_to_str(
         self, completed_parsing: ParsedData, display_time_sums: bool
     ) -> str:
@@ -196,23 +342,59 @@ class Parser(abc.ABC):
     def resolve_unknowns(self, parsed_data: ParsedData) -> ParsedData:
         """Further parses the data by resolving unknown categorizations"""
 
-    def calculate_category_time(self, parsed_data: ParsedData) -> None:
-        """Computers the total time spent (in minutes) on each category."""
+    def calculate_category_time(
+        self, parsed_data: ParsedData, count_overlaps_once: bool = False
+    ) -> None:
+        """Computers the total time spent (in minutes) on each category.
+        See `compute_category_time` for `count_overlaps_once`."""
         for category in self.valid_categories:
             if category is None:
                 continue
-            self.compute_category_time(category, parsed_data)
+            self.compute_category_time(category, parsed_data, count_overlaps_once)
 
-    def _add_note_to_category(self, note: Note, parsed_data: ParsedData) -> bool:
+    def _add_note_to_category(
+        self, note: Note, parsed_data: ParsedData
+    ) -> Optional[Category]:
         """# Return
-        True if a category was found for the note.
-        False if no valid category for the note was found.
+        * The category the note was added to if a category was found for it.
+        * None if no valid category for the note was found.
         """
-        for category in self.valid_categories:
-            if category.is_keyword_present(note.info):
-                parsed_data.add_to_known_assignments(note, category)
-                return True
-        return False
+        category: Optional[Category] = self.get_category_for_info(note.info)
+        if category is not None:
+            parsed_data.add_to_known_assignments(note, category, False)
+        return category
+
+    def get_category_for_info(self, info: str) -> Optional[Category]:
+        """Finds the first valid category with a keyword in the info of a note.
+        # Return
+        * The category if one is found.
+        * None otherwise."""
+        # Words don't depend on whitespace, but substrings might
+        if self.match_mode == MatchMode.WHOLE_WORD:
+            cache_key = Note.normalize_info(info)
+        else:
+            cache_key = info.lower()
+
+        is_cached, category_idx = self.classification_cache.get(cache_key)
+        if not is_cached:
+            category_idx = self._find_category_index(cache_key)
+            self.classification_cache.put(cache_key, category_idx)
+        return None if category_idx is None else self.valid_categories[category_idx]
+
+    def _find_category_index(self, info: str) -> Optional[int]:
+        """Scans the keywords of the categories for the first one in the info.
+        # Return
+        * The index of the category if one is found.
+        * None otherwise."""
+        if self.match_mode == MatchMode.WHOLE_WORD:
+            if self._keyword_index is None:
+                self._keyword_index = KeywordIndex(self.valid_categories)
+            return self._keyword_index.find_category_index(info)
+
+        for category_idx, category in enumerate(self.valid_categories):
+            if category.is_keyword_present(info):
+                return category_idx
+        return None
 
 
 class TerminalParser(Parser):
@@ -223,24 +405,90 @@ class TerminalParser(Parser):
         valid_categories: List[Category],
         category_total_time: Optional[Dict[Category, int]],
         is_verbose: bool = False,
+        match_mode: MatchMode = MatchMode.SUBSTRING,
+        assignment_store: Optional[AssignmentStore] = None,
     ):
         self.valid_categories = valid_categories
         self.is_verbose = is_verbose
-        super().__init__(valid_categories, category_total_time, is_verbose)
+        # Remembers the answers of the user. Consulted before prompting.
+        self.assignment_store = (
+            assignment_store if assignment_store is not None else AssignmentStore()
+        )
+        # When False, RequiresTerminal is raised instead of prompting the user
+        self.can_prompt = True
+        super().__init__(valid_categories, category_total_time, is_verbose, match_mode)
 
     def resolve_unknowns(self, parsed_data: ParsedData) -> ParsedData:
-        """Further parses the data by resolving unknown categorizations
-        by prompting the user."""
-        while not parsed_data.is_fully_parsed():
-            selected_category: Category = self._prompt_user(
-                parsed_data.get_unknown_notes()[0]
-            )
-            parsed_data.move_unknown_to_known(0, selected_category)
+        """Further parses the data by resolving unknown categorizations.
+        Notes with the same (normalized) info are resolved together. Previous
+        answers from the assignment store are used before prompting the user.
+        Each prompt suggests the category of the most similar categorized note."""
+        # Insertion order keeps the prompts in the order of the notes
+        unknown_groups: Dict[str, List[Note]] = {}
+        for note in parsed_data.get_unknown_notes():
+            unknown_groups.setdefault(Note.normalize_info(note.info), []).append(note)
+
+        # The first category with a name wins, as in get_category_by_name
+        category_by_name: Dict[str, Category] = {}
+        for category in self.valid_categories:
+            category_by_name.setdefault(category.name.lower(), category)
+
+        similarity_index: Optional[SimilarityIndex] = None
+        for normalized_info, group_notes in unknown_groups.items():
+            stored_name = self.assignment_store.get_category_name(normalized_info)
+            selected_category: Optional[Category] = None
+            if stored_name is not None:
+                selected_category = category_by_name.get(stored_name.lower())
+            if selected_category is None:
+                if not self.can_prompt:
+                    raise RequiresTerminal(
+                        f"The category of '{group_notes[0].info}' must be picked"
+                    )
+                if similarity_index is None:
+                    similarity_index = self._create_similarity_index(
+                        parsed_data, category_by_name
+                    )
+                selected_category = self._prompt_user(
+                    group_notes[0],
+                    len(group_notes),
+                    similarity_index.suggest_category(normalized_info),
+                )
+                self.assignment_store.record(normalized_info, selected_category)
+                similarity_index.add(normalized_info, selected_category)
+
+            for note in group_notes:
+                parsed_data.add_to_known_assignments(note, selected_category, False)
+
+        parsed_data.unknown_assignments.clear()
         print("Done Resolving unknown notes!\n----------------------------\n\n")
         return parsed_data
 
-    def _prompt_user(self, note: Note) -> Category:
+    def _create_similarity_index(
+        self, parsed_data: ParsedData, category_by_name: Dict[str, Category]
+    ) -> SimilarityIndex:
+        """# Return
+        An index of the categorized notes and of the previous answers"""
+        similarity_index = SimilarityIndex.from_known_assignments(
+            parsed_data.known_assignments
+        )
+        for normalized_info, category_name in self.assignment_store.items():
+            category = category_by_name.get(category_name.lower())
+            if category is not None:
+                similarity_index.add(normalized_info, category)
+        return similarity_index
+
+    def _prompt_user(
+        self,
+        note: Note,
+        same_info_count: int = 1,
+        suggestion: Optional[SimilarNote] = None,
+    ) -> Category:
         """Prompts the user to get the correct category for the note.
+        # Parameters
+        * `same_info_count` - How many notes (including this one) have the same
+        info and get resolved by this answer.
+        * `suggestion` - A similar categorized note. Its category is picked when
+        nothing is entered.
         # Post Condition
         The category returned MUST be a valid category.
         """
@@ -252,8 +500,18 @@ class TerminalParser(Parser):
                 print(f"{idx}) {category}")
 
             input_msg = f"Please select the category for this note: {note}"
+            if same_info_count > 1:
+                input_msg += f"\n(Also applies to {same_info_count - 1} other "
+                input_msg += "notes with the same info)"
+            if suggestion is not None:
+                input_msg += f"\nSuggested: {suggestion.category.name} (similar to "
+                input_msg += f"'{suggestion.info}'). Press enter to accept it."
             input_msg += "\nResponse) "
             selected_category_idx_str = input(input_msg)
+            if suggestion is not None and selected_category_idx_str.strip() == "":
+                selected_category = suggestion.category
+                print("\n")
+                continue
 
             invalid_selection_msg = "That option is not valid. "
             invalid_selection_msg_suffix = " Please try again.\n\n"
@@ -286,10 +544,11 @@ class WebParser(Parser):
         valid_categories: List[Category],
         category_total_time: Dict[Category, int] | None,
         is_verbose: bool = False,
+        match_mode: MatchMode = MatchMode.SUBSTRING,
     ):
         self.valid_categories = valid_categories
         self.is_verbose = is_verbose
-        super().__init__(valid_categories, category_total_time, is_verbose)
+        super().__init__(valid_categories, category_total_time, is_verbose, match_mode)
 
     def resolve_unknowns(self, parsed_data: ParsedData) -> ParsedData:
         """Further parses the data by resolving unknown categorizations
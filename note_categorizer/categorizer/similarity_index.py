@@ -0,0 +1,155 @@
+"""Module responsible for suggesting a category for notes that could not be
+categorized, based on the categorized notes they are most similar to. Similarity is
+the overlap of the character trigrams of the infos (so "standup mtg" is similar to
+"standup meeting"). An inverted index maps each trigram to the infos containing it,
+so only infos sharing trigrams with the note are ever compared."""
+from typing import Dict
+from typing import FrozenSet
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Set
+import heapq
+
+from note_categorizer.common.category import Category
+from note_categorizer.common.keyword_index import tokenize
+from note_categorizer.common.notes import Note
+
+DEFAULT_SUGGESTION_COUNT = 3
+
+# Infos sharing fewer of their trigrams are not considered similar
+DEFAULT_MIN_SIMILARITY = 0.3
+
+# Upper bound on the index entries looked at to find the infos to compare against.
+# The trigrams shared by the fewest infos are looked at first, so very common
+# trigrams are the ones skipped. When even the rarest trigram is too common, only
+# its most recently added infos are looked at.
+DEFAULT_MAX_SCANNED_POSTINGS = 20000
+
+
+class SimilarNote(NamedTuple):
+    """A categorized info similar to the one asked about"""
+
+    info: str
+    category: Category
+    # Jaccard similarity of the trigrams, from 0 to 1
+    similarity: float
+
+
+def get_trigrams(info: str) -> Set[str]:
+    """# Return
+    The trigrams of every word of the info. Words are padded so that short words
+    and the start of words still have trigrams (i.e. "id" -> "  i", " id", "id ")."""
+    trigrams: Set[str] = set()
+    for word in tokenize(info):
+        padded_word = f"  {word} "
+        for char_idx in range(len(padded_word) - 2):
+            trigrams.add(padded_word[char_idx : char_idx + 3])
+    return trigrams
+
+
+class SimilarityIndex:
+    """Inverted index from trigram to the categorized infos containing it.
+    Notes with the same normalized info are stored once, with the category they
+    were most recently added to."""
+
+    def __init__(
+        self, max_scanned_postings: int = DEFAULT_MAX_SCANNED_POSTINGS
+    ) -> None:
+        self.max_scanned_postings = max_scanned_postings
+        # Trigram -> ids of the infos containing it
+        self._postings: Dict[str, List[int]] = {}
+        # Normalized info -> its id
+        self._info_ids: Dict[str, int] = {}
+        # Indexed by the id of an info
+        self._infos: List[str] = []
+        self._categories: List[Category] = []
+        self._trigram_sets: List[FrozenSet[str]] = []
+
+    def __len__(self) -> int:
+        return len(self._infos)
+
+    @classmethod
+    def from_known_assignments(
+        cls, known_assignments: Dict[Category, List[Note]]
+    ) -> "SimilarityIndex":
+        """Creates an index of every categorized note (i.e. of
+        `ParsedData.known_assignments`)"""
+        similarity_index = cls()
+        for category, category_notes in known_assignments.items():
+            for note in category_notes:
+                similarity_index.add(note.info, category)
+        return similarity_index
+
+    def add(self, info: str, category: Category) -> None:
+        """Adds a categorized info to the index"""
+        normalized_info = Note.normalize_info(info)
+        info_id = self._info_ids.get(normalized_info)
+        if info_id is not None:
+            self._categories[info_id] = category
+            return
+
+        trigrams = get_trigrams(normalized_info)
+        if len(trigrams) == 0:
+            return
+        info_id = len(self._infos)
+        self._info_ids[normalized_info] = info_id
+        self._infos.append(normalized_info)
+        self._categories.append(category)
+        self._trigram_sets.append(frozenset(trigrams))
+        for trigram in trigrams:
+            self._postings.setdefault(trigram, []).append(info_id)
+
+    def find_similar(
+        self,
+        info: str,
+        max_count: int = DEFAULT_SUGGESTION_COUNT,
+        min_similarity: float = DEFAULT_MIN_SIMILARITY,
+    ) -> List[SimilarNote]:
+        """# Return
+        The (up to) `max_count` categorized infos most similar to the info, most
+        similar first. Only the infos sharing one of its rarest trigrams are
+        compared."""
+        query_trigrams = get_trigrams(Note.normalize_info(info))
+        posting_lists = sorted(
+            (
+                self._postings[trigram]
+                for trigram in query_trigrams
+                if trigram in self._postings
+            ),
+            key=len,
+        )
+
+        candidate_ids: Set[int] = set()
+        scanned_postings = 0
+        for posting_list in posting_lists:
+            if scanned_postings + len(posting_list) > self.max_scanned_postings:
+                if scanned_postings == 0:
+                    candidate_ids.update(posting_list[-self.max_scanned_postings :])
+                break
+            scanned_postings += len(posting_list)
+            candidate_ids.update(posting_list)
+
+        similar_notes: List[SimilarNote] = []
+        for info_id in candidate_ids:
+            trigram_set = self._trigram_sets[info_id]
+            shared_count = len(query_trigrams & trigram_set)
+            similarity = shared_count / (
+                len(query_trigrams) + len(trigram_set) - shared_count
+            )
+            if similarity >= min_similarity:
+                similar_notes.append(
+                    SimilarNote(
+                        self._infos[info_id], self._categories[info_id], similarity
+                    )
+                )
+        return heapq.nlargest(
+            max_count, similar_notes, key=lambda similar_note: similar_note.similarity
+        )
+
+    def suggest_category(self, info: str) -> Optional[SimilarNote]:
+        """# Return
+        * The most similar categorized info, whose category is the suggestion.
+        * None if no categorized info is similar enough."""
+        similar_notes = self.find_similar(info, 1)
+        return similar_notes[0] if len(similar_notes) > 0 else None
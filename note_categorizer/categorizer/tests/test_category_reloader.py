@@ -0,0 +1,73 @@
+"""Tests the category_reloader module"""
+from pathlib import Path
+from typing import List
+import os
+import time
+
+import pytest
+
+from note_categorizer.categorizer.category_reloader import CategoryReloader
+
+
+def _get_names(reloader: CategoryReloader) -> List[str]:
+    return [category.name for category in reloader.get().categories]
+
+
+def test_reload_swaps_categories(tmp_path: Path) -> None:
+    """A reload swaps in new categories, leaving the previous set untouched"""
+    category_path = tmp_path / "categories.txt"
+    category_path.write_text("Bob Dylan: music concert\n", encoding="utf-8")
+    reloader = CategoryReloader(category_path)
+    previous = reloader.get()
+
+    assert not reloader.reload_if_changed()
+    assert not reloader.reload()
+    assert reloader.generation == 0
+
+    category_path.write_text("Giant:\nBreak: lunch\n", encoding="utf-8")
+    assert reloader.reload_if_changed()
+    assert reloader.generation == 1
+    assert _get_names(reloader) == ["Giant", "Break"]
+    assert [category.name for category in previous.categories] == ["Bob Dylan"]
+
+    # Mid-save, the current categories are kept
+    os.remove(category_path)
+    assert not reloader.reload_if_changed()
+    assert _get_names(reloader) == ["Giant", "Break"]
+
+
+def test_failed_reload_is_retried(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A change which fails to compile is compiled again on the next check"""
+    category_path = tmp_path / "categories.txt"
+    category_path.write_text("Giant:\n", encoding="utf-8")
+    reloader = CategoryReloader(category_path, use_cache=False)
+
+    def failing_compile() -> None:
+        raise OSError("Read in the middle of a save")
+
+    category_path.write_text("Giant:\nBreak: lunch\n", encoding="utf-8")
+    monkeypatch.setattr(reloader, "_compile", failing_compile)
+    with pytest.raises(OSError):
+        reloader.reload_if_changed()
+    monkeypatch.undo()
+
+    assert reloader.reload_if_changed()
+    assert _get_names(reloader) == ["Giant", "Break"]
+
+
+def test_watching_reloads_changes(tmp_path: Path) -> None:
+    """The background watcher swaps in changes to the file"""
+    category_path = tmp_path / "categories.txt"
+    category_path.write_text("Giant:\n", encoding="utf-8")
+    reloader = CategoryReloader(category_path, use_cache=False)
+    reloader.start_watching(0.01)
+    try:
+        category_path.write_text("Peter Pan: magic child\n", encoding="utf-8")
+        deadline = time.monotonic() + 5
+        while reloader.generation == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        reloader.stop_watching()
+    assert _get_names(reloader) == ["Peter Pan"]
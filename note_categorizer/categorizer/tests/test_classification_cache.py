@@ -0,0 +1,44 @@
+"""Tests the classification_cache module"""
+from note_categorizer.categorizer.classification_cache import ClassificationCache
+from note_categorizer.categorizer.parser import WebParser
+from note_categorizer.common.category import Category
+from note_categorizer.common.notes import Note
+
+
+def test_lru_eviction() -> None:
+    """The least recently used key is evicted once full"""
+    cache = ClassificationCache(2)
+    cache.put("standup", 0)
+    cache.put("lunch", None)
+    assert cache.get("standup") == (True, 0)
+    cache.put("code review", 1)
+
+    assert cache.get("lunch") == (False, None)
+    assert cache.get("standup") == (True, 0)
+    assert cache.get("code review") == (True, 1)
+    assert len(cache) == 2
+    assert cache.hits == 3 and cache.misses == 1
+
+
+def test_parser_memoizes_repeated_info() -> None:
+    """Repeated info hits the cache, and adding a category invalidates it"""
+    parser = WebParser([Category("meetings", ["standup"])], None)
+    note_lines = ["09:00-09:15: standup", "10:00-10:15: Standup", "11:00-11:30: lunch"]
+    notes = [Note.from_str(note_line) for note_line in note_lines] * 2
+    parsed_data = parser.parse_notes([note for note in notes if note is not None])
+
+    assert len(parsed_data.get_unknown_notes()) == 2
+    assert parser.classification_cache.misses == 2
+    assert parser.classification_cache.hits == 4
+
+    parser.add_category(Category("breaks", ["lunch"]))
+    assert len(parser.classification_cache) == 0
+    assert parser.get_category_for_info("lunch") == Category("breaks", [])
+
+
+def test_repeated_info_is_interned() -> None:
+    """Notes with the same info share the same string"""
+    first = Note.from_str("09:00-09:15: " + "".join(["stand", "up"]))
+    second = Note.from_str("10:00-10:15: " + "".join(["stan", "dup"]))
+    assert first is not None and second is not None
+    assert first.info is second.info
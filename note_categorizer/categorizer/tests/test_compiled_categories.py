@@ -0,0 +1,119 @@
+"""Tests the compiled_categories module"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+import json
+import pickle
+
+import pytest
+
+from note_categorizer.categorizer.compiled_categories import CompiledCategories
+from note_categorizer.categorizer.compiled_categories import CompiledCategoryCache
+from note_categorizer.categorizer.compiled_categories import CompiledCategoryLru
+from note_categorizer.categorizer.text_file_reader import CategoryReader
+from note_categorizer.common.category import Category
+from note_categorizer.common.keyword_index import KeywordIndex
+
+
+def test_artifact_reused_until_file_changes(tmp_path: Path) -> None:
+    """The artifact is loaded for unchanged content and recompiled otherwise"""
+    category_path = tmp_path / "categories.txt"
+    category_path.write_text("Bob Dylan: music concert\nGiant:\n", encoding="utf-8")
+
+    cache = CompiledCategoryCache(category_path)
+    compiled = cache.load()
+    assert cache.get_artifact_path().exists()
+    assert [category.name for category in compiled.categories] == [
+        "Bob Dylan",
+        "Giant",
+    ]
+    assert compiled.categories[0].is_keyword_present("the DYLAN concert")
+
+    reloaded = CompiledCategoryCache(category_path).load()
+    assert reloaded.source_hash == compiled.source_hash
+    assert reloaded.categories == compiled.categories
+    assert [category.get_keywords() for category in reloaded.categories] == [
+        category.get_keywords() for category in compiled.categories
+    ]
+
+    category_path.write_text("Peter Pan: magic child\n", encoding="utf-8")
+    recompiled = CompiledCategoryCache(category_path).load()
+    assert recompiled.source_hash != compiled.source_hash
+    assert [category.name for category in recompiled.categories] == ["Peter Pan"]
+
+
+def test_corrupt_artifact_is_recompiled(tmp_path: Path) -> None:
+    """A corrupt artifact falls back to compiling the category file"""
+    category_path = tmp_path / "categories.txt"
+    category_path.write_text("Giant:\n", encoding="utf-8")
+    cache = CompiledCategoryCache(category_path)
+    # i.e. an artifact of an older version (pickled), which is never unpickled
+    cache.get_artifact_path().write_bytes(pickle.dumps({"version": 2}))
+
+    assert [category.name for category in cache.generate_list()] == ["Giant"]
+    assert CompiledCategoryCache(category_path).load().categories[0].name == "Giant"
+
+    artifact = json.loads(cache.get_artifact_path().read_text(encoding="utf-8"))
+    artifact["categories"] = [{"name": "Giant", "keywords": "not a list"}]
+    cache.get_artifact_path().write_text(json.dumps(artifact), encoding="utf-8")
+    assert CompiledCategoryCache(category_path).load().categories[0].name == "Giant"
+
+
+def test_artifact_load_skips_compiling(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The artifact restores the keywords and keyword index without compiling"""
+    category_path = tmp_path / "categories.txt"
+    category_path.write_text("Bob Dylan: music concert\nGiant:\n", encoding="utf-8")
+    CompiledCategoryCache(category_path).load()
+
+    def fail_compiling(*_args: object) -> None:
+        raise AssertionError("The artifact was compiled again")
+
+    monkeypatch.setattr(CategoryReader, "categories_from_lines", fail_compiling)
+    monkeypatch.setattr(Category, "generate_keywords_from_name", fail_compiling)
+    monkeypatch.setattr(KeywordIndex, "__init__", fail_compiling)
+    loaded = CompiledCategoryCache(category_path).load()
+    assert loaded.categories[0].get_keywords() == ["music", "concert", "bob", "dylan"]
+    assert loaded.keyword_index.find_category_index("a Giant step") == 1
+
+
+def test_keyword_index_built_on_first_use(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Substring matching never builds the keyword index"""
+    built_indexes: List[KeywordIndex] = []
+    build_index = KeywordIndex.__init__
+
+    def count_built_index(index: KeywordIndex, categories: List[Category]) -> None:
+        built_indexes.append(index)
+        build_index(index, categories)
+
+    monkeypatch.setattr(KeywordIndex, "__init__", count_built_index)
+    compiled = CompiledCategories.compile(["Giant:"], "hash")
+    assert compiled.categories[0].is_keyword_present("a giant step")
+    assert len(built_indexes) == 0
+    assert compiled.keyword_index.find_category_index("a giant step") == 0
+    assert compiled.keyword_index is built_indexes[0]
+    assert len(built_indexes) == 1
+
+
+def test_lru_shares_compiled_categories() -> None:
+    """The same lines (ignoring whitespace) share one compilation, and the least
+    recently used lines are evicted once full"""
+    lru = CompiledCategoryLru(max_size=2)
+    compiled = lru.get(["Bob Dylan: music concert", "Giant:"])
+    assert lru.get(["  Bob Dylan: music concert\n", "", "Giant:"]) is compiled
+    assert [category.name for category in compiled.categories] == [
+        "Bob Dylan",
+        "Giant",
+    ]
+
+    lru.get(["Peter Pan: magic child"])
+    lru.get(["Bob Dylan: music concert", "Giant:"])
+    lru.get(["Hook: pirate"])
+    assert len(lru) == 2
+    assert lru.get(["Bob Dylan: music concert", "Giant:"]) is compiled
+    assert (lru.hits, lru.misses) == (3, 3)
+
+    with ThreadPoolExecutor(8) as executor:
+        shared = list(executor.map(lambda _: lru.get(["Wendy: nursery"]), range(32)))
+    assert all(compiled is shared[0] for compiled in shared)
@@ -0,0 +1,106 @@
+"""Tests the daemon and daemon_client modules"""
+from pathlib import Path
+from typing import Iterator
+from typing import List
+import os
+import threading
+
+import pytest
+
+from note_categorizer.categorizer.daemon import CategorizerDaemon
+from note_categorizer.categorizer.daemon_client import SOCKET_PATH_ENV
+from note_categorizer.categorizer.daemon_client import get_default_socket_path
+from note_categorizer.categorizer.daemon_client import send_request
+
+# The cli looks up its default paths from the repo of the working directory
+PROJECT_ROOT_PATH = str(Path(__file__).resolve().parents[3])
+
+
+@pytest.fixture(name="daemon")
+def fixture_daemon(tmp_path: Path) -> Iterator[CategorizerDaemon]:
+    """A daemon serving in the background"""
+    daemon = CategorizerDaemon(tmp_path / "daemon.sock")
+    threading.Thread(target=daemon.serve_forever, daemon=True).start()
+    yield daemon
+    daemon.shutdown()
+    daemon.server_close()
+
+
+def _write_files(tmp_path: Path, notes: str) -> List[str]:
+    """# Return
+    The cli args to categorize the notes"""
+    category_path = tmp_path / "categories.txt"
+    category_path.write_text("Bob Dylan: music concert\nGiant:\n", encoding="utf-8")
+    notes_path = tmp_path / "notes.txt"
+    notes_path.write_text(notes, encoding="utf-8")
+    return ["-cp", str(category_path), "-np", str(notes_path)]
+
+
+def test_runs_within_daemon(tmp_path: Path, daemon: CategorizerDaemon) -> None:
+    """Runs are forwarded to the daemon, which keeps the categories compiled"""
+    argv = _write_files(tmp_path, "10:00-10:30: Bob concert\n11:00-11:15: Giant\n")
+    argv.append("--add_times")
+
+    response = send_request(argv, PROJECT_ROOT_PATH, daemon.socket_path)
+    assert response is not None and response.exit_code == 0
+    assert "Bob Dylan" in response.stdout and "30" in response.stdout
+
+    response = send_request(argv, PROJECT_ROOT_PATH, daemon.socket_path)
+    assert response is not None and response.exit_code == 0
+    assert daemon.warm_caches.compiled_categories.hits == 1
+
+    response = send_request(
+        ["--match_mode", "nope"], PROJECT_ROOT_PATH, daemon.socket_path
+    )
+    assert response is not None and response.exit_code == 2
+    assert "invalid choice" in response.stderr
+
+
+def test_falls_back_without_terminal(tmp_path: Path, daemon: CategorizerDaemon) -> None:
+    """Runs which need to prompt the user are left to the client"""
+    argv = _write_files(tmp_path, "10:00-10:30: lunch\n")
+    assert send_request(argv, PROJECT_ROOT_PATH, daemon.socket_path) is None
+    assert (
+        send_request(argv + ["--follow"], PROJECT_ROOT_PATH, daemon.socket_path) is None
+    )
+
+    # Once the answer is stored, the daemon can run it
+    (tmp_path / ".categories.txt.assignments.json").write_text(
+        '{"lunch": "Giant"}', encoding="utf-8"
+    )
+    assert send_request(argv, PROJECT_ROOT_PATH, daemon.socket_path) is not None
+
+
+def test_no_daemon(tmp_path: Path) -> None:
+    """Without a daemon, the client runs the cli itself"""
+    assert send_request(["--help"], str(tmp_path), tmp_path / "missing.sock") is None
+
+
+def test_socket_of_other_users_is_not_trusted(
+    tmp_path: Path, daemon: CategorizerDaemon
+) -> None:
+    """Sockets which other users could have made (or can use) are never connected
+    to, and the default one is kept in a directory private to the user"""
+    argv = _write_files(tmp_path, "10:00-10:30: Bob concert\n")
+    os.chmod(daemon.socket_path, 0o666)
+    assert send_request(argv, PROJECT_ROOT_PATH, daemon.socket_path) is None
+    os.chmod(daemon.socket_path, 0o600)
+    assert send_request(argv, PROJECT_ROOT_PATH, daemon.socket_path) is not None
+
+    symlink_path = tmp_path / "link.sock"
+    symlink_path.symlink_to(daemon.socket_path)
+    assert send_request(argv, PROJECT_ROOT_PATH, symlink_path) is None
+
+
+def test_default_socket_path(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Without a runtime dir, the socket goes in a directory of the user's own"""
+    monkeypatch.delenv(SOCKET_PATH_ENV, raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+    assert get_default_socket_path() == Path(
+        f"/run/user/1000/note_categorizer_{os.getuid()}.sock"
+    )
+
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    socket_path = get_default_socket_path()
+    assert socket_path is not None
+    assert socket_path.parent.name == f"note_categorizer_{os.getuid()}"
@@ -0,0 +1,166 @@
+"""Tests the distributed module"""
+from pathlib import Path
+from typing import Iterator
+from typing import List
+import socket
+import threading
+
+import pytest
+
+from note_categorizer.categorizer import distributed
+from note_categorizer.categorizer.compiled_categories import CompiledCategories
+from note_categorizer.categorizer.distributed import CategorizerWorker
+from note_categorizer.categorizer.distributed import DistributedCategorizer
+from note_categorizer.categorizer.distributed import DistributedRunFailed
+from note_categorizer.categorizer.distributed import WorkerAddress
+from note_categorizer.categorizer.distributed import parse_worker_address
+from note_categorizer.categorizer.multi_file_reader import FileSummary
+from note_categorizer.categorizer.multi_file_reader import MultiFileCategorizer
+from note_categorizer.common.keyword_index import MatchMode
+
+CATEGORY_LINES = ["Bob Dylan: music concert\n", "Giant:\n"]
+
+
+class _FailingWorker(CategorizerWorker):
+    """A worker that can't categorize anything"""
+
+    def summarize_file(
+        self,
+        path: str,
+        content: str,
+        compiled_categories: CompiledCategories,
+        match_mode: MatchMode,
+    ) -> FileSummary:
+        raise OSError("disk on fire")
+
+
+def _get_address(worker: CategorizerWorker) -> WorkerAddress:
+    return ("127.0.0.1", worker.server_address[1])
+
+
+@pytest.fixture(name="workers")
+def fixture_workers() -> Iterator[List[CategorizerWorker]]:
+    """Two workers serving on localhost"""
+    workers = [CategorizerWorker(("127.0.0.1", 0)) for _ in range(2)]
+    for worker in workers:
+        threading.Thread(target=worker.serve_forever, daemon=True).start()
+    yield workers
+    for worker in workers:
+        worker.shutdown()
+        worker.server_close()
+
+
+def _write_notes(tmp_path: Path, file_count: int) -> List[Path]:
+    note_paths = []
+    for idx in range(file_count):
+        note_path = tmp_path / f"notes_{idx}.txt"
+        note_path.write_text(
+            f"10:00-10:{10 + idx}: concert\n11:00-11:10: giant\nlunch {idx}\n",
+            encoding="utf-8",
+        )
+        note_paths.append(note_path)
+    return note_paths
+
+
+def _create_categorizer(
+    note_paths: List[Path], workers: List[WorkerAddress]
+) -> DistributedCategorizer:
+    compiled_categories = CompiledCategories.compile(CATEGORY_LINES, "")
+    return DistributedCategorizer(
+        compiled_categories.get_category_list(),
+        CATEGORY_LINES,
+        note_paths,
+        workers,
+        # Two files each
+        shard_bytes=100,
+    )
+
+
+def test_matches_local_run(tmp_path: Path, workers: List[CategorizerWorker]) -> None:
+    """Workers categorize the files like local processes, compiling the
+    categories once each"""
+    note_paths = _write_notes(tmp_path, 7)
+    categorizer = _create_categorizer(
+        note_paths, [_get_address(worker) for worker in workers]
+    )
+    file_summaries: List[FileSummary] = []
+    categorizer.run(on_file_done=file_summaries.append)
+
+    local_categorizer = MultiFileCategorizer(categorizer.category_list, note_paths, 1)
+    local_file_summaries: List[FileSummary] = []
+    local_categorizer.run(on_file_done=local_file_summaries.append)
+    assert file_summaries == local_file_summaries
+    assert categorizer.merged_time == local_categorizer.merged_time
+    assert sum(worker.shards_done for worker in workers) == 4
+    assert all(worker.compiled_categories.misses <= 1 for worker in workers)
+
+
+def test_failed_shards_are_retried(
+    tmp_path: Path, workers: List[CategorizerWorker]
+) -> None:
+    """Shards of a failing (or unreachable) worker are retried on another"""
+    failing_worker = _FailingWorker(("127.0.0.1", 0))
+    threading.Thread(target=failing_worker.serve_forever, daemon=True).start()
+    with socket.socket() as unused_socket:
+        unused_socket.bind(("127.0.0.1", 0))
+        unreachable_address = unused_socket.getsockname()
+    note_paths = _write_notes(tmp_path, 6)
+
+    categorizer = _create_categorizer(
+        note_paths,
+        [_get_address(failing_worker), _get_address(workers[0]), unreachable_address],
+    )
+    file_summaries: List[FileSummary] = []
+    categorizer.run(on_file_done=file_summaries.append)
+    failing_worker.shutdown()
+    failing_worker.server_close()
+
+    assert [summary.path for summary in file_summaries] == note_paths
+    assert workers[0].shards_done == 3
+    assert len(file_summaries[5].unknown_notes) == 1
+
+    categorizer = _create_categorizer(note_paths, [unreachable_address])
+    with pytest.raises(DistributedRunFailed):
+        categorizer.run()
+
+
+def test_too_large_files_fail_clearly(
+    tmp_path: Path, workers: List[CategorizerWorker], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Files no worker could take fail the run before being sent, naming the file"""
+    monkeypatch.setattr(distributed, "MAX_MESSAGE_BYTES", 400)
+    note_paths = _write_notes(tmp_path, 2)
+    worker_addresses = [_get_address(worker) for worker in workers]
+
+    note_paths[1].write_text("+5: concert\n" * 40, encoding="utf-8")
+    with pytest.raises(DistributedRunFailed, match="notes_1.txt is 480 bytes"):
+        _create_categorizer(note_paths, worker_addresses).run()
+
+    # Small on disk, but too large once escaped in the message
+    note_paths[1].write_text("\x01" * 150, encoding="utf-8")
+    with pytest.raises(DistributedRunFailed, match="notes_1.txt is .* once sent"):
+        _create_categorizer(note_paths, worker_addresses).run()
+    # Only the first shard may have run, the too large one was never sent
+    assert sum(worker.shards_done for worker in workers) <= 1
+
+
+def test_unreadable_file_fails_run(
+    tmp_path: Path, workers: List[CategorizerWorker]
+) -> None:
+    """A notes file which isn't UTF-8 fails the run (naming the file) rather than
+    being retried on the workers"""
+    note_paths = _write_notes(tmp_path, 3)
+    note_paths[1].write_bytes(b"\xff\xfe")
+    categorizer = _create_categorizer(
+        note_paths, [_get_address(worker) for worker in workers]
+    )
+    with pytest.raises(DistributedRunFailed, match="notes_1.txt"):
+        categorizer.run()
+
+
+def test_parse_worker_address() -> None:
+    """Worker addresses are HOST:PORT, or just HOST"""
+    assert parse_worker_address("10.0.0.2:4000") == ("10.0.0.2", 4000)
+    assert parse_worker_address("[::1]:4000") == ("::1", 4000)
+    assert parse_worker_address("worker-3") == ("worker-3", 53692)
+    assert parse_worker_address("worker-3:http") is None
@@ -0,0 +1,94 @@
+"""Tests the exporters module"""
+import csv
+import io
+import json
+from pathlib import Path
+from typing import Tuple
+
+import pytest
+
+from note_categorizer.categorizer.exporters import ExportFormat
+from note_categorizer.categorizer.exporters import ExportRowType
+from note_categorizer.categorizer.exporters import read_binary_export
+from note_categorizer.categorizer.exporters import write_export
+from note_categorizer.categorizer.main import run_cli
+from note_categorizer.categorizer.parser import ParsedData, WebParser
+from note_categorizer.common.category import Category
+from note_categorizer.common.notes import Note
+
+
+def _parse_example_notes() -> Tuple[WebParser, ParsedData]:
+    categories = [Category("meetings", ["standup"]), Category("breaks", ["lunch"])]
+    parser = WebParser(categories, None)
+    note_lines = [
+        "09:45-10:15: standup, with a comma",
+        "11:30-12:30: lunch",
+        "+20: lunch with no time range",
+        "13:00-13:10: unknown thing",
+    ]
+    notes = [Note.from_str(note_line) for note_line in note_lines]
+    parsed_data = parser.parse_notes([note for note in notes if note is not None])
+    parser.calculate_category_time(parsed_data)
+    return parser, parsed_data
+
+
+def _export(export_format: ExportFormat, row_type: ExportRowType) -> bytes:
+    parser, parsed_data = _parse_example_notes()
+    output_stream = io.BytesIO()
+    write_export(output_stream, parser, parsed_data, export_format, row_type)
+    return output_stream.getvalue()
+
+
+def test_csv_note_rows() -> None:
+    """Every note is a csv row, with times as HH:MM"""
+    csv_text = _export(ExportFormat.CSV, ExportRowType.NOTES).decode("utf-8")
+    rows = list(csv.DictReader(io.StringIO(csv_text)))
+    assert len(rows) == 4
+    assert rows[0] == {
+        "category": "meetings",
+        "start": "09:45",
+        "end": "10:15",
+        "minutes": "30",
+        "info": "standup, with a comma",
+    }
+    assert rows[2]["start"] == "" and rows[2]["minutes"] == "20"
+    assert rows[3]["category"] == ""
+
+
+def test_jsonl_total_rows() -> None:
+    """Every category is a json line with its total time"""
+    jsonl_text = _export(ExportFormat.JSONL, ExportRowType.TOTALS).decode("utf-8")
+    rows = [json.loads(line) for line in jsonl_text.splitlines()]
+    assert rows == [
+        {"category": "meetings", "minutes": 30, "note_count": 1},
+        {"category": "breaks", "minutes": 80, "note_count": 2},
+    ]
+
+
+def test_binary_round_trip() -> None:
+    """The binary export reads back into the same typed rows"""
+    binary_export = _export(ExportFormat.BINARY, ExportRowType.NOTES)
+    rows = list(read_binary_export(io.BytesIO(binary_export)))
+    assert len(rows) == 4
+    assert rows[0]["start"] == 585 and rows[0]["end"] == 615
+    assert rows[2]["start"] is None and rows[2]["minutes"] == 20
+    assert rows[3]["info"] == "unknown thing"
+
+
+def test_export_to_stdout(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    """With --export_path -, stdout only gets the export"""
+    category_path = tmp_path / "categories.txt"
+    category_path.write_text("meetings: standup\n", encoding="utf-8")
+    notes_path = tmp_path / "notes.txt"
+    notes_path.write_text("09:45-10:15: standup\n10:15-10:30: demo\n", encoding="utf-8")
+    # The unknown note is resolved by the stored assignment, without a prompt
+    (tmp_path / ".categories.txt.assignments.json").write_text(
+        '{"demo": "meetings"}', encoding="utf-8"
+    )
+    argv = ["-cp", str(category_path), "-np", str(notes_path), "--add_times"]
+    run_cli(argv + ["--export_path", "-", "--export_format", "jsonl"])
+
+    captured = capsys.readouterr()
+    rows = [json.loads(line) for line in captured.out.splitlines()]
+    assert [row["info"] for row in rows] == ["standup", "demo"]
+    assert "Done Resolving unknown notes!" in captured.err
@@ -0,0 +1,77 @@
+"""Tests the history module"""
+from datetime import date
+from pathlib import Path
+from typing import List
+
+from note_categorizer.categorizer.history import CategoryTotal
+from note_categorizer.categorizer.history import HistoryPeriod
+from note_categorizer.categorizer.history import HistoryStore
+from note_categorizer.categorizer.history import infer_run_date
+from note_categorizer.categorizer.parser import WebParser
+from note_categorizer.common.category import Category
+from note_categorizer.common.notes import Note
+
+
+def _record(
+    history_store: HistoryStore, run_date: date, source: str, note_lines: List[str]
+) -> None:
+    categories = [Category("meetings", ["standup"]), Category("breaks", ["lunch"])]
+    parser = WebParser(categories, None)
+    notes = [Note.from_str(note_line) for note_line in note_lines]
+    parsed_data = parser.parse_notes([note for note in notes if note is not None])
+    history_store.record_parsed_data(run_date, source, parser, parsed_data)
+
+
+def test_totals_by_period(tmp_path: Path) -> None:
+    """Runs of different days add up, and can be split by month"""
+    history_store = HistoryStore(tmp_path / "history.db")
+    _record(
+        history_store,
+        date(2023, 1, 30),
+        "a.txt",
+        ["09:00-09:15: standup", "12:00-13:00: lunch", "13:00-13:10: unknown"],
+    )
+    _record(history_store, date(2023, 1, 31), "a.txt", ["09:00-09:30: standup"])
+    _record(history_store, date(2023, 2, 1), "a.txt", ["09:00-09:10: standup"])
+
+    assert history_store.get_category_totals(date(2023, 1, 1), date(2023, 1, 31)) == [
+        CategoryTotal("", "breaks", 60, 1),
+        CategoryTotal("", "meetings", 45, 2),
+    ]
+    assert history_store.get_category_totals(
+        date(2023, 1, 1), date(2023, 12, 31), HistoryPeriod.MONTH
+    ) == [
+        CategoryTotal("2023-01", "breaks", 60, 1),
+        CategoryTotal("2023-01", "meetings", 45, 2),
+        CategoryTotal("2023-02", "meetings", 10, 1),
+    ]
+    history_store.close()
+
+
+def test_rerecording_replaces_run(tmp_path: Path) -> None:
+    """Recording the same source and date again replaces its totals"""
+    db_path = tmp_path / "history.db"
+    history_store = HistoryStore(db_path)
+    run_date = date(2023, 1, 30)
+    _record(history_store, run_date, "a.txt", ["09:00-09:15: standup"])
+    _record(history_store, run_date, "b.txt", ["12:00-12:30: lunch"])
+    _record(history_store, run_date, "a.txt", ["09:00-10:00: standup"])
+    _record(history_store, run_date, "b.txt", [])
+    history_store.close()
+
+    # Reopening keeps the rollups
+    history_store = HistoryStore(db_path)
+    assert history_store.get_category_totals(run_date, run_date) == [
+        CategoryTotal("", "meetings", 60, 1)
+    ]
+    history_store.close()
+
+
+def test_infer_run_date() -> None:
+    """The date in the notes file name is used when there is one"""
+    default_date = date(2020, 5, 5)
+    assert infer_run_date(Path("notes_2023-01-31.txt"), default_date) == date(
+        2023, 1, 31
+    )
+    assert infer_run_date(Path("notes_2023-13-31.txt"), default_date) == default_date
+    assert infer_run_date(Path("notes.txt"), default_date) == default_date
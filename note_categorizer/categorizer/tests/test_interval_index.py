@@ -0,0 +1,69 @@
+"""Tests the interval_index module"""
+import random
+from typing import List
+from typing import Tuple
+
+from note_categorizer.categorizer.interval_index import IntervalIndex
+from note_categorizer.categorizer.interval_index import union_minutes
+from note_categorizer.categorizer.parser import ParsedData, WebParser
+from note_categorizer.common.category import Category
+from note_categorizer.common.notes import Note
+
+
+def _parse(parser: WebParser, note_lines: List[str]) -> ParsedData:
+    """Parses the note lines with the parser"""
+    notes = [Note.from_str(note_line) for note_line in note_lines]
+    return parser.parse_notes([note for note in notes if note is not None])
+
+
+def test_union_minutes_matches_brute_force() -> None:
+    """Each minute covered by any range is counted exactly once"""
+    rng = random.Random(3)
+    minute_ranges: List[Tuple[int, int]] = []
+    for _ in range(100):
+        start = rng.randrange(0, 1400)
+        minute_ranges.append((start, start + rng.randrange(0, 60)))
+    covered = {minute for start, end in minute_ranges for minute in range(start, end)}
+    assert union_minutes(minute_ranges) == len(covered)
+    assert union_minutes([]) == 0
+
+
+def test_find_overlaps_within_and_across_categories() -> None:
+    """Overlapping stretches are reported with every note involved"""
+    categories = [Category("meetings", ["standup"]), Category("email", [])]
+    parser = WebParser(categories, None)
+    parsed_data = _parse(
+        parser,
+        [
+            "09:00-10:00: standup",
+            "09:30-09:45: email",
+            "09:50-10:30: standup again",
+            "10:30-11:00: email",
+        ],
+    )
+
+    interval_index = IntervalIndex(parsed_data.known_assignments)
+    overlaps = interval_index.find_overlaps()
+    assert [(overlap.start_minute, overlap.end_minute) for overlap in overlaps] == [
+        (570, 585),
+        (590, 600),
+    ]
+    assert len(overlaps[0].notes) == 2
+    assert {categorized.category for categorized in overlaps[0].notes} == set(
+        categories
+    )
+    assert interval_index.get_overlapping_minutes() == 25
+
+
+def test_union_category_time() -> None:
+    """Union mode counts overlapping minutes of a category once"""
+    category = Category("meetings", ["standup"])
+    parser = WebParser([category], None)
+    parsed_data = _parse(
+        parser, ["09:00-10:00: standup", "09:30-10:30: standup", "+15: standup"]
+    )
+
+    parser.calculate_category_time(parsed_data)
+    assert parser.get_category_time(category) == 135
+    parser.calculate_category_time(parsed_data, count_overlaps_once=True)
+    assert parser.get_category_time(category) == 105
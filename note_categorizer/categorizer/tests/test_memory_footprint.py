@@ -0,0 +1,165 @@
+"""Guards the memory used by each stage of categorizing notes. Each stage is run
+over generated notes files of two sizes and its retained and peak memory (traced
+with tracemalloc) are compared, so fixed costs (i.e. imports and caches filled on
+first use) cancel out and only the cost per note is checked against its budget.
+Every stage is warmed up once first, so the result doesn't depend on which tests
+ran before. Each size is measured twice and the lower usage kept, so one-off
+growth of interpreter tables (i.e. of interned strings) isn't counted per note.
+The classification cache is disabled, as it only grows up to its max size.
+Budgets are roughly 1.5x the recorded usage, so a change which bloats
+Note / NoteTime / ParsedData fails here. Update the budgets deliberately when the
+usage is expected to change."""
+from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import NamedTuple
+from typing import Tuple
+from typing import TypeVar
+import gc
+import tracemalloc
+
+from note_categorizer.categorizer.classification_cache import ClassificationCache
+from note_categorizer.categorizer.parser import WebParser
+from note_categorizer.categorizer.text_file_reader import NoteReader
+from note_categorizer.common.category import Category
+
+# The note counts measured. The budgets apply to the difference between them.
+SMALL_NOTE_COUNT = 2500
+LARGE_NOTE_COUNT = 5000
+# Notes of the run warming up every stage, which isn't measured
+WARM_UP_NOTE_COUNT = 50
+# Runs measured of each note count, of which the lowest usage is kept
+MEASURED_RUN_COUNT = 2
+
+StageResult = TypeVar("StageResult")
+
+
+class StageBudget(NamedTuple):
+    """Bytes per note a stage may use"""
+
+    # Still allocated once the stage is done (i.e. the size of its result)
+    retained: int
+    # The most allocated at once during the stage
+    peak: int
+
+
+# Recorded: read 354 / 450, parse 8 / 8, times 0 / 0, results 40 / 59
+STAGE_BUDGETS: Dict[str, StageBudget] = {
+    "read": StageBudget(retained=550, peak=700),
+    "parse": StageBudget(retained=16, peak=16),
+    "calculate_times": StageBudget(retained=8, peak=16),
+    "results_to_str": StageBudget(retained=60, peak=100),
+}
+
+CATEGORIES = [
+    Category("meetings", ["standup", "call"]),
+    Category("breaks", ["lunch"]),
+    Category("review", ["review"]),
+]
+
+NOTE_INFOS = [
+    "standup with the team",
+    "client call about the contract",
+    "lunch break",
+    "reviewing documents",
+    "something unknown",
+]
+
+
+def _write_notes_file(notes_path: Path, note_count: int) -> None:
+    """Writes the notes, with a mix of categories and unknowns"""
+    note_lines = []
+    for note_idx in range(note_count):
+        hour = 8 + (note_idx // 60) % 10
+        minute = note_idx % 60
+        end_minute = min(minute + 5, 59)
+        info = NOTE_INFOS[note_idx % len(NOTE_INFOS)]
+        note_lines.append(
+            f"{hour:02d}:{minute:02d}-{hour:02d}:{end_minute:02d}: {info} {note_idx}\n"
+        )
+    notes_path.write_text("".join(note_lines), encoding="utf-8")
+
+
+def _measure(stage: Callable[[], StageResult]) -> Tuple[StageResult, Tuple[int, int]]:
+    """Runs the stage while tracing allocations.
+    # Return
+    The result of the stage, and the bytes it retained and peaked at."""
+    gc.collect()
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    start_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    result = stage()
+    end_bytes, peak_bytes = tracemalloc.get_traced_memory()
+    if not was_tracing:
+        tracemalloc.stop()
+    return result, (end_bytes - start_bytes, peak_bytes - start_bytes)
+
+
+def _measure_stages(notes_path: Path, note_count: int) -> Dict[str, Tuple[int, int]]:
+    """Runs every stage over a notes file with the note count.
+    # Return
+    The bytes each stage retained and peaked at."""
+    _write_notes_file(notes_path, note_count)
+    parser = WebParser(list(CATEGORIES), None)
+    # Every note has its own info, so the cache would only fill up to its max size
+    # within one of the note counts and skew the cost per note
+    parser.classification_cache = ClassificationCache(0)
+    stage_bytes: Dict[str, Tuple[int, int]] = {}
+
+    notes, stage_bytes["read"] = _measure(
+        lambda: NoteReader(notes_path).generate_list()
+    )
+    assert len(notes) == note_count
+
+    parsed_data, stage_bytes["parse"] = _measure(lambda: parser.parse_notes(notes))
+    assert len(parsed_data.get_unknown_notes()) == note_count // len(NOTE_INFOS)
+
+    _, stage_bytes["calculate_times"] = _measure(
+        lambda: parser.calculate_category_time(parsed_data)
+    )
+
+    results_str, stage_bytes["results_to_str"] = _measure(
+        lambda: parser.results_to_str(parsed_data, True)
+    )
+    assert len(results_str) > 0
+    return stage_bytes
+
+
+def _measure_lowest_stages(
+    notes_path: Path, note_count: int
+) -> Dict[str, Tuple[int, int]]:
+    """# Return
+    The lowest bytes each stage retained and peaked at over the measured runs"""
+    runs_stage_bytes = [
+        _measure_stages(notes_path, note_count) for _ in range(MEASURED_RUN_COUNT)
+    ]
+    return {
+        stage_name: (
+            min(stage_bytes[stage_name][0] for stage_bytes in runs_stage_bytes),
+            min(stage_bytes[stage_name][1] for stage_bytes in runs_stage_bytes),
+        )
+        for stage_name in runs_stage_bytes[0]
+    }
+
+
+def test_memory_per_stage(tmp_path: Path) -> None:
+    """Reading, parsing, totalling and rendering notes stay within budget"""
+    notes_path = tmp_path / "notes.txt"
+    _measure_stages(notes_path, WARM_UP_NOTE_COUNT)
+    small_stage_bytes = _measure_lowest_stages(notes_path, SMALL_NOTE_COUNT)
+    large_stage_bytes = _measure_lowest_stages(notes_path, LARGE_NOTE_COUNT)
+
+    added_note_count = LARGE_NOTE_COUNT - SMALL_NOTE_COUNT
+    for stage_name, budget in STAGE_BUDGETS.items():
+        small_retained, small_peak = small_stage_bytes[stage_name]
+        large_retained, large_peak = large_stage_bytes[stage_name]
+        retained_per_note = (large_retained - small_retained) / added_note_count
+        peak_per_note = (large_peak - small_peak) / added_note_count
+        assert (
+            retained_per_note <= budget.retained
+        ), f"{stage_name} retained {retained_per_note:.0f} bytes per note"
+        assert (
+            peak_per_note <= budget.peak
+        ), f"{stage_name} peaked at {peak_per_note:.0f} bytes per note"
@@ -0,0 +1,53 @@
+"""Tests the multi_file_reader module"""
+from pathlib import Path
+from typing import List
+
+from note_categorizer.categorizer.multi_file_reader import FileSummary
+from note_categorizer.categorizer.multi_file_reader import MultiFileCategorizer
+from note_categorizer.categorizer.multi_file_reader import expand_note_paths
+from note_categorizer.common.category import Category
+
+
+def test_expand_note_paths(tmp_path: Path) -> None:
+    """Files, directories and globs all get expanded into files"""
+    notes_dir = tmp_path / "notes"
+    notes_dir.mkdir()
+    for name in ["a.txt", "b.txt", "c.md"]:
+        (notes_dir / name).write_text("", encoding="utf-8")
+    single_file = tmp_path / "single.txt"
+    single_file.write_text("", encoding="utf-8")
+
+    assert len(expand_note_paths([notes_dir])) == 3
+    assert len(expand_note_paths([notes_dir / "*.txt"])) == 2
+    assert expand_note_paths([single_file]) == [single_file]
+
+
+def test_multi_file_totals(tmp_path: Path) -> None:
+    """Per-file and merged totals are computed across processes"""
+    category_list = [Category("bob", ["concert"]), Category("giant", [])]
+    notes = [
+        "10:00-10:30: concert\n11:00-11:10: giant\n",
+        "09:00-09:15: concert\nsomething unknown\n",
+    ]
+    note_paths = []
+    for idx, file_notes in enumerate(notes):
+        note_path = tmp_path / f"notes_{idx}.txt"
+        note_path.write_text(file_notes, encoding="utf-8")
+        note_paths.append(note_path)
+
+    categorizer = MultiFileCategorizer(category_list, note_paths, 2)
+    file_summaries: List[FileSummary] = []
+    categorizer.run(on_file_done=file_summaries.append)
+
+    # Files with unknown notes are only final at the end
+    assert [summary.path for summary in file_summaries] == note_paths
+    assert file_summaries[0].category_time[category_list[0]] == 30
+    assert categorizer.merged_time[category_list[0]] == 45
+    assert categorizer.merged_note_count[category_list[0]] == 2
+    assert categorizer.merged_time[category_list[1]] == 10
+    assert len(file_summaries[1].unknown_notes) == 1
+    assert len(categorizer.unknown_notes) == 1
+    assert "bob: 45 minutes (2 notes)" in categorizer.results_to_str()
+    assert "bob: 30 minutes (1 notes)" in categorizer.file_summary_to_str(
+        file_summaries[0]
+    )
@@ -0,0 +1,56 @@
+"""Tests the note_follower module"""
+from pathlib import Path
+
+from note_categorizer.categorizer.note_follower import NoteFollower
+
+
+def _write_categories(category_path: Path) -> None:
+    category_path.write_text("Bob Dylan: music concert\nGiant:\n", encoding="utf-8")
+
+
+def test_follow_appended_notes(tmp_path: Path) -> None:
+    """Only appended lines get parsed and the totals are kept up to date"""
+    category_path = tmp_path / "categories.txt"
+    notes_path = tmp_path / "notes.txt"
+    _write_categories(category_path)
+    notes_path.write_text("10:00-10:30: Bob concert\n", encoding="utf-8")
+
+    follower = NoteFollower(notes_path, category_path)
+    assert follower.poll() == 1
+    bob = follower.parser.get_category_by_name("Bob Dylan")
+    giant = follower.parser.get_category_by_name("Giant")
+    assert bob is not None and giant is not None
+    assert follower.get_category_time(bob) == 30
+    assert follower.poll() == 0
+
+    with open(notes_path, "a", encoding="utf-8") as notes_file:
+        notes_file.write("11:00-11:15: Giant stomping\n12:00-12:05: lunch\n13:00-13")
+    assert follower.poll() == 2
+    assert follower.get_category_time(giant) == 15
+    assert len(follower.parsed_data.get_unknown_notes()) == 1
+
+    # The partially written line is parsed once it is finished
+    with open(notes_path, "a", encoding="utf-8") as notes_file:
+        notes_file.write(":20: more music\n")
+    assert follower.poll() == 1
+    assert follower.get_category_time(bob) == 50
+    assert "Bob Dylan: 50 minutes (2 notes)" in follower.summary_to_str()
+
+
+def test_follow_category_change(tmp_path: Path) -> None:
+    """Changing the category file re-categorizes the notes seen so far"""
+    category_path = tmp_path / "categories.txt"
+    notes_path = tmp_path / "notes.txt"
+    _write_categories(category_path)
+    notes_path.write_text("12:00-12:05: lunch\n", encoding="utf-8")
+
+    follower = NoteFollower(notes_path, category_path)
+    follower.poll()
+    assert len(follower.parsed_data.get_unknown_notes()) == 1
+
+    category_path.write_text("Break: lunch coffee\n", encoding="utf-8")
+    follower.poll()
+    category = follower.parser.get_category_by_name("Break")
+    assert category is not None
+    assert follower.parsed_data.is_fully_parsed()
+    assert follower.get_category_time(category) == 5
@@ -1,8 +1,15 @@
 """Tests the parser module / related classes"""
+from pathlib import Path
+from typing import List
 from typing import Optional
 
+import pytest
+
+from note_categorizer.categorizer.assignment_store import AssignmentStore
 from note_categorizer.categorizer.parser import TerminalParser, WebParser, Parser
+from note_categorizer.categorizer.parser import ParsedData
 from note_categorizer.common.category import Category
+from note_categorizer.common.notes import Note
 
 data_list = [
     {"name": "bob", "keywords": ["task1"]},
@@ -40,3 +47,57 @@ def test_web_parser() -> None:
     assert isinstance(category, Category), "No category with name 'test' found."
     keyword_err_msg = "Keyword 'foo_keyword' not found in category"
     assert category.is_keyword_present("foo_keyword") is True, keyword_err_msg
+
+
+def test_resolve_unknowns_groups_and_remembers(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Notes with the same info are asked about once, and answers persist"""
+    store_path = tmp_path / "assignments.json"
+    answers: List[str] = []
+
+    def fake_input(prompt: str) -> str:
+        answers.append(prompt)
+        return "1"
+
+    monkeypatch.setattr("builtins.input", fake_input)
+    note_lines = ["10:00-10:30: Lunch", "11:00-11:15:  lunch ", "12:00-12:05: nap"]
+    notes = [Note.from_str(note_line) for note_line in note_lines]
+
+    parser = TerminalParser(
+        [Category("bob", []), Category("sally", [])],
+        {},
+        assignment_store=AssignmentStore(store_path),
+    )
+    parsed_data = parser.resolve_unknowns(
+        ParsedData({}, [note for note in notes if note is not None], False)
+    )
+    assert len(answers) == 2
+    assert parsed_data.is_fully_parsed()
+    sally_notes = parsed_data.get_category_notes(Category("sally", []))
+    assert sally_notes is not None and len(sally_notes) == 3
+
+    # A new run uses the saved answers without prompting
+    answers.clear()
+    new_parser = TerminalParser(
+        [Category("sally", [])], {}, assignment_store=AssignmentStore(store_path)
+    )
+    new_parser.resolve_unknowns(
+        ParsedData({}, [note for note in notes if note is not None], False)
+    )
+    assert len(answers) == 0
+
+
+def test_parse_notes_has_no_side_effects() -> None:
+    """Parsing the same notes again doesn't change the category times"""
+    category = Category("bob", ["task1"])
+    parser = TerminalParser([category], {})
+    note = Note.from_str("10:00-10:30: task1")
+    assert note is not None
+    parser.parse_notes([note])
+    parser.parse_notes([note])
+    assert parser.category_total_time == {}
+
+    parsed_data = ParsedData({}, [], False)
+    parser.parse_additional_notes([note], parsed_data, accumulate_totals=True)
+    assert parser.get_category_time(category) == 30
@@ -0,0 +1,81 @@
+"""Tests the similarity_index module"""
+from typing import List
+
+import pytest
+
+from note_categorizer.categorizer.parser import TerminalParser
+from note_categorizer.categorizer.similarity_index import SimilarityIndex
+from note_categorizer.categorizer.similarity_index import get_trigrams
+from note_categorizer.common.category import Category
+from note_categorizer.common.notes import Note
+
+MEETINGS = Category("meetings", ["standup"])
+BREAKS = Category("breaks", ["lunch"])
+
+
+def test_get_trigrams() -> None:
+    """Every word is padded, and case is ignored"""
+    assert get_trigrams("Id") == {"  i", " id", "id "}
+    assert get_trigrams("") == set()
+
+
+def test_find_similar() -> None:
+    """The most similar infos come first, and dissimilar ones are left out"""
+    similarity_index = SimilarityIndex()
+    similarity_index.add("standup meeting", MEETINGS)
+    similarity_index.add("Standup  Meeting", MEETINGS)
+    similarity_index.add("team lunch", BREAKS)
+    similarity_index.add("planning meeting", MEETINGS)
+    assert len(similarity_index) == 3
+
+    similar_notes = similarity_index.find_similar("standup mtg")
+    assert [similar_note.info for similar_note in similar_notes] == ["standup meeting"]
+    suggestion = similarity_index.suggest_category("lunch with the team")
+    assert suggestion is not None and suggestion.category == BREAKS
+    assert similarity_index.suggest_category("xyz") is None
+
+
+def test_scan_limit_skips_common_trigrams() -> None:
+    """Only the rarest trigrams are scanned once the limit is reached"""
+    similarity_index = SimilarityIndex(max_scanned_postings=5)
+    for idx in range(20):
+        similarity_index.add(f"meeting number {idx}", MEETINGS)
+    similarity_index.add("meeting about zebras", BREAKS)
+
+    suggestion = similarity_index.suggest_category("meeting about zebras")
+    assert suggestion is not None and suggestion.category == BREAKS
+
+
+def test_scan_limit_caps_rarest_trigram() -> None:
+    """A trigram in every info is not scanned in full, even when it is the rarest"""
+    similarity_index = SimilarityIndex(max_scanned_postings=5)
+    for idx in range(20):
+        similarity_index.add(f"standup {idx}", MEETINGS)
+    similarity_index.add("standup", BREAKS)
+
+    similar_notes = similarity_index.find_similar("standup", 100, 0.0)
+    assert 0 < len(similar_notes) <= 5
+    assert similar_notes[0].category == BREAKS
+
+
+def test_prompt_suggests_similar_category(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Entering nothing at the prompt picks the suggested category"""
+    prompts: List[str] = []
+
+    def fake_input(prompt: str) -> str:
+        prompts.append(prompt)
+        return ""
+
+    monkeypatch.setattr("builtins.input", fake_input)
+    parser = TerminalParser([MEETINGS, BREAKS], {})
+    notes = [
+        Note.from_str(note_line)
+        for note_line in ["09:00-09:15: standup", "12:00-13:00: lunch", "+5: lnch"]
+    ]
+    parsed_data = parser.parse_notes([note for note in notes if note is not None])
+    parser.resolve_unknowns(parsed_data)
+
+    assert len(prompts) == 1 and "Suggested: breaks" in prompts[0]
+    breaks_notes = parsed_data.get_category_notes(BREAKS)
+    assert breaks_notes is not None and len(breaks_notes) == 2
+    assert parsed_data.is_fully_parsed()
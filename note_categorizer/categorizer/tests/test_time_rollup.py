@@ -0,0 +1,65 @@
+"""Tests the time_rollup module"""
+import random
+from typing import List
+from typing import Tuple
+
+from note_categorizer.categorizer.parser import WebParser
+from note_categorizer.categorizer.time_rollup import CategoryTimeline
+from note_categorizer.categorizer.time_rollup import TimeRollupIndex
+from note_categorizer.categorizer.time_rollup import parse_time_window
+from note_categorizer.common.category import Category
+from note_categorizer.common.notes import Note
+
+
+def test_parse_time_window() -> None:
+    """Windows are parsed into minutes of the day"""
+    assert parse_time_window("09:00-12:00") == (540, 720)
+    assert parse_time_window("0900-24:00") == (540, 1440)
+    assert parse_time_window("12:00-09:00") is None
+    assert parse_time_window("noon-1") is None
+
+
+def test_window_matches_brute_force() -> None:
+    """Window totals match counting minute by minute, clipping partial overlaps"""
+    rng = random.Random(7)
+    minute_ranges: List[Tuple[int, int]] = []
+    for _ in range(200):
+        start = rng.randrange(0, 1400)
+        minute_ranges.append((start, start + rng.randrange(0, 40)))
+    timeline = CategoryTimeline(minute_ranges)
+
+    for _ in range(100):
+        window_start = rng.randrange(0, 1440)
+        window_end = rng.randrange(window_start, 1441)
+        expected = sum(
+            max(0, min(end, window_end) - max(start, window_start))
+            for start, end in minute_ranges
+        )
+        assert timeline.minutes_between(window_start, window_end) == expected
+
+
+def test_rollup_index_from_parsed_data() -> None:
+    """The index splits categorized notes into windows and hours"""
+    categories = [Category("meetings", ["standup"]), Category("breaks", ["lunch"])]
+    parser = WebParser(categories, None)
+    note_lines = [
+        "09:45-10:15: standup",
+        "11:30-12:30: lunch",
+        "+20: lunch with no time range",
+    ]
+    notes = [Note.from_str(note_line) for note_line in note_lines]
+    parsed_data = parser.parse_notes([note for note in notes if note is not None])
+
+    rollup_index = TimeRollupIndex(categories, parsed_data)
+    assert rollup_index.get_window_totals(540, 720) == {
+        categories[0]: 30,
+        categories[1]: 30,
+    }
+    assert rollup_index.untimed_minutes == {categories[1]: 20}
+
+    histogram = rollup_index.get_hourly_histogram()
+    assert histogram[categories[0]][9] == 15
+    assert histogram[categories[0]][10] == 15
+    assert histogram[categories[1]][11] == 30
+    assert histogram[categories[1]][12] == 30
+    assert sum(histogram[categories[1]]) == 60
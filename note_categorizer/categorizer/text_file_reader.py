@@ -10,6 +10,7 @@ import os
 import abc
 
 from note_categorizer.common.category import Category
+from note_categorizer.common.diagnostics import ProblemKind, report_problem
 from note_categorizer.common.notes import Note
 
 
@@ -50,7 +51,11 @@ class CategoryReader(TextReader):
 
     def generate_list(self) -> List[Category]:
         """Parses every line of the file to define each "category" dict"""
-        file_lines: List[str] = self.read_in_file()
+        return self.categories_from_lines(self.read_in_file())
+
+    @classmethod
+    def categories_from_lines(cls, file_lines: List[str]) -> List[Category]:
+        """Parses every line to define each category. Malformatted lines are skipped."""
         categories: List[Category] = []
 
         for category_line in file_lines:
@@ -58,11 +63,7 @@ class CategoryReader(TextReader):
                 continue
             new_category = Category.from_str(category_line)
             if new_category is None:
-                print(f"Category line {category_line} is malformatted. Skipping.")
-                valid_category_line = "Bob Dylan: music folk concert"
-                valid_category_line_no_keyword = "Giant:"
-                print("Valid category line:")
-                print(f"{valid_category_line}\n{valid_category_line_no_keyword}")
+                report_problem(ProblemKind.MALFORMED_CATEGORY_LINE, category_line)
             else:
                 categories.append(new_category)
 
@@ -79,17 +80,21 @@ class NoteReader(TextReader):
         self.validate_file_exists("note")
 
     def generate_list(self) -> List[Note]:
-        """Parses every line of the file to define each "category" dict"""
-        file_lines: List[str] = self.read_in_file()
+        """Parses every line of the file into a note. Blank lines are skipped, and
+        malformed lines are reported (see `collect_diagnostics`)."""
+        return self.notes_from_lines(self.read_in_file())
+
+    @classmethod
+    def notes_from_lines(cls, file_lines: List[str]) -> List[Note]:
+        """Parses every line into a note. Blank lines are skipped, and malformed
+        lines are reported."""
         notes: List[Note] = []
 
         for note_line in file_lines:
-            new_category: Optional[Note] = Note.from_str(note_line)
-            if new_category is None:
-                valid_note_line = "10:25-10:45: Saw Bob talking about his concert."
-                print(f"Note line {note_line} is malformatted. Skipping.")
-                print(f"Valid note line: {valid_note_line}")
-            else:
-                notes.append(new_category)
+            new_note: Optional[Note] = Note.from_str(note_line)
+            if new_note is not None:
+                notes.append(new_note)
+            elif len(note_line.strip()) > 0:
+                report_problem(ProblemKind.MALFORMED_NOTE_LINE, note_line)
 
         return notes
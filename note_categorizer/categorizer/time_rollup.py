@@ -0,0 +1,156 @@
+"""Module responsible for answering "how many minutes went to each category between
+two times of the day". Categorized notes are indexed once into sorted arrays with
+prefix sums, so any time window is answered in O(log n) per category."""
+from bisect import bisect_left
+from bisect import bisect_right
+from datetime import datetime
+from itertools import accumulate
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from note_categorizer.categorizer.parser import ParsedData
+from note_categorizer.common.category import Category
+from note_categorizer.common.notes import NoteTime
+
+MINUTES_PER_HOUR = 60
+HOURS_PER_DAY = 24
+MINUTES_PER_DAY = HOURS_PER_DAY * MINUTES_PER_HOUR
+
+
+def parse_minute_of_day(time_str: str) -> Optional[int]:
+    """Converts 'HH:MM' or 'HHMM' (24 hr time) to the minute of the day.
+    '24:00' is allowed to represent the end of the day.
+    # Return
+    * The minute of the day.
+    * None if the string is not a valid time."""
+    time_str = time_str.strip()
+    if time_str in ["24:00", "2400"]:
+        return MINUTES_PER_DAY
+    for fmt_string in ["%H:%M", "%H%M"]:
+        try:
+            parsed_time = datetime.strptime(time_str, fmt_string)
+        except ValueError:
+            continue
+        return parsed_time.hour * MINUTES_PER_HOUR + parsed_time.minute
+    return None
+
+
+def parse_time_window(window_str: str) -> Optional[Tuple[int, int]]:
+    """Converts 'HH:MM-HH:MM' to a pair of minutes of the day.
+    # Return
+    * `(start, end)` of the window.
+    * None if the string is not a valid window (or ends before it starts)."""
+    if window_str.count("-") != 1:
+        return None
+    start_str, end_str = window_str.split("-")
+    start_minute = parse_minute_of_day(start_str)
+    end_minute = parse_minute_of_day(end_str)
+    if start_minute is None or end_minute is None or end_minute < start_minute:
+        return None
+    return (start_minute, end_minute)
+
+
+class CategoryTimeline:
+    """The time ranges of a single category, sorted by start and by end with
+    prefix sums of each."""
+
+    def __init__(self, minute_ranges: List[Tuple[int, int]]) -> None:
+        self.minute_ranges = minute_ranges
+        self._starts: List[int] = sorted(start for start, _ in minute_ranges)
+        self._ends: List[int] = sorted(end for _, end in minute_ranges)
+        # _prefix[i] is the sum of the first i values
+        self._start_prefix: List[int] = list(accumulate(self._starts, initial=0))
+        self._end_prefix: List[int] = list(accumulate(self._ends, initial=0))
+
+    def minutes_before(self, minute: int) -> int:
+        """Returns the minutes of every range that fall before the given minute.
+        Ranges that started but did not end by then only count up to it."""
+        # Ranges that started before the minute contribute min(end, minute) - start
+        started_count = bisect_left(self._starts, minute)
+        ended_count = bisect_right(self._ends, minute)
+        return (
+            self._end_prefix[ended_count]
+            + minute * (started_count - ended_count)
+            - self._start_prefix[started_count]
+        )
+
+    def minutes_between(self, start_minute: int, end_minute: int) -> int:
+        """Returns the minutes of every range that fall within the window"""
+        return self.minutes_before(end_minute) - self.minutes_before(start_minute)
+
+
+class TimeRollupIndex:
+    """Indexes the categorized notes by the time of the day they happened"""
+
+    def __init__(self, categories: List[Category], parsed_data: ParsedData) -> None:
+        self.categories = categories
+        self._timelines: Dict[Category, CategoryTimeline] = {}
+
+        # Notes with just a '+<min>' time can't be placed within the day
+        self.untimed_minutes: Dict[Category, int] = {}
+
+        for category in categories:
+            minute_ranges: List[Tuple[int, int]] = []
+            for note in parsed_data.get_category_notes(category) or []:
+                minute_range = note.time.get_minute_range()
+                if minute_range is None:
+                    self.untimed_minutes[category] = (
+                        self.untimed_minutes.get(category, 0)
+                        + note.time.compute_time_difference()
+                    )
+                else:
+                    minute_ranges.append(minute_range)
+            self._timelines[category] = CategoryTimeline(minute_ranges)
+
+    def get_window_totals(
+        self, start_minute: int, end_minute: int
+    ) -> Dict[Category, int]:
+        """Returns the minutes spent on each category within the window"""
+        return {
+            category: timeline.minutes_between(start_minute, end_minute)
+            for category, timeline in self._timelines.items()
+        }
+
+    def get_hourly_histogram(self) -> Dict[Category, List[int]]:
+        """Returns the minutes spent on each category within each hour of the day.
+        Made in a single pass over the time ranges."""
+        histogram: Dict[Category, List[int]] = {}
+        for category, timeline in self._timelines.items():
+            hourly_minutes = [0] * HOURS_PER_DAY
+            for start, end in timeline.minute_ranges:
+                minute = start
+                while minute < end:
+                    hour = minute // MINUTES_PER_HOUR
+                    hour_end = min(end, (hour + 1) * MINUTES_PER_HOUR)
+                    hourly_minutes[hour] += hour_end - minute
+                    minute = hour_end
+            histogram[category] = hourly_minutes
+        return histogram
+
+    def window_totals_to_str(self, start_minute: int, end_minute: int) -> str:
+        """Renders the totals of a window in a human-readable manner"""
+        res = f"Minutes per category {NoteTime.get_minute_str(start_minute)}-"
+        res += f"{NoteTime.get_minute_str(end_minute)}:\n"
+        for category, minutes in self.get_window_totals(
+            start_minute, end_minute
+        ).items():
+            res += f"{category.name}: {minutes}\n"
+        return res
+
+    def hourly_histogram_to_str(self) -> str:
+        """Renders the hourly histogram in a human-readable manner.
+        Hours without any time are left out."""
+        histogram = self.get_hourly_histogram()
+        res = "Minutes per category per hour:\n"
+        for hour in range(HOURS_PER_DAY):
+            hour_totals = [
+                f"{category.name}: {hourly_minutes[hour]}"
+                for category, hourly_minutes in histogram.items()
+                if hourly_minutes[hour] > 0
+            ]
+            if len(hour_totals) > 0:
+                res += f"{NoteTime.get_minute_str(hour * MINUTES_PER_HOUR)} "
+                res += ", ".join(hour_totals) + "\n"
+        return res
@@ -10,6 +10,8 @@ from marshmallow import Schema, fields
 from marshmallow.decorators import post_load
 from marshmallow import ValidationError
 
+from note_categorizer.common.diagnostics import ProblemKind, report_problem
+
 # Added for static type checking on constructor functions
 StaticCategory = TypeVar("StaticCategory", bound="Category")
 
@@ -51,12 +53,17 @@ class Category:
         * `default_keywords` - The keywords passed to the constructor
         """
         name_components = self.name.split(" ")
+        existing_keywords = set(default_keywords)
         new_keywords = []
         for component in name_components:
-            if component.lower() not in default_keywords:
+            if component.lower() not in existing_keywords:
                 new_keywords.append(component.lower())
         return new_keywords
 
+    def get_keywords(self) -> List[str]:
+        """Returns the (lowercase) keywords of the category"""
+        return self._keywords
+
     def is_keyword_present(self, phrase: str) -> bool:
         """Checks the given phrase to see if any keywords of this category are present.
         # Return
@@ -82,11 +89,10 @@ class Category:
         * None if there was an error deserializing the data to the right schema
         * The list of categories"""
         try:
-            return list(
-                map(lambda serial_data: CategorySchema().load(serial_data), serial_list)
-            )
-        except ValidationError:
-            print("Your input is of the wrong form. Please check the schema")
+            # A single schema validates and loads the whole list in one pass
+            return CATEGORY_LIST_SCHEMA.load(serial_list)
+        except ValidationError as err:
+            report_problem(ProblemKind.INVALID_CATEGORY, str(err.messages))
             return None
 
     @classmethod
@@ -95,9 +101,9 @@ class Category:
     ) -> Optional[StaticCategory]:
         """Instantiates a category object from a dictionary representing it"""
         try:
-            return CategorySchema().load(serial_data_dict)
-        except ValidationError:
-            print("Your input is of the wrong form. Please check the schema")
+            return CATEGORY_SCHEMA.load(serial_data_dict)
+        except ValidationError as err:
+            report_problem(ProblemKind.INVALID_CATEGORY, str(err.messages))
             return None
 
     @classmethod
@@ -123,6 +129,19 @@ class Category:
             keywords = []
         return Category(name_keyword_pair[0], keywords)  # type: ignore
 
+    @classmethod
+    def from_compiled(
+        cls: Type[StaticCategory], name: str, keywords: List[str]
+    ) -> StaticCategory:
+        """Instantiates a category from the keywords of a compiled one (see
+        `get_keywords`). They are used as is: they are already lowercase and
+        include those generated from the name."""
+        category = cls.__new__(cls)
+        category.name = name
+        # pylint: disable=protected-access
+        category._keywords = keywords
+        return category
+
     @classmethod
     def copy(cls, obj_to_copy: StaticCategory) -> StaticCategory:
         """Shallow one object of the class into another"""
@@ -142,3 +161,8 @@ class CategorySchema(Schema):
     def create_category(self, data: dict, **kwargs) -> Category:
         """Creates a category"""
         return Category(**data)
+
+
+# Schemas hold no per-load state, so they are built once and shared
+CATEGORY_SCHEMA = CategorySchema()
+CATEGORY_LIST_SCHEMA = CategorySchema(many=True)
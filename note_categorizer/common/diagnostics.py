@@ -0,0 +1,120 @@
+"""Module responsible for reporting problems found in the input (i.e. malformed note
+lines). A large file can have a problem on every line, so problems are not printed
+one by one. Within `collect_diagnostics()`, each kind of problem is counted and its
+first few examples kept, then summarized once for the whole run or request.
+Outside of it, problems are only logged at debug level."""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+import logging
+import threading
+
+DEFAULT_MAX_EXAMPLES = 5
+
+# Longer examples are cut short
+MAX_EXAMPLE_CHARS = 200
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ProblemKind(Enum):
+    """Every kind of problem found in the input. Values describe the problem."""
+
+    MALFORMED_NOTE_LINE = (
+        "Malformed note lines were skipped "
+        + "(valid: '10:25-10:45: Saw Bob talking about his concert.')"
+    )
+    MALFORMED_CATEGORY_LINE = (
+        "Malformed category lines were skipped "
+        + "(valid: 'Bob Dylan: music folk concert' or 'Giant:')"
+    )
+    INVALID_CATEGORY = "Categories did not match the category schema"
+    UNREADABLE_TIME = "Times could not be read, so the notes have no time"
+    INVALID_ASSIGNMENT = "Categorizations of uncategorized notes were skipped"
+
+
+class Diagnostics:
+    """Counts each kind of problem and keeps its first examples"""
+
+    def __init__(self, max_examples: int = DEFAULT_MAX_EXAMPLES) -> None:
+        self.max_examples = max_examples
+        self._counts: Dict[ProblemKind, int] = {}
+        self._examples: Dict[ProblemKind, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """# Return
+        The number of problems of every kind"""
+        return sum(self._counts.values())
+
+    def record(self, kind: ProblemKind, example: str) -> None:
+        """Counts a problem. The example is only kept if it is among the first."""
+        with self._lock:
+            count = self._counts.get(kind, 0)
+            self._counts[kind] = count + 1
+            if count < self.max_examples:
+                self._examples.setdefault(kind, []).append(example[:MAX_EXAMPLE_CHARS])
+
+    def get_count(self, kind: ProblemKind) -> int:
+        """# Return
+        How many problems of the kind were recorded"""
+        return self._counts.get(kind, 0)
+
+    def get_examples(self, kind: ProblemKind) -> List[str]:
+        """# Return
+        The first examples of the kind of problem"""
+        return list(self._examples.get(kind, []))
+
+    def summary_to_str(self) -> str:
+        """Renders the count and examples of each kind of problem"""
+        res = ""
+        for kind, count in self._counts.items():
+            res += f"{kind.value}: {count}\n"
+            for example in self._examples.get(kind, []):
+                res += f"  i.e. {example.strip()!r}\n"
+            if count > self.max_examples:
+                res += f"  ...and {count - self.max_examples} more\n"
+        return res
+
+    def log_summary(self, logger: logging.Logger = LOGGER) -> None:
+        """Logs the summary as a single warning, if there were any problems"""
+        if len(self) > 0:
+            logger.warning("Problems found in the input:\n%s", self.summary_to_str())
+
+
+_current_diagnostics: ContextVar[Optional[Diagnostics]] = ContextVar(
+    "current_diagnostics", default=None
+)
+
+
+@contextmanager
+def collect_diagnostics(
+    logger: Optional[logging.Logger] = None,
+    max_examples: int = DEFAULT_MAX_EXAMPLES,
+) -> Iterator[Diagnostics]:
+    """Collects the problems reported within the context (in this thread).
+    # Parameters
+    * `logger` - When given, the summary is logged to it on leaving the context.
+    """
+    diagnostics = Diagnostics(max_examples)
+    token = _current_diagnostics.set(diagnostics)
+    try:
+        yield diagnostics
+    finally:
+        _current_diagnostics.reset(token)
+        if logger is not None:
+            diagnostics.log_summary(logger)
+
+
+def report_problem(kind: ProblemKind, example: str) -> None:
+    """Reports a problem to the diagnostics being collected. Without any, the
+    problem is logged at debug level (skipped entirely when that is disabled)."""
+    diagnostics = _current_diagnostics.get()
+    if diagnostics is not None:
+        diagnostics.record(kind, example)
+    elif LOGGER.isEnabledFor(logging.DEBUG):
+        LOGGER.debug("%s: %r", kind.value, example)
@@ -0,0 +1,141 @@
+"""Represents how the keywords of categories get matched against a note. Whole word
+matching tokenizes the note once and looks every token up in a hash index built
+from the keywords of all categories."""
+
+from enum import Enum
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+import re
+
+from note_categorizer.common.category import Category
+
+# A word is any run of letters, digits or underscores.
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class MatchMode(Enum):
+    """How the keywords of a category are found within a note"""
+
+    # A keyword anywhere within the note. i.e. "art" matches "party".
+    SUBSTRING = "substring"
+    # A keyword is only found as whole word(s). i.e. "art" does not match "party".
+    WHOLE_WORD = "word"
+
+
+def tokenize(phrase: str) -> List[str]:
+    """Splits the phrase into its lowercase words"""
+    return TOKEN_PATTERN.findall(phrase.lower())
+
+
+# pylint: disable=too-few-public-methods
+class KeywordIndex:
+    """Maps the words of every keyword to the categories they belong to.
+    Finding the category of a note costs O(words in the note), regardless of the
+    number of categories."""
+
+    def __init__(self, categories: Sequence[Category]) -> None:
+        """Builds the index. When a keyword belongs to several categories,
+        the earliest category wins (the same as substring matching)."""
+        # Keyword made of a single word -> index of its category
+        self._single_word_index: Dict[str, int] = {}
+        # First word of a multi-word keyword -> (all words, index of its category)
+        self._phrase_index: Dict[str, List[Tuple[Tuple[str, ...], int]]] = {}
+
+        for category_idx, category in enumerate(categories):
+            for keyword in category.get_keywords():
+                keyword_tokens = tuple(tokenize(keyword))
+                if len(keyword_tokens) == 0:
+                    continue
+                if len(keyword_tokens) == 1:
+                    self._single_word_index.setdefault(keyword_tokens[0], category_idx)
+                else:
+                    self._phrase_index.setdefault(keyword_tokens[0], []).append(
+                        (keyword_tokens, category_idx)
+                    )
+
+    def to_json(self) -> Dict[str, Any]:
+        """# Return
+        The tables of the index, to be restored by `from_json` without
+        tokenizing the keywords again."""
+        return {
+            "single_word": self._single_word_index,
+            "phrase": {
+                first_token: [
+                    [list(keyword_tokens), category_idx]
+                    for keyword_tokens, category_idx in keyword_phrases
+                ]
+                for first_token, keyword_phrases in self._phrase_index.items()
+            },
+        }
+
+    @classmethod
+    def from_json(cls, index_json: Any) -> Optional["KeywordIndex"]:
+        """# Return
+        * The index with the tables of `to_json`.
+        * None if they are not tables of an index."""
+        if not isinstance(index_json, dict):
+            return None
+        single_word_index = index_json.get("single_word")
+        phrase_index_json = index_json.get("phrase")
+        if not isinstance(single_word_index, dict) or not all(
+            isinstance(category_idx, int) for category_idx in single_word_index.values()
+        ):
+            return None
+        if not isinstance(phrase_index_json, dict):
+            return None
+
+        phrase_index: Dict[str, List[Tuple[Tuple[str, ...], int]]] = {}
+        for first_token, keyword_phrases in phrase_index_json.items():
+            if not isinstance(keyword_phrases, list):
+                return None
+            for keyword_phrase in keyword_phrases:
+                if not _is_keyword_phrase_json(keyword_phrase):
+                    return None
+                phrase_index.setdefault(first_token, []).append(
+                    (tuple(keyword_phrase[0]), keyword_phrase[1])
+                )
+
+        keyword_index = cls.__new__(cls)
+        # pylint: disable=protected-access
+        keyword_index._single_word_index = single_word_index
+        keyword_index._phrase_index = phrase_index
+        return keyword_index
+
+    def find_category_index(self, phrase: str) -> Optional[int]:
+        """# Return
+        * The index of the earliest category with a keyword in the phrase.
+        * None if no keyword of any category is in the phrase."""
+        tokens: List[str] = tokenize(phrase)
+        best_idx: Optional[int] = None
+        for token_idx, token in enumerate(tokens):
+            category_idx = self._single_word_index.get(token)
+            if category_idx is not None and (
+                best_idx is None or category_idx < best_idx
+            ):
+                best_idx = category_idx
+
+            for keyword_tokens, phrase_category_idx in self._phrase_index.get(
+                token, []
+            ):
+                if (best_idx is not None and phrase_category_idx >= best_idx) or (
+                    tuple(tokens[token_idx : token_idx + len(keyword_tokens)])
+                    != keyword_tokens
+                ):
+                    continue
+                best_idx = phrase_category_idx
+        return best_idx
+
+
+def _is_keyword_phrase_json(keyword_phrase: Any) -> bool:
+    """Whether the json is `[[str, ...], int]`, a phrase of the index"""
+    return (
+        isinstance(keyword_phrase, list)
+        and len(keyword_phrase) == 2
+        and isinstance(keyword_phrase[0], list)
+        and all(isinstance(token, str) for token in keyword_phrase[0])
+        and isinstance(keyword_phrase[1], int)
+    )
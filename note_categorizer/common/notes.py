@@ -6,12 +6,16 @@ from typing import List
 from typing import Optional
 from typing import Any
 from typing import NamedTuple
+from typing import Tuple
 from math import ceil
+import sys
 
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from marshmallow import ValidationError
 
+from note_categorizer.common.diagnostics import ProblemKind, report_problem
+
 NoteTimeStatic = TypeVar("NoteTimeStatic", bound="NoteTime")
 
 
@@ -42,6 +46,18 @@ class NoteTime:
             return self.time_difference_min
         return 0
 
+    def get_minute_range(self) -> Optional[Tuple[int, int]]:
+        """Converts the time range into minutes of the day.
+        # Return
+        * `(start, end)` with `start <= end` when the note has a full time range.
+        * None otherwise (i.e. a '+<min>' note)."""
+        if not self.has_time_range or self.start_time is None or self.end_time is None:
+            return None
+        start_minute = self.start_time.hour * 60 + self.start_time.minute
+        end_minute = self.end_time.hour * 60 + self.end_time.minute
+        # Matches compute_time_difference, which ignores the order of the times
+        return (min(start_minute, end_minute), max(start_minute, end_minute))
+
     def __eq__(self, other_note_time: Any) -> bool:
         """Return true if both are equal"""
         is_right_type = isinstance(other_note_time, NoteTime)
@@ -65,6 +81,11 @@ class NoteTime:
         time_list_no_sec = raw_time_str.split(":")[:-1]
         return ":".join(time_list_no_sec)
 
+    @classmethod
+    def get_minute_str(cls, minute_of_day: int) -> str:
+        """Converts a minute of the day to HH:MM notation as a string"""
+        return f"{minute_of_day // 60:02d}:{minute_of_day % 60:02d}"
+
     @classmethod
     def copy(cls, obj_to_copy: NoteTimeStatic) -> NoteTimeStatic:
         """Shallow one object of the class into another"""
@@ -103,11 +124,18 @@ class Note:
             return None
         try:
             time_info: TimeInfo = cls._check_for_time(raw_file_data.strip())
-            return Note(time_info.time, time_info.info)  # type: ignore
+            # Repeated info (i.e. "standup") shares a single string
+            return Note(time_info.time, sys.intern(time_info.info))  # type: ignore
         except ValidationError:
-            print("Your input is of the wrong form. Please check the schema for note")
+            # Reported by the caller, which knows where the note came from
             return None
 
+    @classmethod
+    def normalize_info(cls, info: str) -> str:
+        """Normalizes the info of a note so that notes which only differ by case or
+        whitespace are treated as the same note."""
+        return " ".join(info.lower().split())
+
     @classmethod
     def _check_for_time(cls: Type[NoteStatic], data: str) -> TimeInfo:
         """Check's to see if the start and end time is listed or not.
@@ -147,10 +175,9 @@ class Note:
             start_time_str, end_time_str = time_info_pair[0].split("-")
             if end_time_str.endswith(":"):
                 end_time_str = end_time_str[:-1]
-        except ValueError as err:
+        except ValueError:
             if verbose:
-                print(err)
-                print(f"Unpacking a time_info_pair {time_info_pair} failed")
+                report_problem(ProblemKind.UNREADABLE_TIME, data)
             return None
 
         note_time.start_time = cls._pick_correct_time_fmt(
@@ -185,12 +212,9 @@ class Note:
         )
         try:
             time_diff = int(str_time_diff)
-        except TypeError as err:
+        except TypeError:
             if verbose:
-                print(err)
-                print(
-                    "The +<min>: section of a note did not have a valid number for <min>"
-                )
+                report_problem(ProblemKind.UNREADABLE_TIME, data)
             return None
 
         time.time_difference_min = time_diff
@@ -256,15 +280,11 @@ class Note:
                 * The time found within the string if it exists
                 * None if there is no time
         """
-        err_msg = (
-            "not part of a properly formatted note. It should be HH:MM: <notes here>"
-        )
         try:
             return datetime.strptime(raw_time, time_fmt_string)
-        except ValueError as err:
+        except ValueError:
             if verbose:
-                print(err)
-                print(f"The {time_type} time {raw_time}" + err_msg)
+                report_problem(ProblemKind.UNREADABLE_TIME, f"{time_type} {raw_time}")
             return None
 
     @classmethod
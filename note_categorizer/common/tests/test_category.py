@@ -63,3 +63,10 @@ def test_from_dict() -> None:
     assert isinstance(category, Category) is True
     for keyword in data_list[0]["keywords"]:
         assert category.is_keyword_present(keyword)
+
+
+def test_from_serial_list_invalid_element() -> None:
+    """One invalid category fails the whole list, as it always has"""
+    invalid_list = data_list + [{"name": "bad", "keywords": "not a list"}]
+    assert Category.from_serial_list(invalid_list) is None
+    assert Category.from_serial_list([]) == []
@@ -0,0 +1,60 @@
+"""Tests relating to the diagnostics module of common"""
+from pathlib import Path
+import logging
+
+import pytest
+
+from note_categorizer.categorizer.text_file_reader import NoteReader
+from note_categorizer.common.category import Category
+from note_categorizer.common.diagnostics import ProblemKind
+from note_categorizer.common.diagnostics import collect_diagnostics, report_problem
+
+
+def test_problems_are_aggregated(caplog: pytest.LogCaptureFixture) -> None:
+    """Problems are counted with their first examples, and summarized once"""
+    caplog.set_level(logging.DEBUG)
+    with collect_diagnostics(logging.getLogger("test"), max_examples=2) as diagnostics:
+        for idx in range(1000):
+            report_problem(ProblemKind.MALFORMED_NOTE_LINE, f"line {idx}")
+        assert Category.from_serial_list([{"name": 5}]) is None
+
+    assert diagnostics.get_count(ProblemKind.MALFORMED_NOTE_LINE) == 1000
+    assert diagnostics.get_examples(ProblemKind.MALFORMED_NOTE_LINE) == [
+        "line 0",
+        "line 1",
+    ]
+    assert diagnostics.get_count(ProblemKind.INVALID_CATEGORY) == 1
+    assert len(diagnostics) == 1001
+
+    assert len(caplog.records) == 1
+    assert "...and 998 more" in caplog.records[0].getMessage()
+
+
+def test_problems_outside_collection_are_debug_logs(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Without diagnostics being collected, problems are only logged at debug"""
+    caplog.set_level(logging.INFO)
+    report_problem(ProblemKind.MALFORMED_NOTE_LINE, "line")
+    assert len(caplog.records) == 0
+
+    caplog.set_level(logging.DEBUG)
+    report_problem(ProblemKind.MALFORMED_NOTE_LINE, "line")
+    assert len(caplog.records) == 1
+
+
+def test_note_reader_reports_unreadable_times(
+    tmp_path: Path, capsys: pytest.CaptureFixture
+) -> None:
+    """Unreadable times are counted rather than printed. Blank lines are fine."""
+    notes_path = tmp_path / "notes.txt"
+    notes_path.write_text(
+        "10:00-10:30: fine\n\n" + "10-11-12: bad time\n" * 100, encoding="utf-8"
+    )
+    with collect_diagnostics() as diagnostics:
+        notes = NoteReader(notes_path).generate_list()
+
+    assert len(notes) == 101
+    assert diagnostics.get_count(ProblemKind.UNREADABLE_TIME) == 100
+    assert len(diagnostics) == 100
+    assert capsys.readouterr().out == ""
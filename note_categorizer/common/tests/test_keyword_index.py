@@ -0,0 +1,56 @@
+"""Tests relating to the keyword_index module of common"""
+from note_categorizer.categorizer.parser import WebParser
+from note_categorizer.common.category import Category
+from note_categorizer.common.keyword_index import KeywordIndex, MatchMode
+from note_categorizer.common.keyword_index import tokenize
+from note_categorizer.common.notes import Note
+
+
+def test_tokenize() -> None:
+    """Tokens are lowercase words without punctuation"""
+    assert tokenize("Inspected magic w.r.t the Child!") == [
+        "inspected",
+        "magic",
+        "w",
+        "r",
+        "t",
+        "the",
+        "child",
+    ]
+
+
+def test_whole_words_only() -> None:
+    """Only whole words match, unlike substring matching"""
+    categories = [Category("art", []), Category("Bob Dylan", ["concert"])]
+    index = KeywordIndex(categories)
+    assert index.find_category_index("went to a party") is None
+    assert index.find_category_index("modern Art gallery") == 0
+    assert index.find_category_index("saw dylan") == 1
+    assert categories[0].is_keyword_present("went to a party") is True
+
+
+def test_multi_word_keywords_and_priority() -> None:
+    """Multi-word keywords need every word, and earlier categories win"""
+    categories = [
+        Category("review", ["code review"]),
+        Category("standup", ["w.r.t", "code"]),
+    ]
+    index = KeywordIndex(categories)
+    assert index.find_category_index("code review of parser") == 0
+    assert index.find_category_index("review the code") == 0
+    assert index.find_category_index("wrote code") == 1
+    assert index.find_category_index("talked w.r.t. schedule") == 1
+
+    late_index = KeywordIndex([Category("standup", ["code"]), categories[0]])
+    assert late_index.find_category_index("code review") == 0
+
+
+def test_parser_whole_word_mode() -> None:
+    """The parser uses the keyword index in whole word mode"""
+    parser = WebParser([Category("art", [])], None, match_mode=MatchMode.WHOLE_WORD)
+    notes = [Note.from_str("10:00-10:30: party"), Note.from_str("11:00-11:30: art")]
+    parsed_data = parser.parse_notes([note for note in notes if note is not None])
+    assert len(parsed_data.get_unknown_notes()) == 1
+
+    parser.add_category(Category("party", []))
+    assert parser.get_category_for_info("a party") == Category("party", [])
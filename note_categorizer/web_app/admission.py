@@ -0,0 +1,68 @@
+"""Module responsible for limiting how much work the web app takes on at once.
+Heavy requests wait in a bounded queue for one of a fixed number of slots.
+Once the queue is full, requests are turned away rather than piling up."""
+# ------------------------------STANDARD DEPENDENCIES-----------------------------#
+from contextlib import contextmanager
+from typing import Iterator
+from typing import NamedTuple
+import threading
+
+# ------------------------------Project Imports-----------------------------#
+from note_categorizer.web_app import constants
+
+
+class ServerLimits(NamedTuple):
+    """The limits on the work a request can cause"""
+
+    max_content_bytes: int = constants.DEFAULT_MAX_CONTENT_BYTES
+    max_notes: int = constants.DEFAULT_MAX_NOTES
+    max_categories: int = constants.DEFAULT_MAX_CATEGORIES
+    max_concurrent_parses: int = constants.DEFAULT_MAX_CONCURRENT_PARSES
+    max_queued_parses: int = constants.DEFAULT_MAX_QUEUED_PARSES
+    admission_wait_sec: float = constants.DEFAULT_ADMISSION_WAIT_SEC
+    # CPU seconds (of the request's thread) a parse may use
+    parse_cpu_deadline_sec: float = constants.DEFAULT_PARSE_CPU_DEADLINE_SEC
+    # Jobs categorized in the background at once, and waiting to be
+    max_job_workers: int = constants.DEFAULT_MAX_JOB_WORKERS
+    max_queued_jobs: int = constants.DEFAULT_MAX_QUEUED_JOBS
+
+
+class AdmissionController:
+    """Admits a bounded number of requests to do heavy work at once"""
+
+    def __init__(self, max_concurrent: int, max_queued: int, wait_sec: float) -> None:
+        # Requests either running or waiting to run
+        self._admitted = threading.BoundedSemaphore(max_concurrent + max_queued)
+        # Requests running
+        self._running = threading.BoundedSemaphore(max_concurrent)
+        self._wait_sec = wait_sec
+
+    @classmethod
+    def from_limits(cls, limits: ServerLimits) -> "AdmissionController":
+        """Creates a controller enforcing the limits"""
+        return cls(
+            limits.max_concurrent_parses,
+            limits.max_queued_parses,
+            limits.admission_wait_sec,
+        )
+
+    @contextmanager
+    def admit(self) -> Iterator[bool]:
+        """Waits (up to the wait time) for a free slot. The slot is held for the
+        duration of the context.
+        # Return
+        * True if admitted and the work can go ahead.
+        * False if the queue is full or no slot freed up in time."""
+        if not self._admitted.acquire(blocking=False):
+            yield False
+            return
+        try:
+            if not self._running.acquire(timeout=self._wait_sec):
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                self._running.release()
+        finally:
+            self._admitted.release()
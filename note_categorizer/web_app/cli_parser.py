@@ -79,6 +79,88 @@ class CLIParser:
             help=localhost_help,
         )
 
+        self.parser.add_argument(
+            "--max_content_bytes",
+            type=int,
+            default=constants.DEFAULT_MAX_CONTENT_BYTES,
+            help="Largest request body (in bytes) that is accepted",
+        )
+        self.parser.add_argument(
+            "--max_notes",
+            type=int,
+            default=constants.DEFAULT_MAX_NOTES,
+            help="Most notes a single request can submit",
+        )
+        self.parser.add_argument(
+            "--max_categories",
+            type=int,
+            default=constants.DEFAULT_MAX_CATEGORIES,
+            help="Most categories a single request can submit",
+        )
+        self.parser.add_argument(
+            "--max_concurrent_parses",
+            type=int,
+            default=constants.DEFAULT_MAX_CONCURRENT_PARSES,
+            help="Most submissions parsed at once. Others wait in a bounded queue",
+        )
+        self.parser.add_argument(
+            "--max_queued_parses",
+            type=int,
+            default=constants.DEFAULT_MAX_QUEUED_PARSES,
+            help="Most submissions waiting to be parsed. Past that (or after\
+                waiting --admission_wait_sec), 503 + Retry-After is returned",
+        )
+        self.parser.add_argument(
+            "--admission_wait_sec",
+            type=float,
+            default=constants.DEFAULT_ADMISSION_WAIT_SEC,
+            help="Seconds a submission waits in the queue to be parsed",
+        )
+        self.parser.add_argument(
+            "--parse_deadline_sec",
+            type=float,
+            default=constants.DEFAULT_PARSE_CPU_DEADLINE_SEC,
+            help="CPU seconds a single submission may take to parse",
+        )
+
+        self.parser.add_argument(
+            "--max_job_workers",
+            type=int,
+            default=constants.DEFAULT_MAX_JOB_WORKERS,
+            help="Most jobs (POST /jobs) categorized at once in the background",
+        )
+        self.parser.add_argument(
+            "--max_queued_jobs",
+            type=int,
+            default=constants.DEFAULT_MAX_QUEUED_JOBS,
+            help="Most jobs waiting for a worker. Past that, 503 is returned",
+        )
+
+        self.parser.add_argument(
+            "--session_db",
+            type=Path,
+            default=None,
+            help="Path to a SQLite database to keep sessions in. Lets several\
+                worker processes share sessions, which also survive restarts.\
+                Sessions are kept in memory when not set",
+        )
+
+        self.parser.add_argument(
+            "--category_path",
+            type=Path,
+            default=None,
+            help="Path to a category file used for submissions without\
+                categories. It is reloaded without a restart when it changes,\
+                or on POST /admin/reload_categories (from localhost)",
+        )
+        self.parser.add_argument(
+            "--category_poll_sec",
+            type=float,
+            default=constants.DEFAULT_CATEGORY_POLL_SEC,
+            help="Seconds between checks of --category_path for changes.\
+                0 only reloads it through the admin route",
+        )
+
         project_root_help = "Set this flag to have all displayed url's"
         project_root_help += "be localhost instead of an actual IP"
         self.parser.add_argument(
@@ -8,3 +8,54 @@ PATH_FROM_ROOT_TO_WEB_APP = "note_categorizer/web_app"
 DEFAULT_PORT = 53691
 
 REQUESTS_TIMEOUT_SEC = 5
+
+# Responses smaller than this are not worth compressing
+MIN_COMPRESSED_RESPONSE_BYTES = 1024
+GZIP_COMPRESS_LEVEL = 6
+# Versioned static assets (i.e. '?v=<version>') never change, so are cached for a year
+STATIC_ASSET_MAX_AGE_SEC = 365 * 24 * 60 * 60
+
+# Default limits on the work a single request can cause
+DEFAULT_MAX_CONTENT_BYTES = 8 * 1024 * 1024
+DEFAULT_MAX_NOTES = 50000
+DEFAULT_MAX_CATEGORIES = 2000
+DEFAULT_MAX_CONCURRENT_PARSES = 4
+# Requests beyond the concurrent parses wait (up to the wait) for a free slot
+DEFAULT_MAX_QUEUED_PARSES = 8
+DEFAULT_ADMISSION_WAIT_SEC = 2.0
+DEFAULT_PARSE_CPU_DEADLINE_SEC = 5.0
+# Seconds a client is told to wait before retrying when the server is saturated
+RETRY_AFTER_SEC = 1
+
+# Least recently used sessions are dropped past this many
+DEFAULT_MAX_SESSIONS = 1000
+SESSION_COOKIE_NAME = "note_categorizer_session"
+
+# Items per page of paginated results
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Bytes read from an upload stream at a time
+STREAM_CHUNK_BYTES = 64 * 1024
+MAX_STREAM_LINE_BYTES = 1024 * 1024
+# Notes of a streamed upload are categorized in batches of this many
+STREAM_NOTE_BATCH_SIZE = 256
+# Sessions of the session database also kept in the memory of each worker
+DEFAULT_SESSION_CACHE_SIZE = 64
+SESSION_DB_TIMEOUT_SEC = 10.0
+# Connections each worker keeps open to the session database
+DEFAULT_SESSION_DB_CONNECTIONS = 8
+# Reading a session marks it as used at most this often, to limit database writes
+SESSION_TOUCH_INTERVAL_SEC = 60.0
+# Seconds between checks of --category_path for changes
+DEFAULT_CATEGORY_POLL_SEC = 2.0
+
+# Jobs (see jobs.py) categorizing submissions in the background
+DEFAULT_MAX_JOB_WORKERS = 2
+DEFAULT_MAX_QUEUED_JOBS = 16
+# The oldest finished jobs are forgotten past this many
+DEFAULT_MAX_JOBS = 1000
+# Notes categorized between updates of a job's progress
+JOB_PROGRESS_BATCH_SIZE = 2048
+# Seconds between keepalive comments of a job's event stream
+JOB_EVENTS_KEEPALIVE_SEC = 15.0
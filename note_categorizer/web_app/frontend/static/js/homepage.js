@@ -1,8 +1,15 @@
-import { async_post_request } from './utils.js'
+import { async_get_request, async_post_request } from './utils.js'
+
+// Results are paged in lazily. These track what to fetch next.
+let uncategorized_cursor = null;
+let category_list = [];
+let notes_category_idx = 0;
+let notes_cursor = null;
 
 $( document ).ready(async function() {
     await create_submission_listener();
     await create_uncategorized_update_submission_listener();
+    create_load_more_listeners();
 
 });
 
@@ -37,6 +44,7 @@ function resize_input_boxes() {
  * @param {Array[string]} category_list - The list of all valid categories to select
  * @param {string} uncategorized_note - The uncategorized note to ask about
  * @param {int} note_idx - The number note being asked baout
+ * @param {string | null} suggested_category - The category selected up front
  * @return {HTMLDivElement} The div representing the row for the current prompt
  * @note Create in the form:
  * ```html
@@ -52,13 +60,13 @@ function resize_input_boxes() {
         </div>
  * ```
  */
-function create_uncategorized_prompt_row(category_list, uncategorized_note, note_idx) {
+function create_uncategorized_prompt_row(category_list, uncategorized_note, note_idx, suggested_category) {
     const columns_el = document.createElement("div");
     columns_el.classList.add("columns");
     columns_el.setAttribute("id", `uncategorized-note-${note_idx}`);
 
     const note_column_el = create_uncategorized_label_column(uncategorized_note);
-    const dropdown_column_el = create_dropdown_column(category_list, note_idx);
+    const dropdown_column_el = create_dropdown_column(category_list, note_idx, suggested_category);
     columns_el.appendChild(note_column_el);
     columns_el.appendChild(dropdown_column_el);
 
@@ -91,7 +99,8 @@ function create_uncategorized_label_column(note_str) {
  * Function to create a dropdown for 1 uncategorized note.
  * Places the drop down after the previous.
  * The dropdown enables users to select the correct category associated with
- * the note.
+ * the note. The suggested category (of the most similar categorized note)
+ * is selected up front, so accepting it only takes the submit.
  * @return {HTMLDivElement} An element representing the bulma select class
  * @note Of the form:
  * ```html
@@ -105,7 +114,7 @@ function create_uncategorized_label_column(note_str) {
  * </div>
  * ```
  */
-function create_dropdown_column(category_list, menu_idx) {
+function create_dropdown_column(category_list, menu_idx, suggested_category) {
 
     // create parent
     const selection_menu = document.createElement("div");
@@ -119,7 +128,7 @@ function create_dropdown_column(category_list, menu_idx) {
     const placeholder_option = document.createElement("option");
     placeholder_option.value = "";
     placeholder_option.disabled = true;
-    placeholder_option.selected = true;
+    placeholder_option.selected = suggested_category == null;
     placeholder_option.textContent = "Select the category";
     select_el.appendChild(placeholder_option);
 
@@ -127,6 +136,7 @@ function create_dropdown_column(category_list, menu_idx) {
     category_list.forEach(element => {
         const option_el = document.createElement("option")
         option_el.textContent = element;
+        option_el.selected = element == suggested_category;
         select_el.appendChild(option_el);
     });
 
@@ -139,14 +149,20 @@ function create_dropdown_column(category_list, menu_idx) {
  * Displays the output box containing the uncategorized
  * @param uncategorized_list = List of uncategorized notes
  * @param {Array[string]} uncategorized_note_list The list of uncategorized notes
+ * @param {Array[string | null]} suggestions The suggested category of each note
  */
-function display_uncategorized_input(uncategorized_note_list, category_list) {
+function display_uncategorized_input(uncategorized_note_list, category_list, suggestions) {
     // document.getElementById("uncategorized-wrapper").hidden = false;
     document.getElementById("uncategorized-wrapper").classList.remove("is-hidden")
     const uncategorized_rows_el = document.getElementById("uncategorized-row-container");
+    // Appends after the rows of earlier pages
+    const start_idx = uncategorized_rows_el.children.length;
 
     uncategorized_note_list.forEach((uncategorized_note, idx) => {
-        const row_el = create_uncategorized_prompt_row(category_list, uncategorized_note, idx);
+        const suggested_category = suggestions == null ? null : suggestions[idx];
+        const row_el = create_uncategorized_prompt_row(
+            category_list, uncategorized_note, start_idx + idx, suggested_category
+        );
         uncategorized_rows_el.appendChild(row_el)
     })
 
@@ -169,37 +185,109 @@ function hide_remove_uncategorized_input() {
  * @brief Handle the server response after processing the data
  */
 function handle_response_after_processing(processed_res) {
+    if (typeof processed_res === "object" && processed_res !== null && "error" in processed_res) {
+        display_results("Error: " + processed_res["error"]);
+        return
+    }
     const output_res = processed_res["processed_data"]
     if (output_res == "") {
         return
     }
 
+    category_list = processed_res["category_list"];
     const are_uncategorized = processed_res["are_uncategorized"]
+    hide_remove_uncategorized_input()
     if (are_uncategorized == true) {
-        display_uncategorized_input(processed_res["uncategorized_list"],
-            processed_res["category_list"]
+        display_uncategorized_input(
+            processed_res["uncategorized_list"],
+            category_list,
+            processed_res["uncategorized_suggestions"]
         )
     }
-    else {
-        hide_remove_uncategorized_input()
-    }
+    set_uncategorized_cursor(processed_res["uncategorized_cursor"]);
     display_results(output_res);
 
+    // The notes of each category are only fetched when asked for
+    notes_category_idx = 0;
+    notes_cursor = null;
+    $("#load-category-notes").removeClass("is-hidden");
+
     resize_input_boxes();
 }
 
+function set_uncategorized_cursor(cursor) {
+    uncategorized_cursor = cursor;
+    if (cursor == null) {
+        $("#load-more-uncategorized").addClass("is-hidden");
+    } else {
+        $("#load-more-uncategorized").removeClass("is-hidden");
+    }
+}
+
+/**
+ * @brief Fetches the next page of uncategorized notes, or the next page of
+ * categorized notes, when the matching button is clicked.
+ */
+function create_load_more_listeners() {
+    $("#load-more-uncategorized").click(async function () {
+        const page = await async_get_request("/results/unknowns", {"cursor": uncategorized_cursor});
+        if ("error" in page) {
+            display_results("Error: " + page["error"]);
+            return
+        }
+        display_uncategorized_input(page["items"], category_list, page["suggestions"]);
+        set_uncategorized_cursor(page["next_cursor"]);
+    });
+
+    $("#load-category-notes").click(async function () {
+        if (notes_category_idx >= category_list.length) {
+            $("#load-category-notes").addClass("is-hidden");
+            return
+        }
+        const category_name = category_list[notes_category_idx];
+        let params = {"category": category_name};
+        if (notes_cursor != null) {
+            params["cursor"] = notes_cursor;
+        }
+        const page = await async_get_request("/results/notes", params);
+        if ("error" in page) {
+            display_results("Error: " + page["error"]);
+            return
+        }
+
+        const output_text_area = document.getElementById("categorized-display");
+        if (notes_cursor == null) {
+            output_text_area.value += `\nCategory ${category_name} notes:\n`;
+        }
+        page["items"].forEach(note_str => {
+            output_text_area.value += note_str + "\n";
+        });
+
+        notes_cursor = page["next_cursor"];
+        if (notes_cursor == null) {
+            notes_category_idx += 1;
+        }
+        if (notes_category_idx >= category_list.length) {
+            $("#load-category-notes").addClass("is-hidden");
+        }
+        resize_input_boxes();
+    });
+}
+
 async function create_submission_listener()  {
     $("#submit-info").click(async function () {
-        const url = "/submit_info";
+        const url = "/submit_info?paginate=true";
         const category_serial = document.getElementById("category-data")
         const category_serial_list = category_serial.value.split("\n");
         const notes_serial = document.getElementById("notes")
         const notes_serial_list = notes_serial.value.split("\n");
+        const match_mode = document.getElementById("match-mode").value;
 
         // Wait for the categories and notes to be processed
         const data_json = {
             "category_info": category_serial_list,
-            "notes": notes_serial_list
+            "notes": notes_serial_list,
+            "match_mode": match_mode
         }
 
         const processed_res = await async_post_request(url, data_json);
@@ -209,7 +297,7 @@ async function create_submission_listener()  {
 
 async function create_uncategorized_update_submission_listener() {
     $("#submit-uncategorized-update").click(async function () {
-        const url = "/submit_uncategorized_update";
+        const url = "/submit_uncategorized_update?paginate=true";
 
         let data_json = {};
 
@@ -19,6 +19,10 @@
     }catch (error){
         console.log("Post request for url " + url + ' failed');
         console.log(JSON.stringify(error));
+        // Rejected requests (i.e. too large or server busy) explain why
+        if (error.responseJSON !== undefined) {
+            return error.responseJSON;
+        }
         res = 'err';
         return res;
     }
@@ -32,6 +36,27 @@
     }
 }
 
+/**
+ * @brief Useful function - abstracts async get requests
+ * @param {string} url URL the get request is going to
+ * @param {Object} params Query params of the request
+ */
+export async function async_get_request(url, params) {
+    try{
+        return await $.get({
+            url: url,
+            data: params,
+            dataType: 'json',
+        });
+    }catch (error){
+        console.log("Get request for url " + url + ' failed');
+        if (error.responseJSON !== undefined) {
+            return error.responseJSON;
+        }
+        return {"error": "Get request for url " + url + " failed"};
+    }
+}
+
 export function getTodayDate()
 {
     // Inspired by https://stackoverflow.com/a/12347050/14810215
@@ -0,0 +1,217 @@
+"""Module responsible for categorizing submissions too large to answer within a
+request. Each becomes a job, run by a bounded pool of workers. Its progress is
+polled (GET /jobs/<id>) or streamed as Server-Sent Events (GET /jobs/<id>/events).
+Once done, the job's session holds the results, which are paged through or
+exported like those of any other session."""
+# ------------------------------STANDARD DEPENDENCIES-----------------------------#
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import Optional
+import json
+import logging
+import threading
+
+# ------------------------------Project Imports-----------------------------#
+from note_categorizer.web_app import constants
+from note_categorizer.web_app.session import generate_session_id
+
+LOGGER = logging.getLogger(__name__)
+
+
+class JobState(Enum):
+    """Where a job is in its life"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+# pylint: disable=too-many-instance-attributes
+class Job:
+    """A submission being categorized in the background. Only its worker changes
+    it. Every change is announced through `changed`."""
+
+    def __init__(self, job_id: str, line_count: int) -> None:
+        self.job_id = job_id
+        self.line_count = line_count
+        self.state = JobState.QUEUED
+        self.lines_parsed = 0
+        self.categorized_count = 0
+        self.unknown_count = 0
+        # The session holding the results, once done
+        self.session_id: Optional[str] = None
+        self.error: Optional[str] = None
+        # Bumped on every change
+        self.version = 0
+        self.changed = threading.Condition()
+
+    def is_finished(self) -> bool:
+        """# Return
+        True if the job is done or failed. False otherwise."""
+        return self.state in (JobState.DONE, JobState.FAILED)
+
+    def set_running(self) -> None:
+        """Marks the job as picked up by a worker"""
+        with self.changed:
+            self.state = JobState.RUNNING
+            self._on_changed()
+
+    def set_progress(
+        self, lines_parsed: int, categorized_count: int, unknown_count: int
+    ) -> None:
+        """Updates how far the job got"""
+        with self.changed:
+            self.lines_parsed = lines_parsed
+            self.categorized_count = categorized_count
+            self.unknown_count = unknown_count
+            self._on_changed()
+
+    def set_done(self, session_id: str) -> None:
+        """Marks the job as done, with its results in the session"""
+        with self.changed:
+            self.session_id = session_id
+            self.state = JobState.DONE
+            self._on_changed()
+
+    def set_failed(self, error: str) -> None:
+        """Marks the job as failed"""
+        with self.changed:
+            self.error = error
+            self.state = JobState.FAILED
+            self._on_changed()
+
+    def wait_for_change(self, seen_version: int, timeout_sec: float) -> int:
+        """Waits (up to the timeout) for the job to change past `seen_version`.
+        # Return
+        The current version. Equal to `seen_version` if nothing changed."""
+        with self.changed:
+            self.changed.wait_for(
+                lambda: self.version != seen_version, timeout=timeout_sec
+            )
+            return self.version
+
+    def to_json(self) -> Dict[str, Any]:
+        """# Return
+        The state and progress of the job, as sent to clients"""
+        with self.changed:
+            return {
+                "job_id": self.job_id,
+                "state": self.state.value,
+                "line_count": self.line_count,
+                "lines_parsed": self.lines_parsed,
+                "categorized_count": self.categorized_count,
+                "unknown_count": self.unknown_count,
+                "session_id": self.session_id,
+                "error": self.error,
+                "version": self.version,
+            }
+
+    def _on_changed(self) -> None:
+        """Must be called holding `changed`"""
+        self.version += 1
+        self.changed.notify_all()
+
+
+class JobManager:
+    """Runs jobs on a fixed number of workers. Jobs past the workers wait in a
+    bounded queue. Once it is full, new jobs are turned away."""
+
+    def __init__(
+        self,
+        max_workers: int = constants.DEFAULT_MAX_JOB_WORKERS,
+        max_queued: int = constants.DEFAULT_MAX_QUEUED_JOBS,
+        max_jobs: int = constants.DEFAULT_MAX_JOBS,
+    ) -> None:
+        """# Parameters
+        * `max_jobs` - The most jobs remembered. The oldest finished jobs are
+        forgotten first (their sessions are kept by the session store).
+        """
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="job")
+        self._max_pending = max_workers + max_queued
+        self._max_jobs = max_jobs
+        # Jobs queued or running
+        self._pending_count = 0
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, line_count: int, run: Callable[[Job], None]) -> Optional[Job]:
+        """Queues a job. `run` categorizes the job's notes on a worker, updating
+        its progress and marking it done. If it raises, the job fails.
+        # Return
+        * The queued job.
+        * None if the queue is full."""
+        with self._lock:
+            if self._pending_count >= self._max_pending:
+                return None
+            self._pending_count += 1
+            job = Job(generate_session_id(), line_count)
+            self._jobs[job.job_id] = job
+            self._forget_finished_jobs()
+        self._executor.submit(self._run, job, run)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """# Return
+        * The job with the id.
+        * None if there is no such job (or it was forgotten)."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self, cancel_queued: bool = False) -> None:
+        """Waits for the running jobs to finish. Queued jobs are run too, unless
+        `cancel_queued`, in which case they fail without running."""
+        self._executor.shutdown(wait=True, cancel_futures=cancel_queued)
+        with self._lock:
+            queued_jobs = [
+                job for job in self._jobs.values() if job.state == JobState.QUEUED
+            ]
+        for job in queued_jobs:
+            job.set_failed("The server stopped before the job ran")
+
+    def _run(self, job: Job, run: Callable[[Job], None]) -> None:
+        job.set_running()
+        try:
+            run(job)
+        # Whatever went wrong is reported through the job, not lost in the worker
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            LOGGER.exception("Job %s failed", job.job_id)
+            job.set_failed(str(err))
+        finally:
+            with self._lock:
+                self._pending_count -= 1
+
+    def _forget_finished_jobs(self) -> None:
+        """Forgets the oldest finished jobs past the most remembered.
+        Must be called holding the lock."""
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self._max_jobs:
+                return
+            if self._jobs[job_id].is_finished():
+                del self._jobs[job_id]
+
+
+def iter_job_events(job: Job) -> Iterator[str]:
+    """# Return
+    The Server-Sent Events of the job. A `progress` event with the job's json
+    on every change, and a last `done` (or `failed`) event once finished. A
+    comment is sent while nothing changes, so idle connections aren't dropped."""
+    seen_version = -1
+    while True:
+        version = job.wait_for_change(seen_version, constants.JOB_EVENTS_KEEPALIVE_SEC)
+        if version == seen_version:
+            yield ": keepalive\n\n"
+            continue
+        seen_version = version
+        job_json = job.to_json()
+        event_name = "progress"
+        if job_json["state"] in (JobState.DONE.value, JobState.FAILED.value):
+            event_name = job_json["state"]
+        yield f"event: {event_name}\ndata: {json.dumps(job_json)}\n\n"
+        if event_name != "progress":
+            return
@@ -1,13 +1,18 @@
 #!/usr/bin/env
 """Main used for the Web App"""
 # ------------------------------STANDARD DEPENDENCIES-----------------------------#
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+import logging
 import urllib.request
 import sys
 
 # ------------------------------Project Imports-----------------------------#
+from note_categorizer.categorizer.category_reloader import CategoryReloader
+from note_categorizer.web_app.admission import ServerLimits
 from note_categorizer.web_app.cli_parser import CLIParser
 from note_categorizer.web_app.server import WebAppServer
+from note_categorizer.web_app.session import InMemorySessionStore, SessionStore
+from note_categorizer.web_app.sqlite_session_store import SqliteSessionStore
 
 
 def has_internet() -> bool:
@@ -43,6 +48,22 @@ class Main:
 
         self.cli_parser = CLIParser()
         cli_args: Dict[str, Any] = self.cli_parser.get_parsed_args()
+        logging.basicConfig(
+            format="%(levelname)s %(name)s: %(message)s",
+            level=logging.DEBUG if cli_args["verbose"] else logging.WARNING,
+        )
+
+        session_store: SessionStore = (
+            InMemorySessionStore()
+            if cli_args["session_db"] is None
+            else SqliteSessionStore(cli_args["session_db"])
+        )
+
+        category_reloader: Optional[CategoryReloader] = None
+        if cli_args["category_path"] is not None:
+            category_reloader = CategoryReloader(cli_args["category_path"])
+            if cli_args["category_poll_sec"] > 0:
+                category_reloader.start_watching(cli_args["category_poll_sec"])
 
         self.app = WebAppServer(
             cli_args["port"],
@@ -50,6 +71,19 @@ class Main:
             cli_args["verbose"],
             cli_args["use_localhost"],
             cli_args["project_root_path"],
+            ServerLimits(
+                cli_args["max_content_bytes"],
+                cli_args["max_notes"],
+                cli_args["max_categories"],
+                cli_args["max_concurrent_parses"],
+                cli_args["max_queued_parses"],
+                cli_args["admission_wait_sec"],
+                cli_args["parse_deadline_sec"],
+                cli_args["max_job_workers"],
+                cli_args["max_queued_jobs"],
+            ),
+            session_store,
+            category_reloader,
         )
         self.app.start_server()
 
@@ -0,0 +1,77 @@
+"""Module responsible for reading newline-delimited json (NDJSON) uploads as they
+arrive, so notes can be categorized while the rest of the upload is in flight."""
+# ------------------------------STANDARD DEPENDENCIES-----------------------------#
+from typing import Any
+from typing import IO
+from typing import Iterator
+from typing import Optional
+from typing import Tuple
+import json
+
+# ------------------------------Project Imports-----------------------------#
+from note_categorizer.web_app import constants
+
+
+class InvalidStreamLine(ValueError):
+    """Raised when a line of the stream can't be read"""
+
+    def __init__(self, line_number: int, reason: str) -> None:
+        super().__init__(f"Line {line_number} of the stream {reason}")
+        self.line_number = line_number
+
+
+class StreamTooLarge(ValueError):
+    """Raised once more of the stream was read than it may have"""
+
+    def __init__(self, max_total_bytes: int) -> None:
+        super().__init__(f"Streams are limited to {max_total_bytes} bytes")
+        self.max_total_bytes = max_total_bytes
+
+
+def iter_stream_lines(
+    input_stream: IO[bytes],
+    chunk_size: int = constants.STREAM_CHUNK_BYTES,
+    max_line_bytes: int = constants.MAX_STREAM_LINE_BYTES,
+    max_total_bytes: Optional[int] = None,
+) -> Iterator[bytes]:
+    """Yields each line of the stream as soon as it is complete. Only the current
+    chunk and a partial line are held at once.
+    Raises InvalidStreamLine for lines longer than `max_line_bytes`, and
+    StreamTooLarge once over `max_total_bytes` were read (chunked uploads have no
+    content length, so their size is only known as they are read)."""
+    partial_line = b""
+    line_count = 0
+    total_bytes = 0
+    while True:
+        chunk = input_stream.read(chunk_size)
+        if len(chunk) == 0:
+            break
+        total_bytes += len(chunk)
+        if max_total_bytes is not None and total_bytes > max_total_bytes:
+            raise StreamTooLarge(max_total_bytes)
+        lines = (partial_line + chunk).split(b"\n")
+        partial_line = lines.pop()
+        for line in lines:
+            line_count += 1
+            yield line
+        if len(partial_line) > max_line_bytes:
+            raise InvalidStreamLine(line_count + 1, f"is over {max_line_bytes} bytes")
+    if len(partial_line) > 0:
+        yield partial_line
+
+
+def iter_ndjson(
+    input_stream: IO[bytes], max_total_bytes: Optional[int] = None
+) -> Iterator[Tuple[int, Any]]:
+    """Yields the line number and decoded json of each non-empty line.
+    Raises InvalidStreamLine for lines which are not json. See `iter_stream_lines`
+    for `max_total_bytes`."""
+    for line_idx, line in enumerate(
+        iter_stream_lines(input_stream, max_total_bytes=max_total_bytes)
+    ):
+        if len(line.strip()) == 0:
+            continue
+        try:
+            yield (line_idx + 1, json.loads(line))
+        except ValueError as err:
+            raise InvalidStreamLine(line_idx + 1, "is not valid json") from err
@@ -0,0 +1,73 @@
+"""Module responsible for splitting long lists of results into pages.
+Pages are requested with an opaque cursor, which also records the version of
+the session it was made for. That way a cursor can't silently skip or repeat
+items after the results change."""
+# ------------------------------STANDARD DEPENDENCIES-----------------------------#
+from typing import Any
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+import base64
+import binascii
+import json
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor was not made by this server"""
+
+
+class StaleCursor(InvalidCursor):
+    """Raised when a cursor was made for results which since changed"""
+
+
+def encode_cursor(version: int, offset: int) -> str:
+    """# Return
+    An opaque cursor to the item at the offset"""
+    raw_cursor = json.dumps([version, offset]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw_cursor).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    """Raises InvalidCursor if the cursor was not made by encode_cursor.
+    # Return
+    The `(version, offset)` of the cursor."""
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        version, offset = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, ValueError, TypeError) as err:
+        raise InvalidCursor(f"Invalid cursor {cursor}") from err
+    if not isinstance(version, int) or not isinstance(offset, int) or offset < 0:
+        raise InvalidCursor(f"Invalid cursor {cursor}")
+    return (version, offset)
+
+
+class Page(NamedTuple):
+    """A page of items along with the cursor to the next page"""
+
+    items: List[Any]
+    # None when this is the last page
+    next_cursor: Optional[str]
+    # The number of items across every page
+    total: int
+    version: int
+
+
+def paginate(
+    items: Sequence[Any], version: int, cursor: Optional[str], limit: int
+) -> Page:
+    """Gets the page of items starting at the cursor (or the first page).
+    Raises InvalidCursor for a bad cursor and StaleCursor if the items changed
+    since the cursor was made."""
+    offset = 0
+    if cursor is not None:
+        cursor_version, offset = decode_cursor(cursor)
+        if cursor_version != version:
+            raise StaleCursor("The results changed since the cursor was made")
+
+    end_offset = offset + limit
+    next_cursor = (
+        encode_cursor(version, end_offset) if end_offset < len(items) else None
+    )
+    return Page(list(items[offset:end_offset]), next_cursor, len(items), version)
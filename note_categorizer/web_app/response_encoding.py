@@ -0,0 +1,107 @@
+"""Module responsible for compressing responses for clients that accept it.
+Brotli is used when the optional brotli package is installed, otherwise gzip."""
+# ------------------------------STANDARD DEPENDENCIES-----------------------------#
+from types import ModuleType
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Union
+import gzip
+import zlib
+
+from flask import Response
+from werkzeug.datastructures import Accept
+
+# ------------------------------Project Imports-----------------------------#
+from note_categorizer.web_app import constants
+
+BROTLI: Optional[ModuleType]
+try:
+    import brotli  # type: ignore
+
+    BROTLI = brotli
+except ImportError:
+    BROTLI = None
+
+GZIP_ENCODING = "gzip"
+BROTLI_ENCODING = "br"
+
+COMPRESSIBLE_MIMETYPES = [
+    "application/json",
+    "application/javascript",
+    "application/x-ndjson",
+    "text/csv",
+    "text/css",
+    "text/html",
+    "text/javascript",
+    "text/plain",
+]
+
+# wbits that makes zlib write a gzip header and trailer
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def get_supported_encodings() -> List[str]:
+    """# Return
+    The encodings this server can compress with, in order of preference"""
+    if BROTLI is not None:
+        return [BROTLI_ENCODING, GZIP_ENCODING]
+    return [GZIP_ENCODING]
+
+
+def negotiate_encoding(accept_encodings: Accept, is_streamed: bool) -> Optional[str]:
+    """Picks the encoding to compress a response with.
+    # Return
+    * The preferred supported encoding the client accepts.
+    * None if the client accepts none of them."""
+    supported_encodings = get_supported_encodings()
+    if is_streamed:
+        # Streams are compressed chunk by chunk, which is only done with gzip
+        supported_encodings = [GZIP_ENCODING]
+    return accept_encodings.best_match(supported_encodings)
+
+
+def compress_response(response: Response, accept_encodings: Accept) -> Response:
+    """Compresses the response body if it is worth compressing and the client
+    accepts a supported encoding. Streamed responses are compressed as they are
+    sent rather than all at once."""
+    if (
+        response.status_code != 200
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        or "Content-Encoding" in response.headers
+        or response.direct_passthrough
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate_encoding(accept_encodings, response.is_streamed)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _iter_gzip_chunks(response.response)
+        response.headers.remove("Content-Length")
+    else:
+        body: bytes = response.get_data()
+        if len(body) < constants.MIN_COMPRESSED_RESPONSE_BYTES:
+            return response
+        if encoding == BROTLI_ENCODING and BROTLI is not None:
+            response.set_data(BROTLI.compress(body))
+        else:
+            response.set_data(gzip.compress(body, constants.GZIP_COMPRESS_LEVEL))
+
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def _iter_gzip_chunks(chunks: Iterable[Union[str, bytes]]) -> Iterator[bytes]:
+    """Gzips a stream of chunks without holding the whole stream"""
+    compressor = zlib.compressobj(constants.GZIP_COMPRESS_LEVEL, wbits=_GZIP_WBITS)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        compressed_chunk = compressor.compress(chunk)
+        if len(compressed_chunk) > 0:
+            yield compressed_chunk
+    yield compressor.flush()
@@ -6,22 +6,61 @@ from typing import Optional
 from typing import Tuple
 from typing import Dict
 from typing import Any
+from typing import Callable
+from typing import Iterator
 from typing import NamedTuple
+from typing import Sequence
 from pathlib import Path
+import time
 
 
 from flask import Flask
+from flask import Response
+from flask import g
 from flask import render_template
 from flask import request
+from flask import url_for
 import werkzeug.serving  # needed to make production worthy app that's secure
+from werkzeug.exceptions import RequestEntityTooLarge
 
 from note_categorizer.web_app import constants
+from note_categorizer.web_app.admission import AdmissionController, ServerLimits
+from note_categorizer.web_app.jobs import Job, JobManager, iter_job_events
+from note_categorizer.web_app.note_stream import InvalidStreamLine, StreamTooLarge
+from note_categorizer.web_app.note_stream import iter_ndjson
+from note_categorizer.web_app.pagination import InvalidCursor, StaleCursor, paginate
+from note_categorizer.web_app.response_encoding import compress_response
+from note_categorizer.web_app.session import InMemorySessionStore
+from note_categorizer.web_app.session import Session, SessionStore
 from note_categorizer.web_app.web_utils import WebUtils
-from note_categorizer.categorizer.parser import WebParser, ParsedData
+from note_categorizer.categorizer.category_reloader import CategoryReloader
+from note_categorizer.categorizer.compiled_categories import CompiledCategories
+from note_categorizer.categorizer.compiled_categories import CompiledCategoryLru
+from note_categorizer.categorizer.exporters import ExportFormat
+from note_categorizer.categorizer.exporters import ExportRowType
+from note_categorizer.categorizer.exporters import iter_export_chunks
+from note_categorizer.categorizer.parser import ParsedData, WebParser
+from note_categorizer.categorizer.parser import ParseDeadlineExceeded
+from note_categorizer.categorizer.parser import check_cpu_deadline
+from note_categorizer.categorizer.time_rollup import parse_time_window
 from note_categorizer.common.category import Category
+from note_categorizer.common.diagnostics import ProblemKind
+from note_categorizer.common.diagnostics import collect_diagnostics, report_problem
+from note_categorizer.common.keyword_index import MatchMode
 from note_categorizer.common.notes import Note
 
 
+LOGGER = logging.getLogger(__name__)
+
+LOCALHOST_ADDRESSES = ("127.0.0.1", "::1")
+
+EXPORT_MIMETYPES: Dict[ExportFormat, str] = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.JSONL: "application/x-ndjson",
+    ExportFormat.BINARY: "application/octet-stream",
+}
+
+
 class RequestResponseJson(NamedTuple):
     """Class representing the generic structure of a response to a request."""
 
@@ -30,6 +69,17 @@ class RequestResponseJson(NamedTuple):
     are_uncategorized: bool
     uncategorized_list: List[str]
     category_list: List[str]
+    # Refers to the parsed notes in later requests
+    session_id: str = ""
+    # Only set for paginated responses (`?paginate=true`) which have more
+    # uncategorized notes than fit in the first page. See /results/unknowns.
+    uncategorized_cursor: Optional[str] = None
+    # The suggested category of each uncategorized note (null without one). Only
+    # sent for the first page of uncategorized notes, see /results/unknowns.
+    uncategorized_suggestions: Optional[List[Optional[str]]] = None
+    # Only set for /submit_uncategorized_update: the "note -> category" pairs which
+    # were skipped, as the note or the category is invalid (or not in the session)
+    skipped_assignments: Optional[List[str]] = None
 
 
 # pylint: disable=too-many-instance-attributes
@@ -46,8 +96,14 @@ class WebAppServer(WebUtils):
         is_verbose: bool,
         use_localhost: bool,
         project_root_path: Path,
+        limits: Optional[ServerLimits] = None,
+        session_store: Optional[SessionStore] = None,
+        category_reloader: Optional[CategoryReloader] = None,
     ):
-        """Construct the WebAppServer"""
+        """Construct the WebAppServer.
+        `limits` defaults to the limits in constants, and `session_store` to
+        keeping the sessions in memory. Submissions without categories use the
+        current categories of `category_reloader`, when given."""
 
         self._title = constants.APP_NAME
         self._app: Flask = Flask(self._title)
@@ -56,9 +112,19 @@ class WebAppServer(WebUtils):
         self._is_threaded = True
         self._use_localhost: bool = use_localhost
         self.public_ip: str = WebUtils.get_public_ip()
-
-        self._parser: WebParser
-        self._parsed_data: ParsedData
+        self._limits: ServerLimits = limits if limits is not None else ServerLimits()
+        self._admission = AdmissionController.from_limits(self._limits)
+        self._jobs = JobManager(
+            self._limits.max_job_workers, self._limits.max_queued_jobs
+        )
+        self._app.config["MAX_CONTENT_LENGTH"] = self._limits.max_content_bytes
+
+        self._session_store: SessionStore = (
+            session_store if session_store is not None else InMemorySessionStore()
+        )
+        # Clients send the same category lines with every submission
+        self._compiled_categories = CompiledCategoryLru()
+        self._category_reloader = category_reloader
 
         # Create any Parent Classes
         WebUtils.__init__(self, self._app, port, project_root_path)
@@ -87,22 +153,30 @@ class WebAppServer(WebUtils):
         call. Do NOT expect to call other functions after this one until the
         Web App dies"""
 
-        if self._is_debug:
-            self._app.run(
-                host=self._host,
-                port=self._port,
-                debug=self._is_debug,
-                threaded=self._is_threaded,
-            )
-        else:
-            # FOR PRODUCTION
-            werkzeug.serving.run_simple(
-                hostname=self._host,
-                port=self._port,
-                application=self._app,
-                use_debugger=self._is_debug,
-                threaded=self._is_threaded,
-            )
+        try:
+            if self._is_debug:
+                self._app.run(
+                    host=self._host,
+                    port=self._port,
+                    debug=self._is_debug,
+                    threaded=self._is_threaded,
+                )
+            else:
+                # FOR PRODUCTION
+                werkzeug.serving.run_simple(
+                    hostname=self._host,
+                    port=self._port,
+                    application=self._app,
+                    use_debugger=self._is_debug,
+                    threaded=self._is_threaded,
+                )
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        """Stops the background work of the server once it stopped serving. Running
+        jobs are finished, and queued ones failed."""
+        self._jobs.shutdown(cancel_queued=True)
 
     def generate_routes(self) -> None:
         """Generates all routes needed"""
@@ -117,6 +191,10 @@ class WebAppServer(WebUtils):
 
         self.create_homepage()
         self.create_api_routes()
+        self.create_result_routes()
+        self.create_job_routes()
+        self.create_admin_routes()
+        self.create_response_hooks()
 
         if self._is_verbose:
             print(f"base url = {self.base_route}")
@@ -128,107 +206,708 @@ class WebAppServer(WebUtils):
         def index():
             return render_template("homepage.html", title=self._title)
 
+    # pylint: disable=too-many-statements
     def create_api_routes(self) -> None:
         """Generates internal api routes and adds them to to the app"""
 
+        @self._app.errorhandler(RequestEntityTooLarge)
+        def process_too_large(
+            _err: RequestEntityTooLarge,
+        ) -> Tuple[Dict[str, Any], int]:
+            max_bytes = self._limits.max_content_bytes
+            return {"error": f"Requests are limited to {max_bytes} bytes"}, 413
+
         @self._app.route("/submit_info", methods=["POST"])
-        def process_submit_info() -> dict:
+        def process_submit_info() -> Any:
+            with self._admission.admit() as is_admitted:
+                if not is_admitted:
+                    return self._get_busy_response()
+                with collect_diagnostics(LOGGER):
+                    return submit_info()
+
+        def submit_info() -> Any:
             if not isinstance(request.json, dict):
                 return RequestResponseJson("", False, [], [])._asdict()
 
-            data: Dict[str, List[str]] = request.json
-            category_list, deserialized_note_list = self._deserialize_info(data)
+            data: Dict[str, Any] = request.json
+            type_err_msg = self._check_info_types(data)
+            if type_err_msg is not None:
+                return {"error": type_err_msg}, 400
+            limit_err_msg = self._check_info_limits(data)
+            if limit_err_msg is not None:
+                return {"error": limit_err_msg}, 413
+            # Deserializing the notes counts towards the deadline too
+            cpu_deadline = time.thread_time() + self._limits.parse_cpu_deadline_sec
+            try:
+                compiled_categories, deserialized_note_list = self._deserialize_info(
+                    data, cpu_deadline
+                )
+                match_mode: MatchMode = self._deserialize_match_mode(data)
 
-            self._parser = WebParser(category_list, None, self._is_verbose)
-            self._parsed_data = self._parser.parse_notes(deserialized_note_list)
-            self._parser.calculate_category_time(self._parsed_data)
+                parser = WebParser.from_compiled_categories(
+                    compiled_categories, None, self._is_verbose, match_mode
+                )
+                parsed_data = parser.parse_notes(deserialized_note_list, cpu_deadline)
+            except ParseDeadlineExceeded as err:
+                return {"error": f"{err}. Please submit fewer notes."}, 413
+            parser.calculate_category_time(parsed_data)
+            if self._is_verbose:
+                LOGGER.info("%s", parser.classification_cache.stats_to_str())
+                LOGGER.info("%s", self._compiled_categories.stats_to_str())
+
+            g.session = self._session_store.create_session(parser, parsed_data)
+            return self._generate_response_after_calculation(g.session)
+
+        @self._app.route("/submit_info_stream", methods=["POST"])
+        def process_submit_info_stream() -> Any:
+            """Same as /submit_info, but the body is newline-delimited json which
+            is categorized as it arrives. The first line is the category info
+            (`{"category_info": [...], "match_mode": ...}`) and every other line
+            is a note string. An admission slot is only held while categorizing,
+            so slow uploads don't keep other requests waiting."""
+            try:
+                with collect_diagnostics(LOGGER):
+                    return submit_info_stream()
+            except InvalidStreamLine as err:
+                return {"error": str(err)}, 400
+            except (StreamTooLarge, ParseDeadlineExceeded) as err:
+                return {"error": f"{err}. Please submit fewer notes."}, 413
+
+        def submit_info_stream() -> Any:
+            ndjson_lines = iter_ndjson(request.stream, self._limits.max_content_bytes)
+            _, data = next(ndjson_lines, (0, None))
+            if not isinstance(data, dict):
+                return {"error": "The first line must be the category info"}, 400
+            type_err_msg = self._check_info_types(data)
+            if type_err_msg is not None:
+                return {"error": type_err_msg}, 400
+            limit_err_msg = self._check_info_limits(data)
+            if limit_err_msg is not None:
+                return {"error": limit_err_msg}, 413
+            category_lines: List[str] = data.get("category_info", [])
+            match_mode: MatchMode = self._deserialize_match_mode(data)
+            with self._admission.admit() as is_admitted:
+                if not is_admitted:
+                    return self._get_busy_response()
+                compiled_categories = self._get_compiled_categories(category_lines)
+
+            # Category times are kept up to date as each batch is categorized
+            parser = WebParser.from_compiled_categories(
+                compiled_categories, {}, self._is_verbose, match_mode
+            )
+            parsed_data = ParsedData({}, [], self._is_verbose)
+            err_response = self._parse_stream_notes(ndjson_lines, parser, parsed_data)
+            if err_response is not None:
+                return err_response
 
-            return generate_response_after_calculation()
+            g.session = self._session_store.create_session(parser, parsed_data)
+            return self._generate_response_after_calculation(g.session)
 
         @self._app.route("/submit_uncategorized_update", methods=["POST"])
-        def process_uncategorized_update() -> dict:
+        def process_uncategorized_update() -> Any:
             """Request has categories for at least one of the uncategorized notes"""
+            with self._admission.admit() as is_admitted:
+                if not is_admitted:
+                    return self._get_busy_response()
+                with collect_diagnostics(LOGGER):
+                    return submit_uncategorized_update()
+
+        def submit_uncategorized_update() -> Any:
+            session = self._get_request_session()
+            if session is None:
+                return self._get_no_session_response()
             if not isinstance(request.json, dict):
                 return RequestResponseJson("", False, [], [])._asdict()
 
             newly_categorized: Dict[str, str] = request.json
+            if len(newly_categorized) > self._limits.max_notes:
+                err_msg = f"Requests are limited to {self._limits.max_notes} notes"
+                return {"error": err_msg}, 413
 
+            assignments: List[Tuple[Note, Category]] = []
+            skipped_assignments: List[str] = []
             for note_str in newly_categorized:
                 category_str = newly_categorized[note_str]
                 note_to_categorize: Optional[Note] = Note.from_str(note_str.strip())
-                make_note_err_msg = f"Received note string {note_str} from Request."
-                make_note_err_msg += "This is an invalid note string."
-                if note_to_categorize is None:
-                    print(make_note_err_msg)
-                    continue
-
                 new_category: Optional[Category] = Category.from_str(category_str)
-                if new_category is None:
-                    categorize_err_msg = (
-                        f"Received category string {category_str} from Request."
+                if note_to_categorize is None or new_category is None:
+                    report_problem(
+                        ProblemKind.INVALID_ASSIGNMENT, f"{note_str} -> {category_str}"
                     )
-                    categorize_err_msg += "This is an invalid note string."
-                    print(categorize_err_msg)
+                    skipped_assignments.append(f"{note_str} -> {category_str}")
                     continue
 
-                self._parsed_data.add_to_known_assignments(
-                    note_to_categorize, new_category
+                assignments.append((note_to_categorize, new_category))
+                if self._is_verbose and LOGGER.isEnabledFor(logging.DEBUG):
+                    LOGGER.debug("%s -> %s", note_to_categorize, new_category)
+
+            # Recalculates time now that more info is known
+            for note, category in self._session_store.assign_notes(
+                session, assignments
+            ):
+                skipped_assignments.append(f"{note} -> {category.name}")
+
+            response = self._generate_response_after_calculation(session)
+            response["skipped_assignments"] = skipped_assignments
+            return response
+
+        @self._app.route("/results", methods=["GET"])
+        def process_results() -> Tuple[Dict[str, Any], int]:
+            """The same response as the last submit / update of the session.
+            Returns 304 while the results are unchanged (see If-None-Match)."""
+            session = self._get_request_session()
+            if session is None:
+                return self._get_no_session_response()
+            return self._generate_response_after_calculation(session), 200
+
+        @self._app.route("/rollup", methods=["GET"])
+        def process_rollup() -> Tuple[Dict[str, Any], int]:
+            """Minutes per category within time windows of the day.
+            Query params: `window=HH:MM-HH:MM` (repeatable) and `hourly=true`."""
+            session = self._get_request_session()
+            if session is None:
+                return self._get_no_session_response()
+
+            time_windows: List[Tuple[str, Tuple[int, int]]] = []
+            for window_str in request.args.getlist("window"):
+                time_window = parse_time_window(window_str)
+                if time_window is None:
+                    return {"error": f"Invalid time window {window_str}"}, 400
+                time_windows.append((window_str, time_window))
+
+            rollup_index = session.get_rollup_index()
+            response: Dict[str, Any] = {"windows": []}
+            for window_str, (start_minute, end_minute) in time_windows:
+                window_totals = rollup_index.get_window_totals(start_minute, end_minute)
+                response["windows"].append(
+                    {
+                        "window": window_str,
+                        "totals": {
+                            category.name: minutes
+                            for category, minutes in window_totals.items()
+                        },
+                    }
                 )
-                if self._is_verbose:
-                    category_notes = self._parsed_data.get_category_notes(new_category)
-                    if category_notes is not None:
-                        print(category_notes[-1])
-
-            # Recalculate time now that more info is known
-            self._parser.calculate_category_time(self._parsed_data)
-
-            return generate_response_after_calculation()
+            if request.args.get("hourly", "false").lower() == "true":
+                response["hourly"] = {
+                    category.name: hourly_minutes
+                    for category, hourly_minutes in rollup_index.get_hourly_histogram().items()
+                }
+            return response, 200
+
+        @self._app.route("/export", methods=["GET"])
+        def process_export() -> Any:
+            """Streams the parsed notes for other programs to consume.
+            Query params: `format=csv|jsonl|binary` and `rows=notes|totals`."""
+            session = self._get_request_session()
+            if session is None:
+                return self._get_no_session_response()
+            try:
+                export_format = ExportFormat(request.args.get("format", "csv"))
+                row_type = ExportRowType(request.args.get("rows", "notes"))
+            except ValueError as err:
+                return {"error": str(err)}, 400
+
+            chunks = iter_export_chunks(
+                session.parser, session.parsed_data, export_format, row_type
+            )
+            return Response(
+                chunks,
+                mimetype=EXPORT_MIMETYPES[export_format],
+                headers={
+                    "Content-Disposition": "attachment; filename="
+                    + f"{row_type.value}.{export_format.value}"
+                },
+            )
 
-        def generate_response_after_calculation() -> Dict[str, Any]:
-            """Generates the response after calculation when similar response is required"""
-            are_uncategorized = self._parsed_data.is_fully_parsed() is False
-            uncategorized_note_str_list = list(
-                # pylint: disable=unnecessary-lambda
-                map(lambda note: str(note), self._parsed_data.get_unknown_notes())
+    def create_result_routes(self) -> None:
+        """Generates the routes paging through the results of a session.
+        Each takes `limit` and the `cursor` of the previous page as query params,
+        and responds with `items`, `next_cursor` (null on the last page), `total`
+        and `version`. A cursor made before the results changed gets a 409."""
+
+        @self._app.route("/results/totals", methods=["GET"])
+        def process_results_totals() -> Tuple[Dict[str, Any], int]:
+            """Total minutes and note count of each category"""
+            session = self._get_request_session()
+            if session is None:
+                return self._get_no_session_response()
+            with session.lock:
+                category_total_time = session.parser.category_total_time or {}
+                totals = [
+                    {
+                        "category": category.name,
+                        "minutes": category_total_time.get(category, 0),
+                        "note_count": len(
+                            session.parsed_data.get_category_notes(category) or []
+                        ),
+                    }
+                    for category in session.parser.valid_categories
+                ]
+                return self._get_page_response(session, totals)
+
+        @self._app.route("/results/notes", methods=["GET"])
+        def process_results_notes() -> Tuple[Dict[str, Any], int]:
+            """Notes of the category given by the `category` query param"""
+            session = self._get_request_session()
+            if session is None:
+                return self._get_no_session_response()
+            category_name = request.args.get("category", "")
+            category = session.parser.get_category_by_name(category_name)
+            if category is None:
+                return {"error": f"Unknown category {category_name}"}, 404
+            with session.lock:
+                category_notes = session.parsed_data.get_category_notes(category)
+                return self._get_page_response(session, category_notes or [], str)
+
+        @self._app.route("/results/unknowns", methods=["GET"])
+        def process_results_unknowns() -> Tuple[Dict[str, Any], int]:
+            """Notes which are not categorized yet. `suggestions` has the suggested
+            category of each note (null without one)."""
+            session = self._get_request_session()
+            if session is None:
+                return self._get_no_session_response()
+            with session.lock:
+                page_json, status = self._get_page_response(
+                    session, session.parsed_data.get_unknown_notes()
+                )
+                if status == 200:
+                    page_notes: List[Note] = page_json["items"]
+                    page_json["items"] = [str(note) for note in page_notes]
+                    page_json["suggestions"] = session.get_suggested_category_names(
+                        page_notes
+                    )
+                return page_json, status
+
+    def create_job_routes(self) -> None:
+        """Generates the routes of jobs, which categorize submissions too large to
+        answer within a request (see jobs.py)"""
+
+        @self._app.route("/jobs", methods=["POST"])
+        def process_submit_job() -> Any:
+            """Takes the same json as /submit_info, or a form with a `notes_file`
+            upload (plus a `category_file` upload or `category_info` fields, and
+            `match_mode`). Responds 202 with the queued job, without waiting for
+            it. The number of notes is only limited by the size of the request."""
+            if "notes_file" in request.files:
+                note_lines = _read_upload_lines("notes_file")
+                category_lines = (
+                    _read_upload_lines("category_file")
+                    if "category_file" in request.files
+                    else request.form.getlist("category_info")
+                )
+                data: Dict[str, Any] = dict(request.form)
+            elif isinstance(request.json, dict):
+                data = request.json
+                type_err_msg = self._check_info_types(data)
+                if type_err_msg is not None:
+                    return {"error": type_err_msg}, 400
+                note_lines = data.get("notes", [])
+                category_lines = data.get("category_info", [])
+            else:
+                return {"error": "Expected json or a notes_file upload"}, 400
+
+            if len(category_lines) > self._limits.max_categories:
+                max_categories = self._limits.max_categories
+                return {
+                    "error": f"Jobs are limited to {max_categories} categories"
+                }, 413
+            with collect_diagnostics(LOGGER):
+                compiled_categories = self._get_compiled_categories(category_lines)
+            match_mode = self._deserialize_match_mode(data)
+
+            job = self._jobs.submit(
+                len(note_lines),
+                lambda job: self._run_job(
+                    job, note_lines, compiled_categories, match_mode
+                ),
+            )
+            if job is None:
+                return self._get_busy_response()
+            return job.to_json(), 202, {"Location": f"/jobs/{job.job_id}"}
+
+        def _read_upload_lines(field_name: str) -> List[str]:
+            upload_bytes = request.files[field_name].read()
+            return upload_bytes.decode("utf-8", errors="replace").splitlines()
+
+        @self._app.route("/jobs/<job_id>", methods=["GET"])
+        def process_get_job(job_id: str) -> Tuple[Dict[str, Any], int]:
+            """The state and progress of the job. Once `done`, its results are
+            fetched from /results/... or /export with its `session_id`."""
+            job = self._jobs.get_job(job_id)
+            if job is None:
+                return {"error": f"Unknown job {job_id}"}, 404
+            return job.to_json(), 200
+
+        @self._app.route("/jobs/<job_id>/events", methods=["GET"])
+        def process_job_events(job_id: str) -> Any:
+            """Server-Sent Events of the job's progress, until it finishes"""
+            job = self._jobs.get_job(job_id)
+            if job is None:
+                return {"error": f"Unknown job {job_id}"}, 404
+            return Response(
+                iter_job_events(job),
+                mimetype="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
             )
-            new_processed_data = self._parser.results_to_str(self._parsed_data, True)
+
+    def create_admin_routes(self) -> None:
+        """Generates the routes managing the server. Only served to localhost."""
+
+        @self._app.route("/admin/reload_categories", methods=["POST"])
+        def process_reload_categories() -> Tuple[Dict[str, Any], int]:
+            """Recompiles the category file of --category_path and swaps it in.
+            Requests already being parsed finish with the previous categories."""
+            if request.remote_addr not in LOCALHOST_ADDRESSES:
+                return {"error": "Only allowed from localhost"}, 403
+            if self._category_reloader is None:
+                return {"error": "The server has no category file"}, 404
+            try:
+                is_changed = self._category_reloader.reload()
+            except FileNotFoundError as err:
+                return {"error": f"{err} doesn't exist"}, 409
+            compiled_categories = self._category_reloader.get()
+            return {
+                "changed": is_changed,
+                "generation": self._category_reloader.generation,
+                "category_list": [
+                    str(category) for category in compiled_categories.categories
+                ],
+            }, 200
+
+    def create_response_hooks(self) -> None:
+        """Generates the hooks run around every request. They revalidate the
+        responses derived from a session, cache the versioned static assets
+        and compress large responses."""
+        session_endpoints = [
+            "process_results",
+            "process_rollup",
+            "process_export",
+            "process_results_totals",
+            "process_results_notes",
+            "process_results_unknowns",
+        ]
+
+        @self._app.context_processor
+        def add_static_url() -> Dict[str, Any]:
+            def static_url(filename: str) -> str:
+                """Url of a static file that changes whenever the file does"""
+                version = self.get_static_file_version(filename)
+                return url_for("static", filename=filename, v=version)
+
+            return {"static_url": static_url}
+
+        @self._app.before_request
+        def check_not_modified() -> Optional[Response]:
+            """Skips rebuilding results the client already has"""
+            if request.method != "GET" or request.endpoint not in session_endpoints:
+                return None
+            session = self._get_request_session()
+            if session is not None and request.if_none_match.contains_weak(
+                session.get_etag()
+            ):
+                not_modified = Response(status=304)
+                not_modified.set_etag(session.get_etag(), weak=True)
+                return not_modified
+            return None
+
+        @self._app.after_request
+        def finalize_response(response: Response) -> Response:
+            session: Optional[Session] = g.get("session")
+            if (
+                request.endpoint
+                in ["process_submit_info", "process_submit_info_stream"]
+                and session is not None
+            ):
+                response.set_cookie(
+                    constants.SESSION_COOKIE_NAME,
+                    session.session_id,
+                    httponly=True,
+                    samesite="Lax",
+                )
+            elif (
+                request.endpoint in session_endpoints
+                and response.status_code == 200
+                and session is not None
+            ):
+                # Weak, since the compressed and uncompressed bodies differ
+                response.set_etag(session.get_etag(), weak=True)
+                response.cache_control.no_cache = True
+            elif request.endpoint == "static" and "v" in request.args:
+                response.cache_control.public = True
+                response.cache_control.max_age = constants.STATIC_ASSET_MAX_AGE_SEC
+                response.cache_control.immutable = True
+            return compress_response(response, request.accept_encodings)
+
+    def _get_request_session(self) -> Optional[Session]:
+        """Finds the session of the request, by the `session_id` query param or
+        else the session cookie. It is remembered for the rest of the request.
+        # Return
+        * The session.
+        * None if the request has no session or it expired."""
+        if "session" in g:
+            return g.session
+        session_id = request.args.get(
+            "session_id", request.cookies.get(constants.SESSION_COOKIE_NAME)
+        )
+        if session_id is None:
+            return None
+        g.session = self._session_store.get_session(session_id)
+        return g.session
+
+    def _get_no_session_response(self) -> Tuple[Dict[str, Any], int]:
+        """# Return
+        The response to a request without a (known) session"""
+        return {"error": "No notes have been submitted yet (or they expired)"}, 400
+
+    def _get_page_response(
+        self,
+        session: Session,
+        items: Sequence[Any],
+        to_json: Callable[[Any], Any] = lambda item: item,
+    ) -> Tuple[Dict[str, Any], int]:
+        """Generates the response with the page of items requested"""
+        limit = request.args.get("limit", constants.DEFAULT_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, constants.MAX_PAGE_SIZE))
+        try:
+            page = paginate(items, session.version, request.args.get("cursor"), limit)
+        except StaleCursor as err:
+            return {"error": str(err)}, 409
+        except InvalidCursor as err:
+            return {"error": str(err)}, 400
+        page_json = page._asdict()
+        page_json["items"] = [to_json(item) for item in page.items]
+        return page_json, 200
+
+    def _generate_response_after_calculation(self, session: Session) -> Dict[str, Any]:
+        """Generates the response after calculation when similar response is required.
+        With `?paginate=true`, only the category totals and the first page of
+        uncategorized notes are sent. The rest is fetched from /results/*."""
+        with session.lock:
+            parsed_data = session.parsed_data
+            unknown_notes = parsed_data.get_unknown_notes()
+            are_uncategorized = parsed_data.is_fully_parsed() is False
+            uncategorized_cursor: Optional[str] = None
+
+            if request.args.get("paginate", "false").lower() == "true":
+                page = paginate(
+                    unknown_notes, session.version, None, constants.DEFAULT_PAGE_SIZE
+                )
+                unknown_notes = page.items
+                uncategorized_cursor = page.next_cursor
+                new_processed_data = self._totals_to_str(session)
+            else:
+                new_processed_data = session.parser.results_to_str(parsed_data, True)
 
             response = RequestResponseJson(
                 new_processed_data,
                 are_uncategorized,
-                uncategorized_note_str_list,
-                self._parser.get_valid_category_list_str(),
+                # pylint: disable=unnecessary-lambda
+                list(map(lambda note: str(note), unknown_notes)),
+                session.parser.get_valid_category_list_str(),
+                session.session_id,
+                uncategorized_cursor,
+                session.get_suggested_category_names(
+                    unknown_notes[: constants.DEFAULT_PAGE_SIZE]
+                ),
             )
             return response._asdict()
 
+    def _totals_to_str(self, session: Session) -> str:
+        """Renders the total time of each category in a human-readable manner"""
+        category_total_time = session.parser.category_total_time or {}
+        res = ""
+        for category in session.parser.valid_categories:
+            note_count = len(session.parsed_data.get_category_notes(category) or [])
+            res += f"Category {category.name}: "
+            res += (
+                f"{category_total_time.get(category, 0)} minutes, {note_count} notes\n"
+            )
+        unknown_count = len(session.parsed_data.get_unknown_notes())
+        if unknown_count > 0:
+            res += f"\nUnknown category notes: {unknown_count}\n"
+        return res
+
+    def _get_busy_response(self) -> Tuple[Dict[str, Any], int, Dict[str, str]]:
+        """# Return
+        The response telling the client to retry once the server is less busy"""
+        return (
+            {"error": "The server is busy. Please try again."},
+            503,
+            {"Retry-After": str(constants.RETRY_AFTER_SEC)},
+        )
+
+    @classmethod
+    def _check_info_types(cls, data: Dict[str, Any]) -> Optional[str]:
+        """Checks the notes and category info of the info post request (which are
+        optional) are lists of strings.
+        # Return
+        * None if they are.
+        * A message explaining which is not."""
+        for field_name in ("notes", "category_info"):
+            field_value = data.get(field_name, [])
+            if not isinstance(field_value, list) or not all(
+                isinstance(line, str) for line in field_value
+            ):
+                return f"{field_name} must be a list of strings"
+        return None
+
+    def _check_info_limits(self, data: Dict[str, Any]) -> Optional[str]:
+        """Checks the info post request is within the limits. The types must
+        already be checked (see `_check_info_types`).
+        # Return
+        * None if it is within the limits.
+        * A message explaining which limit it broke."""
+        if len(data.get("notes", [])) > self._limits.max_notes:
+            return f"Requests are limited to {self._limits.max_notes} notes"
+        if len(data.get("category_info", [])) > self._limits.max_categories:
+            return f"Requests are limited to {self._limits.max_categories} categories"
+        return None
+
+    def _deserialize_match_mode(self, data: Dict[str, Any]) -> MatchMode:
+        """Reads the (optional) match mode of the info post request.
+        Defaults to substring matching when it is missing or invalid."""
+        raw_match_mode = data.get("match_mode", MatchMode.SUBSTRING.value)
+        try:
+            return MatchMode(raw_match_mode)
+        except ValueError:
+            if self._is_verbose:
+                LOGGER.info(
+                    "Received invalid match mode %s. Using substring", raw_match_mode
+                )
+            return MatchMode.SUBSTRING
+
     def _deserialize_info(
-        self, data: Dict[str, List[str]]
-    ) -> Tuple[List[Category], List[Note]]:
-        """Uses data from the info post request to deserialize into note list and category list"""
+        self, data: Dict[str, List[str]], cpu_deadline: Optional[float] = None
+    ) -> Tuple[CompiledCategories, List[Note]]:
+        """Uses data from the info post request to deserialize into note list and
+        compiled categories. Categories are only compiled the first time their
+        lines are seen (see `CompiledCategoryLru`). Without any, the categories of
+        the category reloader are used (when the server has one).
+        # Parameters
+        * `cpu_deadline` - See `WebParser.parse_additional_notes`.
+        """
         notes: List[str] = data.get("notes", [])
 
         category_serial: List[str] = data.get("category_info", [])
-        category_list = []
-        for category_str in category_serial:
-            if len(category_str.strip()) == 0:
-                continue
-            opt_category: Optional[Category] = Category.from_str(category_str)
-            if opt_category is None:
-                continue
-            category_list.append(opt_category)
+        compiled_categories = self._get_compiled_categories(category_serial)
 
         deserialized_note_list: List[Note] = []
-        for note in notes:
-            if len(note.strip()) == 0:
-                continue
-            deserialized_note: Optional[Note] = Note.from_str(note)
-
-            if deserialized_note is None:
-                err_msg = f"Failed to render note string {note} into a Note"
-                if self._is_verbose:
-                    print(err_msg)
-                continue
+        for note_idx, note in enumerate(notes):
+            check_cpu_deadline(cpu_deadline, note_idx, len(notes))
+            deserialized_note = self._deserialize_note(note)
+            if deserialized_note is not None:
+                deserialized_note_list.append(deserialized_note)
 
-            deserialized_note_list.append(deserialized_note)
+        return (compiled_categories, deserialized_note_list)
 
-        return (category_list, deserialized_note_list)
+    def _parse_stream_notes(
+        self,
+        ndjson_lines: Iterator[Tuple[int, Any]],
+        parser: WebParser,
+        parsed_data: ParsedData,
+    ) -> Optional[Tuple[Any, ...]]:
+        """Categorizes the notes of an upload stream (after its category info) in
+        batches, as they arrive.
+        # Return
+        * None once every note is categorized.
+        * The error response if the upload broke a limit or the server is busy."""
+        cpu_deadline = time.thread_time() + self._limits.parse_cpu_deadline_sec
+        note_batch: List[Note] = []
+        note_count = 0
+        for line_number, note_str in ndjson_lines:
+            if not isinstance(note_str, str):
+                raise InvalidStreamLine(line_number, "is not a note string")
+            note_count += 1
+            if note_count > self._limits.max_notes:
+                err_msg = f"Requests are limited to {self._limits.max_notes} notes"
+                return {"error": err_msg}, 413
+
+            note = self._deserialize_note(note_str)
+            if note is not None:
+                note_batch.append(note)
+            if len(note_batch) >= constants.STREAM_NOTE_BATCH_SIZE:
+                if not self._parse_admitted_batch(
+                    parser, note_batch, parsed_data, cpu_deadline
+                ):
+                    return self._get_busy_response()
+                note_batch = []
+        if not self._parse_admitted_batch(
+            parser, note_batch, parsed_data, cpu_deadline
+        ):
+            return self._get_busy_response()
+        return None
+
+    def _parse_admitted_batch(
+        self,
+        parser: WebParser,
+        note_batch: List[Note],
+        parsed_data: ParsedData,
+        cpu_deadline: float,
+    ) -> bool:
+        """Categorizes a batch of streamed notes while holding an admission slot.
+        # Return
+        * True once categorized.
+        * False if no slot freed up in time (see `AdmissionController.admit`)."""
+        with self._admission.admit() as is_admitted:
+            if not is_admitted:
+                return False
+            parser.parse_additional_notes(
+                note_batch, parsed_data, cpu_deadline, accumulate_totals=True
+            )
+            return True
+
+    def _get_compiled_categories(self, category_lines: List[str]) -> CompiledCategories:
+        """# Return
+        The compiled categories of the lines. Without any, the categories of the
+        category reloader (when the server has one)."""
+        has_categories = any(len(line.strip()) > 0 for line in category_lines)
+        if self._category_reloader is not None and not has_categories:
+            # Read once, so the request uses the same categories even if reloaded
+            return self._category_reloader.get()
+        return self._compiled_categories.get(category_lines)
+
+    def _run_job(
+        self,
+        job: Job,
+        note_lines: List[str],
+        compiled_categories: CompiledCategories,
+        match_mode: MatchMode,
+    ) -> None:
+        """Categorizes the notes of a job on its worker. Notes are categorized in
+        batches, and the progress of the job updated after each."""
+        batch_size = constants.JOB_PROGRESS_BATCH_SIZE
+        with collect_diagnostics(LOGGER):
+            parser = WebParser.from_compiled_categories(
+                compiled_categories, {}, self._is_verbose, match_mode
+            )
+            parsed_data = ParsedData({}, [], self._is_verbose)
+            for batch_start in range(0, len(note_lines), batch_size):
+                batch_lines = note_lines[batch_start : batch_start + batch_size]
+                note_batch = [
+                    note
+                    for note in map(self._deserialize_note, batch_lines)
+                    if note is not None
+                ]
+                parser.parse_additional_notes(
+                    note_batch, parsed_data, accumulate_totals=True
+                )
+                job.set_progress(
+                    batch_start + len(batch_lines),
+                    sum(len(notes) for notes in parsed_data.known_assignments.values()),
+                    len(parsed_data.get_unknown_notes()),
+                )
+            session = self._session_store.create_session(parser, parsed_data)
+        job.set_done(session.session_id)
+
+    def _deserialize_note(self, note: str) -> Optional[Note]:
+        """Deserializes a single note of a request.
+        # Return
+        * The note.
+        * None if the line is empty or not a note."""
+        if len(note.strip()) == 0:
+            return None
+        deserialized_note: Optional[Note] = Note.from_str(note)
+        if deserialized_note is None:
+            report_problem(ProblemKind.MALFORMED_NOTE_LINE, note)
+        return deserialized_note
@@ -0,0 +1,197 @@
+"""Module responsible for keeping the parsed notes of each client between requests.
+Every submission creates a session, which later requests refer to by its id."""
+# ------------------------------STANDARD DEPENDENCIES-----------------------------#
+from collections import OrderedDict
+from typing import List
+from typing import Optional
+from typing import Tuple
+import abc
+import secrets
+import threading
+
+# ------------------------------Project Imports-----------------------------#
+from note_categorizer.categorizer.parser import ParsedData, WebParser
+from note_categorizer.categorizer.similarity_index import SimilarityIndex
+from note_categorizer.categorizer.time_rollup import TimeRollupIndex
+from note_categorizer.common.category import Category
+from note_categorizer.common.diagnostics import ProblemKind, report_problem
+from note_categorizer.common.notes import Note
+from note_categorizer.web_app import constants
+
+
+def generate_session_id() -> str:
+    """# Return
+    A new unguessable session id"""
+    return secrets.token_urlsafe(16)
+
+
+class Session:
+    """The parsed notes of a single submission"""
+
+    def __init__(
+        self,
+        session_id: str,
+        parser: WebParser,
+        parsed_data: ParsedData,
+        version: int = 1,
+    ) -> None:
+        self.session_id = session_id
+        self.parser = parser
+        self.parsed_data = parsed_data
+        # Bumped whenever the parsed data changes
+        self.version = version
+        # Held while reading or changing the parsed data
+        self.lock = threading.RLock()
+        # Built on first use. Reset whenever the parsed data changes, except the
+        # similarity index, which new assignments are added to.
+        self._rollup_index: Optional[TimeRollupIndex] = None
+        self._similarity_index: Optional[SimilarityIndex] = None
+
+    def get_etag(self) -> str:
+        """# Return
+        The ETag of every response derived from the current parsed data"""
+        return f"{self.session_id}-{self.version}"
+
+    def get_rollup_index(self) -> TimeRollupIndex:
+        """# Return
+        The time rollup of the current parsed data"""
+        with self.lock:
+            if self._rollup_index is None:
+                self._rollup_index = TimeRollupIndex(
+                    self.parser.valid_categories, self.parsed_data
+                )
+            return self._rollup_index
+
+    def get_suggested_category_names(self, notes: List[Note]) -> List[Optional[str]]:
+        """# Return
+        For each note, the name of the category of the most similar categorized
+        note. None where no categorized note is similar enough."""
+        if len(notes) == 0:
+            return []
+        with self.lock:
+            if self._similarity_index is None:
+                self._similarity_index = SimilarityIndex.from_known_assignments(
+                    self.parsed_data.known_assignments
+                )
+            suggestions = [
+                self._similarity_index.suggest_category(note.info) for note in notes
+            ]
+        return [
+            None if suggestion is None else suggestion.category.name
+            for suggestion in suggestions
+        ]
+
+    def on_parsed_data_changed(
+        self, applied_assignments: Optional[List[Tuple[Note, Category]]] = None
+    ) -> None:
+        """Invalidates everything derived from the parsed data.
+        # Parameters
+        * `applied_assignments` - When the only change is these assignments, they
+        are added to the similarity index rather than rebuilding it.
+        """
+        self._rollup_index = None
+        if applied_assignments is None:
+            self._similarity_index = None
+        elif self._similarity_index is not None:
+            for note, category in applied_assignments:
+                self._similarity_index.add(note.info, category)
+        self.version += 1
+
+    def apply_assignments(
+        self, assignments: List[Tuple[Note, Category]]
+    ) -> Tuple[List[Tuple[Note, Category]], List[Tuple[Note, Category]]]:
+        """Moves notes into the categories picked for them and recalculates the
+        category times. Each assignment moves the first uncategorized note that is
+        the same (see `ParsedData.pop_unknown_note`). Assignments to categories
+        which are not part of the session, or of notes which are not uncategorized,
+        are skipped (and reported as invalid assignments).
+        # Return
+        * The assignments that were applied, with the session's own notes and
+        categories.
+        * The assignments that were skipped."""
+        applied_assignments: List[Tuple[Note, Category]] = []
+        skipped_assignments: List[Tuple[Note, Category]] = []
+        with self.lock:
+            for note, category in assignments:
+                if category not in self.parser.valid_categories:
+                    report_problem(
+                        ProblemKind.INVALID_ASSIGNMENT, f"{note} -> {category.name}"
+                    )
+                    skipped_assignments.append((note, category))
+                    continue
+                session_note = self.parsed_data.pop_unknown_note(note)
+                if session_note is None:
+                    report_problem(
+                        ProblemKind.INVALID_ASSIGNMENT, f"{note} -> {category.name}"
+                    )
+                    skipped_assignments.append((note, category))
+                    continue
+                session_category = self.parser.valid_categories[
+                    self.parser.valid_categories.index(category)
+                ]
+                self.parsed_data.add_to_known_assignments(
+                    session_note, session_category, False
+                )
+                applied_assignments.append((session_note, session_category))
+            self.parser.calculate_category_time(self.parsed_data)
+            self.on_parsed_data_changed(applied_assignments)
+        return applied_assignments, skipped_assignments
+
+
+class SessionStore(abc.ABC):
+    """Keeps the sessions of every client"""
+
+    @abc.abstractmethod
+    def create_session(self, parser: WebParser, parsed_data: ParsedData) -> Session:
+        """Stores the parsed data of a new submission.
+        # Return
+        The new session."""
+
+    @abc.abstractmethod
+    def get_session(self, session_id: str) -> Optional[Session]:
+        """# Return
+        * The session with the id.
+        * None if there is no such session (or it expired)."""
+
+    @abc.abstractmethod
+    def assign_notes(
+        self, session: Session, assignments: List[Tuple[Note, Category]]
+    ) -> List[Tuple[Note, Category]]:
+        """Moves notes of the session into the categories picked for them, and
+        recalculates the category times. See `Session.apply_assignments`.
+        # Return
+        The assignments that were skipped, as their category is not part of the
+        session or their note is not uncategorized."""
+
+
+class InMemorySessionStore(SessionStore):
+    """Keeps the sessions in the memory of this process. Once full, the least
+    recently used session is dropped."""
+
+    def __init__(self, max_sessions: int = constants.DEFAULT_MAX_SESSIONS) -> None:
+        self._max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create_session(self, parser: WebParser, parsed_data: ParsedData) -> Session:
+        session = Session(generate_session_id(), parser, parsed_data)
+        with self._lock:
+            self._sessions[session.session_id] = session
+            while len(self._sessions) > self._max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def get_session(self, session_id: str) -> Optional[Session]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def assign_notes(
+        self, session: Session, assignments: List[Tuple[Note, Category]]
+    ) -> List[Tuple[Note, Category]]:
+        return session.apply_assignments(assignments)[1]
+
+    def __len__(self) -> int:
+        return len(self._sessions)
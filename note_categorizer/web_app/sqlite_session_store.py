@@ -0,0 +1,442 @@
+"""Module responsible for keeping sessions in a SQLite database, so every worker
+process of the web app (and a restarted one) sees the same sessions.
+Notes are stored a row each, so categorizing notes only updates their rows."""
+# ------------------------------STANDARD DEPENDENCIES-----------------------------#
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+import json
+import sqlite3
+import threading
+import time
+
+# ------------------------------Project Imports-----------------------------#
+from note_categorizer.categorizer.parser import ParsedData, WebParser
+from note_categorizer.common.category import Category
+from note_categorizer.common.keyword_index import MatchMode
+from note_categorizer.common.notes import Note
+from note_categorizer.web_app import constants
+from note_categorizer.web_app.session import Session, SessionStore
+from note_categorizer.web_app.session import generate_session_id
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    match_mode TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_by_last_used ON sessions (last_used);
+
+CREATE TABLE IF NOT EXISTS session_categories (
+    session_id TEXT NOT NULL REFERENCES sessions (session_id) ON DELETE CASCADE,
+    category_idx INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    keywords TEXT NOT NULL,
+    total_minutes INTEGER NOT NULL,
+    PRIMARY KEY (session_id, category_idx)
+);
+
+CREATE TABLE IF NOT EXISTS session_notes (
+    session_id TEXT NOT NULL REFERENCES sessions (session_id) ON DELETE CASCADE,
+    note_idx INTEGER NOT NULL,
+    note TEXT NOT NULL,
+    -- Normalized note, used to find the note when it gets categorized
+    note_key TEXT NOT NULL,
+    minutes INTEGER NOT NULL,
+    -- NULL while the note is uncategorized
+    category_idx INTEGER,
+    -- Position of the note within its category
+    category_order INTEGER,
+    PRIMARY KEY (session_id, note_idx)
+);
+CREATE INDEX IF NOT EXISTS session_notes_by_category
+    ON session_notes (session_id, category_idx, category_order);
+CREATE INDEX IF NOT EXISTS session_notes_by_key
+    ON session_notes (session_id, note_key);
+"""
+
+
+class SqliteSessionStore(SessionStore):
+    """Keeps the sessions in a SQLite database (in WAL mode, so readers don't
+    block the writer). Requests borrow a connection from a bounded pool. Recently
+    used sessions are also kept in memory, and only reloaded once another worker
+    changed them."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        max_sessions: int = constants.DEFAULT_MAX_SESSIONS,
+        cache_size: int = constants.DEFAULT_SESSION_CACHE_SIZE,
+        max_connections: int = constants.DEFAULT_SESSION_DB_CONNECTIONS,
+    ) -> None:
+        self._pool = _ConnectionPool(db_path, max_connections)
+        self._max_sessions = max_sessions
+        self._cache_size = cache_size
+        self._cached_sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        with self._pool.connection() as connection:
+            connection.executescript(_SCHEMA)
+
+    def create_session(self, parser: WebParser, parsed_data: ParsedData) -> Session:
+        session = Session(generate_session_id(), parser, parsed_data)
+        category_total_time = parser.category_total_time or {}
+
+        note_rows: List[Tuple[str, int, str, str, int, Optional[int], Optional[int]]]
+        note_rows = []
+        for category_idx, category in enumerate(parser.valid_categories):
+            for category_order, note in enumerate(
+                parsed_data.get_category_notes(category) or []
+            ):
+                note_rows.append(
+                    self._to_note_row(
+                        session.session_id,
+                        len(note_rows),
+                        note,
+                        category_idx,
+                        category_order,
+                    )
+                )
+        for note in parsed_data.get_unknown_notes():
+            note_rows.append(
+                self._to_note_row(session.session_id, len(note_rows), note, None, None)
+            )
+
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT INTO sessions VALUES (?, ?, ?, ?)",
+                (
+                    session.session_id,
+                    session.version,
+                    parser.match_mode.value,
+                    time.time(),
+                ),
+            )
+            connection.executemany(
+                "INSERT INTO session_categories VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        session.session_id,
+                        category_idx,
+                        category.name,
+                        json.dumps(category.get_keywords()),
+                        category_total_time.get(category, 0),
+                    )
+                    for category_idx, category in enumerate(parser.valid_categories)
+                ],
+            )
+            connection.executemany(
+                "INSERT INTO session_notes VALUES (?, ?, ?, ?, ?, ?, ?)", note_rows
+            )
+            self._drop_oldest_sessions(connection)
+
+        self._cache_session(session)
+        return session
+
+    def get_session(self, session_id: str) -> Optional[Session]:
+        with self._pool.connection() as connection:
+            version_row = connection.execute(
+                "SELECT version, last_used FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            if version_row is None:
+                return None
+            # Sessions which are only read are still in use, so not dropped first
+            now = time.time()
+            if now - version_row[1] >= constants.SESSION_TOUCH_INTERVAL_SEC:
+                connection.execute(
+                    "UPDATE sessions SET last_used = ? WHERE session_id = ?",
+                    (now, session_id),
+                )
+
+            with self._cache_lock:
+                session = self._cached_sessions.get(session_id)
+            if session is not None and session.version == version_row[0]:
+                return session
+
+            session = self._load_session(connection, session_id)
+        if session is not None:
+            self._cache_session(session)
+        return session
+
+    def assign_notes(
+        self, session: Session, assignments: List[Tuple[Note, Category]]
+    ) -> List[Tuple[Note, Category]]:
+        with session.lock:
+            with self._transaction() as connection:
+                version_row = connection.execute(
+                    "SELECT version FROM sessions WHERE session_id = ?",
+                    (session.session_id,),
+                ).fetchone()
+                if version_row is None:
+                    # The session was dropped, so only the memory copy is left
+                    return session.apply_assignments(assignments)[1]
+                db_version: int = version_row[0]
+                is_stale = db_version != session.version
+
+                applied_assignments, skipped_assignments = session.apply_assignments(
+                    assignments
+                )
+                changed_category_idxs = set()
+                for note, category in applied_assignments:
+                    category_idx = session.parser.valid_categories.index(category)
+                    self._assign_note_row(
+                        connection, session.session_id, note, category_idx
+                    )
+                    changed_category_idxs.add(category_idx)
+                for category_idx in changed_category_idxs:
+                    self._update_category_total(
+                        connection, session.session_id, category_idx
+                    )
+
+                session.version = db_version + 1
+                connection.execute(
+                    "UPDATE sessions SET version = ?, last_used = ? "
+                    + "WHERE session_id = ?",
+                    (session.version, time.time(), session.session_id),
+                )
+
+            if is_stale:
+                # Another worker changed the session first, so the notes moved in
+                # memory may not match the database
+                with self._pool.connection() as connection:
+                    fresh_session = self._load_session(connection, session.session_id)
+                if fresh_session is not None:
+                    session.parser = fresh_session.parser
+                    session.parsed_data = fresh_session.parsed_data
+                    session.on_parsed_data_changed()
+                    session.version = fresh_session.version
+        self._cache_session(session)
+        return skipped_assignments
+
+    def _assign_note_row(
+        self,
+        connection: sqlite3.Connection,
+        session_id: str,
+        note: Note,
+        category_idx: int,
+    ) -> None:
+        """Moves the first uncategorized row of the note to the end of the category.
+        Rows are matched by their normalized note, the same as
+        `ParsedData.pop_unknown_note` matches the notes of the session."""
+        connection.execute(
+            """
+            UPDATE session_notes
+            SET category_idx = :category_idx,
+                category_order = (
+                    SELECT COALESCE(MAX(category_order), -1) + 1 FROM session_notes
+                    WHERE session_id = :session_id AND category_idx = :category_idx
+                )
+            WHERE session_id = :session_id AND note_idx = (
+                SELECT MIN(note_idx) FROM session_notes
+                WHERE session_id = :session_id AND note_key = :note_key
+                AND category_idx IS NULL
+            )
+            """,
+            {
+                "session_id": session_id,
+                "category_idx": category_idx,
+                "note_key": Note.normalize_info(str(note)),
+            },
+        )
+
+    def _update_category_total(
+        self, connection: sqlite3.Connection, session_id: str, category_idx: int
+    ) -> None:
+        """Recalculates the total minutes of a single category"""
+        connection.execute(
+            """
+            UPDATE session_categories
+            SET total_minutes = (
+                SELECT COALESCE(SUM(minutes), 0) FROM session_notes
+                WHERE session_id = :session_id AND category_idx = :category_idx
+            )
+            WHERE session_id = :session_id AND category_idx = :category_idx
+            """,
+            {"session_id": session_id, "category_idx": category_idx},
+        )
+
+    def _load_session(
+        self, connection: sqlite3.Connection, session_id: str
+    ) -> Optional[Session]:
+        """Rebuilds a session from its rows.
+        # Return
+        * The session.
+        * None if there is no such session."""
+        session_row = connection.execute(
+            "SELECT version, match_mode FROM sessions WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+        if session_row is None:
+            return None
+        version, match_mode = session_row
+
+        categories, category_total_time = self._load_categories(connection, session_id)
+        parsed_data = self._load_parsed_data(connection, session_id, categories)
+        parser = WebParser(
+            categories, category_total_time, False, MatchMode(match_mode)
+        )
+        return Session(session_id, parser, parsed_data, version)
+
+    def _load_categories(
+        self, connection: sqlite3.Connection, session_id: str
+    ) -> Tuple[List[Category], Dict[Category, int]]:
+        """# Return
+        The categories of the session, in order, and their total minutes"""
+        categories: List[Category] = []
+        category_total_time: Dict[Category, int] = {}
+        for name, keywords, total_minutes in connection.execute(
+            "SELECT name, keywords, total_minutes FROM session_categories "
+            + "WHERE session_id = ? ORDER BY category_idx",
+            (session_id,),
+        ):
+            category = Category(name, json.loads(keywords))
+            categories.append(category)
+            category_total_time[category] = total_minutes
+        return categories, category_total_time
+
+    def _load_parsed_data(
+        self,
+        connection: sqlite3.Connection,
+        session_id: str,
+        categories: List[Category],
+    ) -> ParsedData:
+        """# Return
+        The categorized and unknown notes of the session"""
+        parsed_data = ParsedData({}, [], False)
+        for note_str, category_idx in connection.execute(
+            "SELECT note, category_idx FROM session_notes WHERE session_id = ? "
+            + "ORDER BY category_idx, category_order, note_idx",
+            (session_id,),
+        ):
+            note = Note.from_str(note_str)
+            if note is None:
+                continue
+            if category_idx is None:
+                parsed_data.add_unknown_note(note)
+            else:
+                parsed_data.add_to_known_assignments(
+                    note, categories[category_idx], False
+                )
+        return parsed_data
+
+    def _drop_oldest_sessions(self, connection: sqlite3.Connection) -> None:
+        """Drops the least recently used sessions past the max"""
+        connection.execute(
+            """
+            DELETE FROM sessions WHERE session_id IN (
+                SELECT session_id FROM sessions ORDER BY last_used DESC
+                LIMIT -1 OFFSET ?
+            )
+            """,
+            (self._max_sessions,),
+        )
+
+    def _cache_session(self, session: Session) -> None:
+        """Keeps the session in memory, dropping the least recently used"""
+        with self._cache_lock:
+            self._cached_sessions[session.session_id] = session
+            self._cached_sessions.move_to_end(session.session_id)
+            while len(self._cached_sessions) > self._cache_size:
+                self._cached_sessions.popitem(last=False)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Runs the context as a single write transaction"""
+        with self._pool.connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    @classmethod
+    def _to_note_row(
+        cls,
+        session_id: str,
+        note_idx: int,
+        note: Note,
+        category_idx: Optional[int],
+        category_order: Optional[int],
+    ) -> Tuple[str, int, str, str, int, Optional[int], Optional[int]]:
+        """# Return
+        The row of a note in the session_notes table"""
+        note_str = str(note)
+        return (
+            session_id,
+            note_idx,
+            note_str,
+            Note.normalize_info(note_str),
+            note.time.compute_time_difference(),
+            category_idx,
+            category_order,
+        )
+
+
+# pylint: disable=too-few-public-methods
+class _ConnectionPool:
+    """Connections to the database, shared by the threads of a worker. The web app
+    serves every request on a new thread, so connections are borrowed per request
+    rather than kept per thread. At most `max_connections` are ever opened."""
+
+    def __init__(self, db_path: Path, max_connections: int) -> None:
+        self._db_path = db_path
+        self._max_connections = max_connections
+        self._idle_connections: List[sqlite3.Connection] = []
+        self._opened_count = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrows a connection for the context, waiting for one while all are in
+        use. Raises `sqlite3.OperationalError` if none is returned in time."""
+        connection = self._acquire()
+        try:
+            yield connection
+        finally:
+            with self._condition:
+                self._idle_connections.append(connection)
+                self._condition.notify()
+
+    def _acquire(self) -> sqlite3.Connection:
+        """# Return
+        An idle connection, or a new one while under the max"""
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._idle_connections
+                or self._opened_count < self._max_connections,
+                constants.SESSION_DB_TIMEOUT_SEC,
+            ):
+                raise sqlite3.OperationalError("No session database connection free")
+            if self._idle_connections:
+                return self._idle_connections.pop()
+            self._opened_count += 1
+        try:
+            return self._connect()
+        except BaseException:
+            with self._condition:
+                self._opened_count -= 1
+                self._condition.notify()
+            raise
+
+    def _connect(self) -> sqlite3.Connection:
+        """# Return
+        A new connection, usable from any thread"""
+        # Transactions are started explicitly (see SqliteSessionStore._transaction)
+        connection = sqlite3.connect(
+            self._db_path,
+            timeout=constants.SESSION_DB_TIMEOUT_SEC,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute("PRAGMA foreign_keys = ON")
+        return connection
@@ -0,0 +1 @@
+"""Init for web app tests"""
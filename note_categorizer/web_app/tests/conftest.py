@@ -0,0 +1,41 @@
+"""Fixtures shared by the web app tests"""
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Iterator
+from unittest import mock
+
+import pytest
+from flask.testing import FlaskClient
+
+from note_categorizer.web_app.server import WebAppServer
+
+PROJECT_ROOT_PATH = Path(__file__).resolve().parents[3]
+
+
+@pytest.fixture(name="create_web_server")
+def fixture_create_web_server() -> Iterator[Callable[..., WebAppServer]]:
+    """Creates servers that never look up their public ip. Keyword arguments
+    (i.e. `limits`) are passed on to the server."""
+
+    def create_web_server(**kwargs: Any) -> WebAppServer:
+        return WebAppServer(0, False, False, True, PROJECT_ROOT_PATH, **kwargs)
+
+    with mock.patch(
+        "note_categorizer.web_app.web_utils.WebUtils.get_public_ip",
+        return_value="http://localhost",
+    ):
+        yield create_web_server
+
+
+@pytest.fixture(name="web_server")
+def fixture_web_server(create_web_server: Callable[..., WebAppServer]) -> WebAppServer:
+    """A server with the default limits"""
+    return create_web_server()
+
+
+@pytest.fixture(name="web_client")
+def fixture_web_client(web_server: WebAppServer) -> FlaskClient:
+    """A test client of the web server"""
+    # pylint: disable=protected-access
+    return web_server._app.test_client()
@@ -0,0 +1,60 @@
+"""Tests the admin routes, and submissions using the server's categories"""
+from pathlib import Path
+from typing import Callable
+
+from flask.testing import FlaskClient
+
+from note_categorizer.categorizer.category_reloader import CategoryReloader
+from note_categorizer.web_app.server import WebAppServer
+
+SUBMITTED_NOTES = {"notes": ["09:00-09:15: standup", "12:00-12:30: lunch"]}
+
+
+def _create_client(
+    create_web_server: Callable[..., WebAppServer], category_path: Path
+) -> FlaskClient:
+    web_server = create_web_server(
+        category_reloader=CategoryReloader(category_path, use_cache=False)
+    )
+    # pylint: disable=protected-access
+    return web_server._app.test_client()
+
+
+def test_reload_categories(
+    tmp_path: Path, create_web_server: Callable[..., WebAppServer]
+) -> None:
+    """Submissions without categories use the server's, which can be reloaded"""
+    category_path = tmp_path / "categories.txt"
+    category_path.write_text("meetings: standup\n", encoding="utf-8")
+    web_client = _create_client(create_web_server, category_path)
+
+    response_json = web_client.post("/submit_info", json=SUBMITTED_NOTES).get_json()
+    assert response_json["category_list"] == ["meetings"]
+    assert len(response_json["uncategorized_list"]) == 1
+
+    category_path.write_text("meetings: standup\nbreaks: lunch\n", encoding="utf-8")
+    reload_json = web_client.post("/admin/reload_categories").get_json()
+    assert reload_json["changed"] and reload_json["generation"] == 1
+
+    response_json = web_client.post("/submit_info", json=SUBMITTED_NOTES).get_json()
+    assert response_json["category_list"] == ["meetings", "breaks"]
+    assert len(response_json["uncategorized_list"]) == 0
+
+    # Categories in the submission still take precedence
+    response_json = web_client.post(
+        "/submit_info", json={**SUBMITTED_NOTES, "category_info": ["lunch:"]}
+    ).get_json()
+    assert response_json["category_list"] == ["lunch"]
+
+
+def test_admin_is_localhost_only(
+    tmp_path: Path, create_web_server: Callable[..., WebAppServer]
+) -> None:
+    """Other hosts can't reload the categories"""
+    category_path = tmp_path / "categories.txt"
+    category_path.write_text("meetings: standup\n", encoding="utf-8")
+    web_client = _create_client(create_web_server, category_path)
+    response = web_client.post(
+        "/admin/reload_categories", environ_base={"REMOTE_ADDR": "10.0.0.1"}
+    )
+    assert response.status_code == 403
@@ -0,0 +1,116 @@
+"""Tests the limits on the work the web app takes on"""
+from typing import Callable
+from typing import Tuple
+from unittest import mock
+
+import pytest
+from flask.testing import FlaskClient
+
+from note_categorizer.categorizer.parser import ParseDeadlineExceeded, WebParser
+from note_categorizer.common.category import Category
+from note_categorizer.common.notes import Note
+from note_categorizer.web_app.admission import AdmissionController, ServerLimits
+from note_categorizer.web_app.server import WebAppServer
+
+
+def _create_server(
+    create_web_server: Callable[..., WebAppServer], limits: ServerLimits
+) -> Tuple[WebAppServer, FlaskClient]:
+    web_server = create_web_server(limits=limits)
+    # pylint: disable=protected-access
+    return web_server, web_server._app.test_client()
+
+
+def test_admission_queue_is_bounded() -> None:
+    """Requests wait for a slot while there is room in the queue"""
+    admission = AdmissionController(1, 0, 10.0)
+    with admission.admit() as is_first_admitted:
+        # No room in the queue, so it is turned away without waiting
+        with admission.admit() as is_second_admitted:
+            assert is_first_admitted and not is_second_admitted
+
+    admission = AdmissionController(1, 1, 0.01)
+    with admission.admit():
+        # Queued, but the slot does not free up in time
+        with admission.admit() as is_queued_admitted:
+            assert not is_queued_admitted
+    with admission.admit() as is_admitted_after:
+        assert is_admitted_after
+
+
+def test_saturated_server_returns_retry_after(
+    create_web_server: Callable[..., WebAppServer]
+) -> None:
+    """A request arriving while every slot is busy gets a 503"""
+    web_server, web_client = _create_server(
+        create_web_server, ServerLimits(max_concurrent_parses=1, max_queued_parses=0)
+    )
+    # pylint: disable=protected-access
+    with web_server._admission.admit():
+        response = web_client.post(
+            "/submit_info", json={"notes": [], "category_info": []}
+        )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_request_size_limits(create_web_server: Callable[..., WebAppServer]) -> None:
+    """Bodies and note counts past the limits are rejected with a 413"""
+    _, web_client = _create_server(
+        create_web_server, ServerLimits(max_content_bytes=1024, max_notes=2)
+    )
+    response = web_client.post(
+        "/submit_info", json={"notes": ["x" * 2048], "category_info": []}
+    )
+    assert response.status_code == 413
+    assert "error" in response.get_json()
+
+    response = web_client.post(
+        "/submit_info", json={"notes": ["a", "b", "c"], "category_info": []}
+    )
+    assert response.status_code == 413
+
+
+def test_parse_deadline() -> None:
+    """Parsing stops once it used up its CPU time"""
+    parser = WebParser([Category("meetings", ["standup"])], None)
+    notes = [Note.from_str(f"09:00-09:15: standup {idx}") for idx in range(1000)]
+    with pytest.raises(ParseDeadlineExceeded) as err_info:
+        parser.parse_notes([note for note in notes if note is not None], 0.0)
+    assert err_info.value.parsed_note_count == 0
+
+
+def test_info_types_are_checked(web_client: FlaskClient) -> None:
+    """Notes and categories which are not lists of strings are rejected with a 400"""
+    for submitted_info in (
+        {"notes": 5},
+        {"notes": "09:00-09:15: standup"},
+        {"notes": ["09:00-09:15: standup", 5]},
+        {"category_info": {"meetings": "standup"}},
+    ):
+        response = web_client.post("/submit_info", json=submitted_info)
+        assert response.status_code == 400
+        assert "list of strings" in response.get_json()["error"]
+
+    response = web_client.post(
+        "/submit_info_stream", data='{"category_info": "meetings: standup"}\n'
+    )
+    assert response.status_code == 400
+
+
+def test_deadline_covers_deserializing(
+    create_web_server: Callable[..., WebAppServer]
+) -> None:
+    """Reading the notes of a request counts towards its CPU deadline"""
+    _, web_client = _create_server(
+        create_web_server, ServerLimits(parse_cpu_deadline_sec=-1.0)
+    )
+    with mock.patch(
+        "note_categorizer.categorizer.parser.WebParser.parse_notes"
+    ) as parse_notes:
+        response = web_client.post(
+            "/submit_info",
+            json={"notes": ["09:00-09:15: standup"], "category_info": []},
+        )
+    assert response.status_code == 413
+    parse_notes.assert_not_called()
@@ -0,0 +1,142 @@
+"""Tests the jobs of the web app"""
+from io import BytesIO
+from typing import Any
+from typing import Dict
+from unittest import mock
+import threading
+import time
+
+import pytest
+from flask.testing import FlaskClient
+
+from note_categorizer.web_app.jobs import Job, JobManager, JobState
+from note_categorizer.web_app.server import WebAppServer
+
+SUBMITTED_JOB = {
+    "category_info": ["meetings: standup", "breaks: lunch"],
+    "notes": [f"09:00-09:15: standup {idx}" for idx in range(3000)]
+    + [f"10:00-10:10: unknown note {idx}" for idx in range(10)],
+}
+
+
+def _wait_for_job(web_client: FlaskClient, job_id: str) -> Dict[str, Any]:
+    """# Return
+    The json of the job, once finished"""
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        job_json: Dict[str, Any] = web_client.get(f"/jobs/{job_id}").get_json()
+        if job_json["state"] in (JobState.DONE.value, JobState.FAILED.value):
+            return job_json
+        time.sleep(0.01)
+    raise TimeoutError(f"Job {job_id} did not finish")
+
+
+def test_job_results_are_paginated(web_client: FlaskClient) -> None:
+    """A job answers immediately, and its results are in its session once done"""
+    response = web_client.post("/jobs", json=SUBMITTED_JOB)
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+    assert response.headers["Location"] == f"/jobs/{job_id}"
+
+    job_json = _wait_for_job(web_client, job_id)
+    assert job_json["state"] == "done"
+    assert job_json["lines_parsed"] == job_json["line_count"] == 3010
+    assert job_json["categorized_count"] == 3000 and job_json["unknown_count"] == 10
+
+    session_id = job_json["session_id"]
+    totals = web_client.get(f"/results/totals?session_id={session_id}").get_json()
+    assert totals["items"][0] == {
+        "category": "meetings",
+        "minutes": 45000,
+        "note_count": 3000,
+    }
+    assert web_client.get("/jobs/missing").status_code == 404
+
+
+def test_job_events(web_client: FlaskClient) -> None:
+    """The event stream reports progress and ends once the job is done"""
+    job_id = web_client.post("/jobs", json=SUBMITTED_JOB).get_json()["job_id"]
+    response = web_client.get(f"/jobs/{job_id}/events")
+    assert response.mimetype == "text/event-stream"
+
+    events = response.get_data(as_text=True).strip().split("\n\n")
+    assert events[-1].startswith("event: done\n")
+    assert all(event.startswith("event: progress\n") for event in events[:-1])
+
+
+def test_job_upload(web_client: FlaskClient) -> None:
+    """Notes and categories can be uploaded as files"""
+    response = web_client.post(
+        "/jobs",
+        data={
+            "notes_file": (BytesIO(b"09:00-09:15: standup\n10:00-10:10: x\n"), "n"),
+            "category_file": (BytesIO(b"meetings: standup\n"), "c"),
+            "match_mode": "word",
+        },
+    )
+    assert response.status_code == 202
+
+    job_json = _wait_for_job(web_client, response.get_json()["job_id"])
+    assert job_json["categorized_count"] == 1 and job_json["unknown_count"] == 1
+
+
+def test_full_job_queue() -> None:
+    """Jobs past the workers and queue are turned away, and failures reported"""
+    release = threading.Event()
+    manager = JobManager(max_workers=1, max_queued=1)
+
+    def blocked_run(_job: Job) -> None:
+        release.wait(5)
+        raise ValueError("bad notes")
+
+    first_job = manager.submit(1, blocked_run)
+    assert manager.submit(1, blocked_run) is not None
+    assert manager.submit(1, blocked_run) is None
+
+    release.set()
+    manager.shutdown()
+    assert first_job is not None and first_job.state == JobState.FAILED
+    assert first_job.error == "bad notes"
+
+
+def test_job_types_are_checked(web_client: FlaskClient) -> None:
+    """Notes and categories which are not lists of strings are rejected"""
+    for submitted_job in (
+        {"notes": "09:00-09:15: standup"},
+        {"notes": ["09:00-09:15: standup"], "category_info": 5},
+    ):
+        response = web_client.post("/jobs", json=submitted_job)
+        assert response.status_code == 400
+        assert "list of strings" in response.get_json()["error"]
+
+
+def test_queued_jobs_fail_on_shutdown() -> None:
+    """Stopping the manager finishes the running job and fails the queued ones"""
+    release = threading.Event()
+    manager = JobManager(max_workers=1, max_queued=1)
+
+    def blocked_run(job: Job) -> None:
+        release.wait(5)
+        job.set_done("session")
+
+    running_job = manager.submit(1, blocked_run)
+    queued_job = manager.submit(1, blocked_run)
+    assert running_job is not None and queued_job is not None
+    while running_job.state != JobState.RUNNING:
+        time.sleep(0.01)
+
+    threading.Timer(0.05, release.set).start()
+    manager.shutdown(cancel_queued=True)
+    assert running_job.state == JobState.DONE
+    assert queued_job.state == JobState.FAILED
+
+
+def test_server_stops_jobs(web_server: WebAppServer) -> None:
+    """The jobs are shut down once the server stops serving"""
+    # pylint: disable=protected-access
+    with mock.patch(
+        "werkzeug.serving.run_simple", side_effect=KeyboardInterrupt
+    ), mock.patch.object(web_server._jobs, "shutdown") as shutdown:
+        with pytest.raises(KeyboardInterrupt):
+            web_server.start_server()
+    shutdown.assert_called_once_with(cancel_queued=True)
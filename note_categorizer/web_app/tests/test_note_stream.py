@@ -0,0 +1,117 @@
+"""Tests the streamed (NDJSON) upload of notes"""
+from typing import Any
+from typing import Callable
+from typing import List
+import io
+import json
+
+import pytest
+from flask.testing import FlaskClient
+
+from note_categorizer.web_app.admission import AdmissionController, ServerLimits
+from note_categorizer.web_app.note_stream import InvalidStreamLine, StreamTooLarge
+from note_categorizer.web_app.note_stream import iter_stream_lines
+from note_categorizer.web_app.server import WebAppServer
+
+CATEGORY_INFO = ["meetings: standup", "breaks: lunch"]
+NOTES = [f"09:{idx:02}-09:{idx + 1:02}: standup {idx}" for idx in range(50)] + [
+    "12:00-12:30: lunch",
+    "13:00-13:10: unknown thing",
+]
+
+
+def test_lines_split_across_chunks() -> None:
+    """Lines are put back together no matter how the chunks split them"""
+    stream = io.BytesIO(b"first line\nsecond\n\nlast without newline")
+    lines = list(iter_stream_lines(stream, chunk_size=3))
+    assert lines == [b"first line", b"second", b"", b"last without newline"]
+
+    with pytest.raises(InvalidStreamLine):
+        list(iter_stream_lines(io.BytesIO(b"x" * 100), chunk_size=8, max_line_bytes=10))
+    with pytest.raises(StreamTooLarge):
+        list(
+            iter_stream_lines(io.BytesIO(b"x\n" * 50), chunk_size=8, max_total_bytes=64)
+        )
+
+
+def test_stream_matches_submit_info(web_client: FlaskClient) -> None:
+    """Streaming the notes gets the same results as submitting them at once"""
+    ndjson_lines = [json.dumps({"category_info": CATEGORY_INFO})]
+    ndjson_lines += [json.dumps(note) for note in NOTES]
+    response = web_client.post(
+        "/submit_info_stream",
+        data="\n".join(ndjson_lines).encode("utf-8"),
+        content_type="application/x-ndjson",
+    )
+    assert response.status_code == 200
+    streamed_json = response.get_json()
+
+    submitted_json = web_client.post(
+        "/submit_info", json={"category_info": CATEGORY_INFO, "notes": NOTES}
+    ).get_json()
+    assert streamed_json["processed_data"] == submitted_json["processed_data"]
+    assert streamed_json["uncategorized_list"] == ["13:00-13:10: unknown thing"]
+
+
+def test_invalid_stream_line(web_client: FlaskClient) -> None:
+    """Lines which are not json note strings are rejected"""
+    body = json.dumps({"category_info": CATEGORY_INFO}) + "\n{not json\n"
+    response = web_client.post("/submit_info_stream", data=body)
+    assert response.status_code == 400
+    assert "Line 2" in response.get_json()["error"]
+
+
+class _SlowUpload(io.BytesIO):
+    """An upload which checks whether an admission slot is free on every read"""
+
+    def __init__(self, body: bytes, admission: AdmissionController) -> None:
+        super().__init__(body)
+        self.admission = admission
+        self.was_slot_free: List[bool] = []
+
+    def readinto(self, buffer: Any) -> int:
+        with self.admission.admit() as is_admitted:
+            self.was_slot_free.append(is_admitted)
+        return super().readinto(buffer)
+
+
+def _post_chunked(web_client: FlaskClient, upload: io.BytesIO) -> Any:
+    """Posts the upload without a content length, like a chunked upload"""
+    return web_client.post(
+        "/submit_info_stream",
+        input_stream=upload,
+        environ_base={"wsgi.input_terminated": True},
+    )
+
+
+def test_stream_only_holds_slot_while_categorizing(
+    create_web_server: Callable[..., WebAppServer]
+) -> None:
+    """Other requests are admitted while the upload is being read"""
+    web_server = create_web_server(
+        limits=ServerLimits(max_concurrent_parses=1, max_queued_parses=0)
+    )
+    ndjson_lines = [json.dumps({"category_info": CATEGORY_INFO})]
+    ndjson_lines += [json.dumps(note) for note in NOTES]
+    # pylint: disable=protected-access
+    upload = _SlowUpload("\n".join(ndjson_lines).encode("utf-8"), web_server._admission)
+
+    response = _post_chunked(web_server._app.test_client(), upload)
+    assert response.status_code == 200
+    assert len(upload.was_slot_free) > 0 and all(upload.was_slot_free)
+
+
+def test_chunked_stream_size_is_limited(
+    create_web_server: Callable[..., WebAppServer]
+) -> None:
+    """Uploads without a content length still can't exceed the max size"""
+    web_server = create_web_server(limits=ServerLimits(max_content_bytes=256))
+    ndjson_lines = [json.dumps({"category_info": CATEGORY_INFO})]
+    ndjson_lines += [json.dumps(note) for note in NOTES]
+    # pylint: disable=protected-access
+    response = _post_chunked(
+        web_server._app.test_client(),
+        io.BytesIO("\n".join(ndjson_lines).encode("utf-8")),
+    )
+    assert response.status_code == 413
+    assert "256 bytes" in response.get_json()["error"]
@@ -0,0 +1,64 @@
+"""Tests the compression and revalidation of web app responses"""
+import gzip
+import json
+
+from flask.testing import FlaskClient
+
+SUBMITTED_INFO = {
+    "category_info": ["meetings: standup", "breaks: lunch"],
+    "notes": [f"{hour:02}:00-{hour:02}:30: standup number {hour}" for hour in range(24)]
+    + [f"{hour:02}:30-{hour:02}:45: unknown note {hour}" for hour in range(24)],
+}
+
+
+def test_large_responses_are_gzipped(web_client: FlaskClient) -> None:
+    """Clients accepting gzip get a compressed body, others the plain one"""
+    response = web_client.post(
+        "/submit_info", json=SUBMITTED_INFO, headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    uncompressed = web_client.post("/submit_info", json=SUBMITTED_INFO)
+    assert "Content-Encoding" not in uncompressed.headers
+    assert json.loads(gzip.decompress(response.data))["processed_data"] == (
+        uncompressed.get_json()["processed_data"]
+    )
+
+
+def test_streamed_export_is_gzipped(web_client: FlaskClient) -> None:
+    """Streams are compressed as they are sent"""
+    web_client.post("/submit_info", json=SUBMITTED_INFO)
+    response = web_client.get("/export", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    csv_lines = gzip.decompress(response.data).decode("utf-8").splitlines()
+    assert len(csv_lines) == 1 + len(SUBMITTED_INFO["notes"])
+
+
+def test_unchanged_results_are_not_modified(web_client: FlaskClient) -> None:
+    """Results are only resent once the parsed data changes"""
+    web_client.post("/submit_info", json=SUBMITTED_INFO)
+    response = web_client.get("/results")
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+
+    response = web_client.get("/results", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert len(response.data) == 0
+
+    web_client.post(
+        "/submit_uncategorized_update", json={"00:30-00:45: unknown note 0": "breaks:"}
+    )
+    response = web_client.get("/results", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_versioned_static_assets_are_cached(web_client: FlaskClient) -> None:
+    """The homepage links static assets by version, which are cached for long"""
+    homepage = web_client.get("/").data.decode("utf-8")
+    assert "/static/js/homepage.js?v=" in homepage
+
+    response = web_client.get("/static/js/navbar.js?v=1")
+    assert response.cache_control.max_age is not None
+    assert response.cache_control.max_age > 24 * 60 * 60
+    response.close()
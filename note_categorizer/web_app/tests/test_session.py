@@ -0,0 +1,151 @@
+"""Tests the sessions and the paginated results of the web app"""
+from typing import Any
+from typing import List
+
+import pytest
+from flask.testing import FlaskClient
+
+from note_categorizer.web_app.pagination import StaleCursor, paginate
+from note_categorizer.web_app.server import WebAppServer
+
+SUBMITTED_INFO = {
+    "category_info": ["meetings: standup", "breaks: lunch"],
+    "notes": [f"09:00-09:15: standup {idx}" for idx in range(5)]
+    + [f"10:00-10:10: unknown note {idx}" for idx in range(7)],
+}
+
+
+def test_paginate() -> None:
+    """Pages cover every item once, and cursors are tied to the version"""
+    items = list(range(10))
+    page = paginate(items, 1, None, 4)
+    collected: List[Any] = list(page.items)
+    while page.next_cursor is not None:
+        page = paginate(items, 1, page.next_cursor, 4)
+        collected += page.items
+    assert collected == items
+
+    first_page = paginate(items, 1, None, 4)
+    with pytest.raises(StaleCursor):
+        paginate(items, 2, first_page.next_cursor, 4)
+
+
+def test_paging_through_results(web_client: FlaskClient) -> None:
+    """Paginated responses only carry the first page, the rest is fetched"""
+    response = web_client.post("/submit_info?paginate=true", json=SUBMITTED_INFO)
+    response_json = response.get_json()
+    assert "standup 0" not in response_json["processed_data"]
+
+    unknowns: List[str] = response_json["uncategorized_list"]
+    assert len(unknowns) == 7 and response_json["uncategorized_cursor"] is None
+
+    page = web_client.get("/results/notes?category=meetings&limit=2").get_json()
+    notes: List[str] = page["items"]
+    while page["next_cursor"] is not None:
+        page = web_client.get(
+            f"/results/notes?category=meetings&limit=2&cursor={page['next_cursor']}"
+        ).get_json()
+        notes += page["items"]
+    assert len(notes) == 5 and page["total"] == 5
+
+    totals = web_client.get("/results/totals").get_json()["items"]
+    assert totals[0] == {"category": "meetings", "minutes": 75, "note_count": 5}
+
+
+def test_stale_cursor_is_rejected(web_client: FlaskClient) -> None:
+    """Cursors made before the results changed are refused"""
+    web_client.post("/submit_info", json=SUBMITTED_INFO)
+    cursor = web_client.get("/results/unknowns?limit=2").get_json()["next_cursor"]
+
+    web_client.post(
+        "/submit_uncategorized_update",
+        json={"10:00-10:10: unknown note 0": "breaks:"},
+    )
+    response = web_client.get(f"/results/unknowns?limit=2&cursor={cursor}")
+    assert response.status_code == 409
+    assert web_client.get("/results/unknowns").get_json()["total"] == 6
+
+
+def test_sessions_are_separate(web_server: WebAppServer) -> None:
+    """Each client only sees the notes it submitted"""
+    # pylint: disable=protected-access
+    first_client = web_server._app.test_client()
+    second_client = web_server._app.test_client()
+    first_client.post("/submit_info", json=SUBMITTED_INFO)
+    second_client.post(
+        "/submit_info",
+        json={"category_info": ["meetings: standup"], "notes": ["09:00-09:30: x"]},
+    )
+
+    assert first_client.get("/results/unknowns").get_json()["total"] == 7
+    assert second_client.get("/results/unknowns").get_json()["total"] == 1
+    assert web_server._app.test_client().get("/results").status_code == 400
+
+
+def test_sessions_share_compiled_categories(web_server: WebAppServer) -> None:
+    """Submissions with the same category lines only compile them once"""
+    # pylint: disable=protected-access
+    first_client = web_server._app.test_client()
+    second_client = web_server._app.test_client()
+    first_client.post("/submit_info", json=SUBMITTED_INFO)
+    second_client.post("/submit_info", json={**SUBMITTED_INFO, "match_mode": "word"})
+
+    assert web_server._compiled_categories.misses == 1
+    assert web_server._compiled_categories.hits == 1
+    totals = second_client.get("/results/totals").get_json()["items"]
+    assert totals[0] == {"category": "meetings", "minutes": 75, "note_count": 5}
+
+
+def test_unknowns_have_suggestions(web_client: FlaskClient) -> None:
+    """Unknown notes similar to categorized ones get their category suggested"""
+    submitted_info = {
+        "category_info": ["meetings: standup", "breaks: lunch"],
+        "notes": [
+            "09:00-09:15: standup with the team",
+            "10:00-10:15: stand up with the team",
+            "11:00-11:15: xyz",
+        ],
+    }
+    response_json = web_client.post("/submit_info", json=submitted_info).get_json()
+    assert response_json["uncategorized_suggestions"] == ["meetings", None]
+
+    page = web_client.get("/results/unknowns?limit=1").get_json()
+    assert page["items"] == ["10:00-10:15: stand up with the team"]
+    assert page["suggestions"] == ["meetings"]
+
+
+def test_assignments_update_suggestions(web_server: WebAppServer) -> None:
+    """Categorized notes are added to the suggestions, without rebuilding them"""
+    # pylint: disable=protected-access
+    web_client = web_server._app.test_client()
+    submitted_info = {
+        "category_info": ["meetings: standup", "breaks: lunch"],
+        "notes": ["09:00-09:15: standup", "11:00-11:15: xyz", "12:00-12:15: xyz abc"],
+    }
+    response_json = web_client.post("/submit_info", json=submitted_info).get_json()
+    assert response_json["uncategorized_suggestions"] == [None, None]
+    session = web_server._session_store.get_session(response_json["session_id"])
+    assert session is not None
+    similarity_index = session._similarity_index
+
+    response_json = web_client.post(
+        "/submit_uncategorized_update", json={"11:00-11:15: xyz": "breaks:"}
+    ).get_json()
+    assert response_json["uncategorized_suggestions"] == ["breaks"]
+    assert session._similarity_index is similarity_index
+
+
+def test_skipped_assignments_are_reported(web_client: FlaskClient) -> None:
+    """Assignments to categories outside the session are not applied silently"""
+    web_client.post("/submit_info", json=SUBMITTED_INFO)
+    response_json = web_client.post(
+        "/submit_uncategorized_update",
+        json={
+            "10:00-10:10: unknown note 0": "holidays:",
+            "10:00-10:10: unknown note 1": "breaks:",
+        },
+    ).get_json()
+    assert response_json["skipped_assignments"] == [
+        "10:00-10:10: unknown note 0 -> holidays"
+    ]
+    assert web_client.get("/results/unknowns").get_json()["total"] == 6
@@ -0,0 +1,128 @@
+"""Tests the sqlite_session_store module"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import sqlite3
+
+from note_categorizer.categorizer.parser import WebParser
+from note_categorizer.common.category import Category
+from note_categorizer.common.keyword_index import MatchMode
+from note_categorizer.common.notes import Note
+from note_categorizer.web_app.session import InMemorySessionStore
+from note_categorizer.web_app.session import Session
+from note_categorizer.web_app.session import SessionStore
+from note_categorizer.web_app.sqlite_session_store import SqliteSessionStore
+
+
+def _create_session(session_store: SessionStore) -> Session:
+    categories = [Category("meetings", ["standup"]), Category("breaks", [])]
+    parser = WebParser(categories, None, match_mode=MatchMode.WHOLE_WORD)
+    note_lines = ["09:00-09:15: standup", "12:00-12:30: lunch", "13:00-13:05: lunch"]
+    notes = [Note.from_str(note_line) for note_line in note_lines]
+    parsed_data = parser.parse_notes([note for note in notes if note is not None])
+    parser.calculate_category_time(parsed_data)
+    return session_store.create_session(parser, parsed_data)
+
+
+def test_sessions_are_shared_between_stores(tmp_path: Path) -> None:
+    """A session made by one worker's store is loaded by another's"""
+    db_path = tmp_path / "sessions.db"
+    first_store = SqliteSessionStore(db_path)
+    session = _create_session(first_store)
+
+    second_store = SqliteSessionStore(db_path)
+    loaded_session = second_store.get_session(session.session_id)
+    assert loaded_session is not None and loaded_session is not session
+    assert loaded_session.parser.match_mode == MatchMode.WHOLE_WORD
+    assert loaded_session.parser.results_to_str(
+        loaded_session.parsed_data, True
+    ) == session.parser.results_to_str(session.parsed_data, True)
+    assert second_store.get_session("no such session") is None
+
+
+def test_assignments_update_rows(tmp_path: Path) -> None:
+    """Categorizing notes in one worker is seen by the other"""
+    db_path = tmp_path / "sessions.db"
+    first_store = SqliteSessionStore(db_path)
+    second_store = SqliteSessionStore(db_path)
+    session = _create_session(first_store)
+    lunch = Note.from_str("12:00-12:30: lunch")
+    assert lunch is not None
+
+    assert first_store.assign_notes(
+        session, [(lunch, Category("breaks", [])), (lunch, Category("holidays", []))]
+    ) == [(lunch, Category("holidays", []))]
+    loaded_session = second_store.get_session(session.session_id)
+    assert loaded_session is not None
+    assert loaded_session.version == session.version
+    assert len(loaded_session.parsed_data.get_unknown_notes()) == 1
+    assert loaded_session.parser.get_category_time(Category("breaks", [])) == 30
+
+    # The second worker works on its own copy, which the first then catches up on
+    second_lunch = Note.from_str("13:00-13:05: lunch")
+    assert second_lunch is not None
+    second_store.assign_notes(loaded_session, [(second_lunch, Category("breaks", []))])
+    first_store.assign_notes(session, [])
+    assert session.parsed_data.is_fully_parsed()
+    assert session.parser.get_category_time(Category("breaks", [])) == 35
+
+
+def test_assignments_match_the_same_notes(tmp_path: Path) -> None:
+    """The database and the memory of a session agree on which notes move"""
+    db_path = tmp_path / "sessions.db"
+    first_store = SqliteSessionStore(db_path)
+    session = _create_session(first_store)
+    in_memory_store = InMemorySessionStore()
+    in_memory_session = _create_session(in_memory_store)
+
+    # Differs only by case and whitespace, and a note which is not uncategorized
+    lunch = Note.from_str("12:00-12:30:  LUNCH")
+    standup = Note.from_str("09:00-09:15: standup")
+    assert lunch is not None and standup is not None
+    assignments = [(lunch, Category("breaks", [])), (standup, Category("breaks", []))]
+    skipped = [(standup, Category("breaks", []))]
+    assert first_store.assign_notes(session, assignments) == skipped
+    assert in_memory_store.assign_notes(in_memory_session, assignments) == skipped
+
+    loaded_session = SqliteSessionStore(db_path).get_session(session.session_id)
+    assert loaded_session is not None
+    expected_results = in_memory_session.parser.results_to_str(
+        in_memory_session.parsed_data, True
+    )
+    for checked_session in [session, loaded_session]:
+        assert (
+            checked_session.parser.results_to_str(checked_session.parsed_data, True)
+            == expected_results
+        )
+    assert [str(note) for note in loaded_session.parsed_data.get_unknown_notes()] == [
+        "13:00-13:05: lunch"
+    ]
+
+
+def test_reading_a_session_keeps_it(tmp_path: Path) -> None:
+    """Sessions which are only read are not the first ones dropped"""
+    db_path = tmp_path / "sessions.db"
+    session_store = SqliteSessionStore(db_path, max_sessions=2)
+    read_session = _create_session(session_store)
+    unread_session = _create_session(session_store)
+    with sqlite3.connect(db_path) as connection:
+        connection.execute("UPDATE sessions SET last_used = 0")
+
+    assert session_store.get_session(read_session.session_id) is read_session
+    _create_session(session_store)
+    assert session_store.get_session(read_session.session_id) is read_session
+    assert session_store.get_session(unread_session.session_id) is None
+
+
+def test_connections_are_bounded(tmp_path: Path) -> None:
+    """Requests on many threads share the few connections of the pool"""
+    session_store = SqliteSessionStore(tmp_path / "sessions.db", max_connections=2)
+    session = _create_session(session_store)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        loaded_sessions = list(
+            executor.map(
+                lambda _: session_store.get_session(session.session_id), range(64)
+            )
+        )
+    assert all(loaded_session is session for loaded_session in loaded_sessions)
+    # pylint: disable=protected-access
+    assert session_store._pool._opened_count <= 2
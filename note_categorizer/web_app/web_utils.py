@@ -46,6 +46,16 @@ class WebUtils(CommonUtils):
         """Get the abs path to the template dir"""
         return cls.templates_dir_path
 
+    @classmethod
+    def get_static_file_version(cls, filename: str) -> str:
+        """# Return
+        A version of the static file that changes whenever the file does.
+        Used to bust the cache of the static assets."""
+        try:
+            return str(int((cls.static_dir_path / filename).stat().st_mtime))
+        except OSError:
+            return "0"
+
     def print_routes(self) -> None:
         """Print all get-able links served by this app"""
         print("Existing URLs:")